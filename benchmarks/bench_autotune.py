@@ -0,0 +1,94 @@
+"""Compares auto-tuned runs with the default chunk size and worker count.
+
+Synthetic lines are validated and their report written with
+Generator.generate_analyses_from_input_file three times: with the default
+settings, with an AutoTuner warming up (its trials are printed), and with
+the same AutoTuner reusing the setting it saved for the definition. The
+reports are checked to be identical.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_autotune [--lines 300000] [--max-workers 4]
+"""
+import argparse
+import logging
+import os
+import pathlib
+import tempfile
+import time
+
+from benchmarks.synthetic import make_lines
+from classes.auto_tuner import AutoTuner
+from classes.generator import Generator
+from utils import load_json_from_path
+
+BASE_DIR = pathlib.Path(__file__).parent.parent.resolve()
+STANDARD_DEFINITION_FILE = "standard_definition.json"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=300_000)
+    parser.add_argument("--engine", default="python")
+    parser.add_argument("--backend", default="process")
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count())
+    parser.add_argument("--trial-lines", type=int, default=20_000)
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    standard_definition = load_json_from_path(
+        f"{BASE_DIR}/{STANDARD_DEFINITION_FILE}",
+        "Standard definition file not accessible",
+    )
+    print(
+        f"{args.lines} lines, {args.engine} engine, {args.backend} backend, "
+        f"up to {args.max_workers} workers"
+    )
+    with tempfile.TemporaryDirectory() as output_dir:
+        input_path = f"{output_dir}/input_file.txt"
+        with open(input_path, "w") as writer:
+            writer.writelines(make_lines(standard_definition, args.lines))
+        tuner = AutoTuner(
+            max_workers=args.max_workers,
+            trial_lines=args.trial_lines,
+            cache_dir=f"{output_dir}/tuning",
+        )
+        runs = {
+            "default": Generator(engine=args.engine, backend=args.backend),
+            "warm-up": Generator(
+                engine=args.engine, backend=args.backend, auto_tuner=tuner
+            ),
+            "reused": Generator(
+                engine=args.engine, backend=args.backend, auto_tuner=tuner
+            ),
+        }
+        reference = None
+        for name, generator in runs.items():
+            report_path = f"{output_dir}/{name}.csv"
+            start = time.perf_counter()
+            generator.generate_analyses_from_input_file(
+                input_path,
+                f"{output_dir}/{name}.txt",
+                report_path,
+                standard_definition,
+                summary=False,
+            )
+            seconds = time.perf_counter() - start
+            with open(report_path, "rb") as report_file:
+                report = report_file.read()
+            reference = reference or report
+            assert report == reference, f"the {name} report differs"
+            setting = ""
+            if generator.auto_tuner is not None:
+                settings = tuner.settings
+                setting = (
+                    f", chunks of {settings['chunk_size']} lines, "
+                    f"{settings['workers']} worker(s)"
+                )
+            print(f"{name:>8}: {seconds:.3f}s{setting}")
+            for chunk_size, workers, rate in tuner.trials if name == "warm-up" else ():
+                print(f"{'':>10}trial: {chunk_size:>6} x{workers}: {rate:,.0f} lines/s")
+
+
+if __name__ == "__main__":
+    main()
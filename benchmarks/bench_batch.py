@@ -0,0 +1,121 @@
+"""Compares processing many small input files one by one with a batch job.
+
+--files synthetic input files of varied sizes (log-normally distributed,
+--mean-lines lines on average) are processed:
+
+* one by one, launching a Python process per file that loads the
+  standard definition and processes the file, as separate launches of
+  solution.py do;
+* one by one in this process, loading the standard definition again for
+  every file (launches without the interpreter start-up);
+* with Generator.generate_analyses_from_input_files and --workers processes,
+  compiling the definition once and scheduling large files first.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_batch [--files 200] [--mean-lines 500] [--workers 4]
+"""
+import argparse
+import logging
+import os
+import pathlib
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.synthetic import make_lines
+from classes.generator import Generator
+from utils import load_json_from_path
+
+BASE_DIR = pathlib.Path(__file__).parent.parent.resolve()
+STANDARD_DEFINITION_FILE = "standard_definition.json"
+# The work of one launch of solution.py, for a given input and output directory.
+LAUNCH_SCRIPT = """
+import logging, sys
+from classes.generator import Generator
+from utils import load_json_from_path
+
+logging.disable(logging.WARNING)
+input_path, output_dir, definition_path = sys.argv[1:]
+Generator().generate_analyses_from_input_file(
+    input_path,
+    f"{output_dir}/summary.txt",
+    f"{output_dir}/report.csv",
+    load_json_from_path(definition_path, "Standard definition file not accessible"),
+)
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=200)
+    parser.add_argument("--mean-lines", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    definition_path = f"{BASE_DIR}/{STANDARD_DEFINITION_FILE}"
+    error_message = "Standard definition file not accessible"
+    standard_definition = load_json_from_path(definition_path, error_message)
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as work_dir:
+        os.makedirs(f"{work_dir}/incoming")
+        total_lines = 0
+        for i in range(args.files):
+            num_lines = max(int(rng.lognormvariate(0, 1) * args.mean_lines / 1.65), 1)
+            total_lines += num_lines
+            with open(f"{work_dir}/incoming/{i:05d}.txt", "w") as writer:
+                writer.writelines(make_lines(standard_definition, num_lines, seed=i))
+
+        names = sorted(os.listdir(f"{work_dir}/incoming"))
+        start = time.perf_counter()
+        for name in names:
+            output_dir = f"{work_dir}/launches/{name}"
+            os.makedirs(output_dir)
+            subprocess.run(
+                [
+                    sys.executable,
+                    "-c",
+                    LAUNCH_SCRIPT,
+                    f"{work_dir}/incoming/{name}",
+                    output_dir,
+                    definition_path,
+                ],
+                cwd=BASE_DIR,
+                check=True,
+            )
+        launches_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for name in names:
+            output_dir = f"{work_dir}/one_by_one/{name}"
+            os.makedirs(output_dir)
+            Generator().generate_analyses_from_input_file(
+                f"{work_dir}/incoming/{name}",
+                f"{output_dir}/summary.txt",
+                f"{output_dir}/report.csv",
+                load_json_from_path(definition_path, error_message),
+            )
+        one_by_one_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        Generator(workers=args.workers).generate_analyses_from_input_files(
+            f"{work_dir}/incoming",
+            f"{work_dir}/batch",
+            load_json_from_path(definition_path, error_message),
+        )
+        batch_seconds = time.perf_counter() - start
+
+    print(f"{args.files} files, {total_lines} lines")
+    print(f"{'one launch per file':>24}: {launches_seconds:.3f}s")
+    print(f"{'one by one, in process':>24}: {one_by_one_seconds:.3f}s")
+    print(
+        f"{f'batch, {args.workers} workers':>24}: {batch_seconds:.3f}s "
+        f"(x{launches_seconds / batch_seconds:.1f} vs launches)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Compares report diffs read in lockstep and with chunk manifests.
+
+Synthetic lines are processed twice, the second time with a few of them
+(--changed) rewritten, and the two reports are diffed by reading both in
+full, then with their manifests, which skip the chunks the reports have in
+common. Times exclude building the manifests; the peak memory of every diff
+is measured with tracemalloc.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_diff [--lines 200000] [--changed 20]
+"""
+import argparse
+import logging
+import pathlib
+import random
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.synthetic import make_lines
+from classes.generator import Generator
+from classes.report_diff import ReportManifest, diff_reports
+from utils import load_json_from_path
+
+BASE_DIR = pathlib.Path(__file__).parent.parent.resolve()
+STANDARD_DEFINITION_FILE = "standard_definition.json"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=200_000)
+    parser.add_argument("--changed", type=int, default=20)
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    standard_definition = load_json_from_path(
+        f"{BASE_DIR}/{STANDARD_DEFINITION_FILE}",
+        "Standard definition file not accessible",
+    )
+    lines = make_lines(standard_definition, args.lines)
+    changed_lines = list(lines)
+    rng = random.Random(0)
+    replacements = make_lines(standard_definition, args.lines, seed=1)
+    for index in rng.sample(range(args.lines), args.changed):
+        changed_lines[index] = replacements[index]
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        report_paths = []
+        for name, run_lines in (("old", lines), ("new", changed_lines)):
+            input_path = f"{output_dir}/{name}.txt"
+            with open(input_path, "w") as writer:
+                writer.writelines(run_lines)
+            report_paths.append(f"{output_dir}/{name}.csv")
+            Generator().generate_analyses_from_input_file(
+                input_path,
+                f"{output_dir}/{name}_summary.txt",
+                report_paths[-1],
+                standard_definition,
+                summary=False,
+            )
+
+        def run(use_manifests):
+            tracemalloc.start()
+            start = time.perf_counter()
+            diff = diff_reports(*report_paths, use_manifests=use_manifests)
+            seconds = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            return diff, seconds, peak
+
+        lockstep, lockstep_seconds, lockstep_peak = run(False)
+        start = time.perf_counter()
+        for path in report_paths:
+            ReportManifest.build(path).save()
+        build_seconds = time.perf_counter() - start
+        chunked, chunked_seconds, chunked_peak = run(True)
+
+    assert chunked.transitions == lockstep.transitions
+    print(f"{args.lines} lines, {lockstep.changed()} tokens changed")
+    print(
+        f"{'lockstep':>10}: {lockstep_seconds:.3f}s, "
+        f"peak {lockstep_peak / 2**10:.0f} KiB"
+    )
+    print(
+        f"{'manifests':>10}: {chunked_seconds:.3f}s, "
+        f"peak {chunked_peak / 2**10:.0f} KiB, "
+        f"{chunked.chunks_skipped} chunks skipped "
+        f"(building both manifests: {build_seconds:.3f}s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Compares the validation engines on batches of synthetic lines.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_engines [--lines 200000] [--batch-size 10000]
+"""
+import argparse
+import logging
+import pathlib
+import timeit
+
+from benchmarks.synthetic import make_lines
+from classes.batch_line_processor import BatchLineProcessor
+from classes.codegen_line_processor import CodegenBatchLineProcessor
+from classes.token_processor import determine_datatype
+from utils import load_json_from_path
+
+BASE_DIR = pathlib.Path(__file__).parent.parent.resolve()
+STANDARD_DEFINITION_FILE = "standard_definition.json"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=200_000)
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    # Overflowing lines are logged per line without an aggregator.
+    logging.disable(logging.WARNING)
+    standard_definition = load_json_from_path(
+        f"{BASE_DIR}/{STANDARD_DEFINITION_FILE}",
+        "Standard definition file not accessible",
+    )
+    lines = make_lines(standard_definition, args.lines)
+    batches = [
+        lines[i : i + args.batch_size] for i in range(0, len(lines), args.batch_size)
+    ]
+
+    processors = {
+        "python": BatchLineProcessor(standard_definition),
+        "codegen": CodegenBatchLineProcessor(standard_definition),
+    }
+    try:
+        from classes.numpy_line_processor import NumpyBatchLineProcessor
+
+        processors["numpy"] = NumpyBatchLineProcessor(standard_definition)
+    except ImportError:
+        print("numpy is not installed, skipping the numpy engine")
+
+    print(f"{args.lines} lines in batches of {args.batch_size}")
+    baseline = None
+    for name, processor in processors.items():
+        seconds = min(
+            timeit.repeat(
+                lambda: [processor.process_batch(batch) for batch in batches],
+                number=1,
+                repeat=args.repeat,
+            )
+        )
+        baseline = baseline or seconds
+        print(
+            f"{name:>8}: {seconds:.3f}s "
+            f"({args.lines / seconds:,.0f} lines/s, x{baseline / seconds:.1f})"
+        )
+
+    # The validation stage alone (lengths, data types and error codes, but
+    # no result dictionaries) on lines already grouped by section.
+    grouped, grouped_lines = {}, {}
+    for line in lines[: args.batch_size]:
+        tokens = line.split("&")
+        grouped.setdefault(tokens[0], []).append(tokens[1:])
+        grouped_lines.setdefault(tokens[0], []).append(line)
+    python_processor = processors["python"]
+
+    def validate_with_python():
+        for lx, section_tokens in grouped.items():
+            sub_sections = python_processor.sections[lx]
+            for line_tokens in section_tokens:
+                for sub_section, token in zip(sub_sections, line_tokens):
+                    token = token.strip()
+                    length = len(token)
+                    datatype_isvalid = (
+                        determine_datatype(token) == sub_section.data_type
+                    )
+                    len_isvalid = 0 < length <= sub_section.max_length
+                    (len_isvalid, datatype_isvalid)
+
+    stages = {"python": validate_with_python}
+    if "numpy" in processors:
+        stages["numpy"] = lambda: [
+            processors["numpy"].validate_section(lx, section_lines)
+            for lx, section_lines in grouped_lines.items()
+        ]
+    print(f"validation stage only, {args.batch_size} lines")
+    baseline = None
+    for name, stage in stages.items():
+        seconds = min(timeit.repeat(stage, number=1, repeat=args.repeat))
+        baseline = baseline or seconds
+        print(
+            f"{name:>8}: {seconds:.3f}s "
+            f"({args.batch_size / seconds:,.0f} lines/s, x{baseline / seconds:.1f})"
+        )
+
+
+if __name__ == "__main__":
+    main()
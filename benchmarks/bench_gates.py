@@ -0,0 +1,79 @@
+"""Measures how early quality gates stop a run on a bad feed.
+
+Synthetic lines (which hold a share of every error code) are processed in
+full, with a quality gate that never trips (to measure the cost of checking
+gates), then with a quality gate on the rate of E04 and E05 tokens set below
+their actual rate (--max-rate), which the feed breaches from the start.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_gates [--lines 200000] [--max-rate 0.02]
+"""
+import argparse
+import logging
+import pathlib
+import tempfile
+import time
+
+from benchmarks.synthetic import make_lines
+from classes.custom_errors import QualityGateError
+from classes.generator import Generator
+from classes.quality_gates import QualityGate
+from utils import load_json_from_path, remove_file_if_exists
+
+BASE_DIR = pathlib.Path(__file__).parent.parent.resolve()
+STANDARD_DEFINITION_FILE = "standard_definition.json"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=200_000)
+    parser.add_argument("--max-rate", type=float, default=0.02)
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    standard_definition = load_json_from_path(
+        f"{BASE_DIR}/{STANDARD_DEFINITION_FILE}",
+        "Standard definition file not accessible",
+    )
+    with tempfile.TemporaryDirectory() as output_dir:
+        input_path = f"{output_dir}/input_file.txt"
+        with open(input_path, "w") as writer:
+            writer.writelines(make_lines(standard_definition, args.lines))
+
+        def run(quality_gates):
+            for name in ("summary.txt", "report.csv"):
+                remove_file_if_exists(f"{output_dir}/{name}")
+            start = time.perf_counter()
+            Generator().generate_analyses_from_input_file(
+                input_path,
+                f"{output_dir}/summary.txt",
+                f"{output_dir}/report.csv",
+                standard_definition,
+                quality_gates=quality_gates,
+            )
+            return time.perf_counter() - start
+
+        full_seconds = run(None)
+        checked_seconds = run([QualityGate(("E04", "E05"), max_rate=1.0)])
+        start = time.perf_counter()
+        try:
+            run([QualityGate(("E04", "E05"), max_rate=args.max_rate)])
+        except QualityGateError as error:
+            tripped = error
+        gated_seconds = time.perf_counter() - start
+
+    print(f"{args.lines} lines")
+    print(f"{'full pass':>12}: {full_seconds:.3f}s")
+    print(
+        f"{'gate passed':>12}: {checked_seconds:.3f}s "
+        f"({(checked_seconds / full_seconds - 1) * 100:+.1f}%)"
+    )
+    print(
+        f"{'gated':>12}: {gated_seconds:.3f}s (x{full_seconds / gated_seconds:.0f} "
+        f"faster), {tripped.message}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Measures peak memory and run time under several memory budgets.
+
+Synthetic lines are processed with Generator.iter_line_data_chunks, with
+chunks of up to --chunk-size lines and a MemoryBudget of each --limits value
+(in MiB, "none" for an unlimited budget that still measures memory). Memory
+is measured with tracemalloc, which is exact but slows every run down alike.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_memory [--lines 50000] [--limits none 64 16 4]
+"""
+import argparse
+import logging
+import pathlib
+import tempfile
+import time
+
+from benchmarks.synthetic import make_lines
+from classes.generator import Generator
+from classes.memory_budget import MemoryBudget
+from classes.overflow_warnings import TokenOverflowWarnings
+from utils import load_json_from_path
+
+BASE_DIR = pathlib.Path(__file__).parent.parent.resolve()
+STANDARD_DEFINITION_FILE = "standard_definition.json"
+MIB = 1 << 20
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=50_000)
+    parser.add_argument("--chunk-size", type=int, default=10_000)
+    parser.add_argument("--limits", nargs="+", default=["none", "64", "16", "4"])
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    standard_definition = load_json_from_path(
+        f"{BASE_DIR}/{STANDARD_DEFINITION_FILE}",
+        "Standard definition file not accessible",
+    )
+    with tempfile.TemporaryDirectory() as output_dir:
+        input_path = f"{output_dir}/input_file.txt"
+        with open(input_path, "w") as writer:
+            writer.writelines(make_lines(standard_definition, args.lines))
+
+        print(f"{args.lines} lines, chunks of up to {args.chunk_size} lines")
+        for limit in args.limits:
+            limit_bytes = 1 << 62 if limit == "none" else int(float(limit) * MIB)
+            budget = MemoryBudget(limit_bytes, method="tracemalloc")
+            generator = Generator(chunk_size=args.chunk_size, memory_budget=budget)
+            start = time.perf_counter()
+            chunks = 0
+            for _ in generator.iter_line_data_chunks(
+                input_path,
+                standard_definition,
+                overflow_warnings=TokenOverflowWarnings(),
+            ):
+                chunks += 1
+            seconds = time.perf_counter() - start
+            peak = (budget.peak_bytes - budget.baseline_bytes) / MIB
+            print(
+                f"{limit:>6} MiB: {seconds:.3f}s, {chunks:>5} chunks, "
+                f"peak {peak:.1f} MiB, {budget.degradations} degradations"
+            )
+
+
+if __name__ == "__main__":
+    main()
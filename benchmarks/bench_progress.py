@@ -0,0 +1,79 @@
+"""Measures the overhead of the progress reporter on a full run.
+
+A synthetic input file is processed with Generator.generate_analyses_from_input_file,
+with and without a ProgressReporter (publishing to a discarded stream and to a
+metrics file every --interval seconds), keeping the best of --repeat runs.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_progress [--lines 100000] [--interval 0.1]
+"""
+import argparse
+import io
+import logging
+import pathlib
+import tempfile
+import time
+
+from benchmarks.synthetic import make_lines
+from classes.generator import Generator
+from classes.progress_reporter import ProgressReporter
+from utils import load_json_from_path
+
+BASE_DIR = pathlib.Path(__file__).parent.parent.resolve()
+STANDARD_DEFINITION_FILE = "standard_definition.json"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=100_000)
+    parser.add_argument("--interval", type=float, default=0.1)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    standard_definition = load_json_from_path(
+        f"{BASE_DIR}/{STANDARD_DEFINITION_FILE}",
+        "Standard definition file not accessible",
+    )
+    with tempfile.TemporaryDirectory() as output_dir:
+        input_path = f"{output_dir}/input_file.txt"
+        with open(input_path, "w") as writer:
+            writer.writelines(make_lines(standard_definition, args.lines))
+
+        def run(with_reporter):
+            reporter = None
+            if with_reporter:
+                reporter = ProgressReporter(
+                    interval=args.interval,
+                    stream=io.StringIO(),
+                    metrics_path=f"{output_dir}/progress.prom",
+                )
+            start = time.perf_counter()
+            Generator().generate_analyses_from_input_file(
+                input_path,
+                f"{output_dir}/summary.txt",
+                f"{output_dir}/report.csv",
+                standard_definition,
+                progress_reporter=reporter,
+            )
+            return time.perf_counter() - start
+
+        timings = {}
+        for _ in range(args.repeat):
+            for with_reporter in (False, True):
+                seconds = run(with_reporter)
+                timings[with_reporter] = min(
+                    timings.get(with_reporter, seconds), seconds
+                )
+
+    print(f"{args.lines} lines, reports every {args.interval:g}s")
+    print(f"{'no reporter':>14}: {timings[False]:.3f}s")
+    print(
+        f"{'reporter':>14}: {timings[True]:.3f}s "
+        f"({(timings[True] / timings[False] - 1) * 100:+.1f}%)"
+    )
+
+
+if __name__ == "__main__":
+    main()
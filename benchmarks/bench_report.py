@@ -0,0 +1,104 @@
+"""Compares the precompiled report serializer with csv.DictWriter.
+
+Synthetic lines are validated once, then their report is written three
+ways: line by line with Generator.generate_report (which reopens the file
+and builds a csv.DictWriter for every line), with one csv.DictWriter on a
+file held open, and with a ReportSerializer (fixed fields pre-rendered per
+sub-section, one string per chunk). The three reports are checked to be
+byte-identical.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_report [--lines 100000] [--chunk-size 1000]
+"""
+import argparse
+import csv
+import logging
+import pathlib
+import tempfile
+import time
+
+from benchmarks.synthetic import make_lines
+from classes.batch_line_processor import BatchLineProcessor
+from classes.generator import Generator
+from classes.report_serializer import ReportSerializer
+from utils import load_json_from_path
+
+BASE_DIR = pathlib.Path(__file__).parent.parent.resolve()
+STANDARD_DEFINITION_FILE = "standard_definition.json"
+
+
+def write_per_line(path, chunks, standard_definition):
+    generator = Generator()
+    for chunk in chunks:
+        for line_data in chunk:
+            generator.generate_report(path, line_data)
+
+
+def write_dict_writer(path, chunks, standard_definition):
+    with open(path, "a", newline="") as report_file:
+        dict_writer = None
+        for chunk in chunks:
+            for line_data in chunk:
+                for item in line_data:
+                    if dict_writer is None:
+                        dict_writer = csv.DictWriter(
+                            report_file, item["report_data"].keys()
+                        )
+                        dict_writer.writeheader()
+                    dict_writer.writerow(item["report_data"])
+
+
+def write_serializer(path, chunks, standard_definition):
+    serializer = ReportSerializer(standard_definition)
+    with open(path, "a", newline="") as report_file:
+        for chunk in chunks:
+            serializer.write_lines(report_file, chunk)
+
+
+WRITERS = {
+    "generate_report per line": write_per_line,
+    "csv.DictWriter": write_dict_writer,
+    "ReportSerializer": write_serializer,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=100_000)
+    parser.add_argument("--chunk-size", type=int, default=1_000)
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    standard_definition = load_json_from_path(
+        f"{BASE_DIR}/{STANDARD_DEFINITION_FILE}",
+        "Standard definition file not accessible",
+    )
+    lines = [line.rstrip("\n") for line in make_lines(standard_definition, args.lines)]
+    processor = BatchLineProcessor(standard_definition)
+    chunks = [
+        processor.process_batch(lines[start : start + args.chunk_size])
+        for start in range(0, len(lines), args.chunk_size)
+    ]
+    rows = sum(len(line_data) for chunk in chunks for line_data in chunk)
+    print(f"{args.lines} lines, {rows} report rows, chunks of {args.chunk_size}")
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        reference = None
+        baseline = None
+        for index, (name, write) in enumerate(WRITERS.items()):
+            path = f"{output_dir}/report_{index}.csv"
+            start = time.perf_counter()
+            write(path, chunks, standard_definition)
+            seconds = time.perf_counter() - start
+            with open(path, "rb") as report_file:
+                content = report_file.read()
+            if reference is None:
+                reference = content
+            assert content == reference, f"{name} differs"
+            baseline = baseline or seconds
+            print(f"{name:>24}: {seconds:.3f}s (x{baseline / seconds:.2f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Measures the grouped report's run time and peak memory per sort limit.
+
+Synthetic lines are processed into the report and the summary in input
+order, then grouped by error code and section with a sort memory limit of
+each --limits value (in MiB). Memory is measured with tracemalloc (the peak
+above the baseline of the run), which slows every run down alike.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_sort [--lines 100000] [--limits 256 16 1]
+"""
+import argparse
+import logging
+import pathlib
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.synthetic import make_lines
+from classes.generator import Generator
+from utils import load_json_from_path, remove_file_if_exists
+
+BASE_DIR = pathlib.Path(__file__).parent.parent.resolve()
+STANDARD_DEFINITION_FILE = "standard_definition.json"
+MIB = 1 << 20
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=100_000)
+    parser.add_argument("--limits", nargs="+", default=["256", "16", "1"])
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    standard_definition = load_json_from_path(
+        f"{BASE_DIR}/{STANDARD_DEFINITION_FILE}",
+        "Standard definition file not accessible",
+    )
+    with tempfile.TemporaryDirectory() as output_dir:
+        input_path = f"{output_dir}/input_file.txt"
+        with open(input_path, "w") as writer:
+            writer.writelines(make_lines(standard_definition, args.lines))
+
+        def run(**kwargs):
+            for name in ("summary.txt", "report.csv"):
+                remove_file_if_exists(f"{output_dir}/{name}")
+            tracemalloc.start()
+            baseline = tracemalloc.get_traced_memory()[0]
+            start = time.perf_counter()
+            Generator().generate_analyses_from_input_file(
+                input_path,
+                f"{output_dir}/summary.txt",
+                f"{output_dir}/report.csv",
+                standard_definition,
+                **kwargs,
+            )
+            seconds = time.perf_counter() - start
+            peak = (tracemalloc.get_traced_memory()[1] - baseline) / MIB
+            tracemalloc.stop()
+            return seconds, peak
+
+        print(f"{args.lines} lines")
+        seconds, peak = run()
+        print(f"{'input order':>12}: {seconds:.3f}s, peak {peak:.1f} MiB")
+        for limit in args.limits:
+            seconds, peak = run(
+                group_by_error_code=True,
+                sort_memory_limit=int(float(limit) * MIB),
+            )
+            print(f"{limit + ' MiB':>12}: {seconds:.3f}s, peak {peak:.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
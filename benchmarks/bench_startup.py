@@ -0,0 +1,94 @@
+"""Measures the time to first output of solution.py, with import breakdowns.
+
+Every scenario runs solution.py, as configured, in a fresh interpreter
+(from a temporary directory, where it writes its `parsed` outputs): it
+loads the standard definition, processes the sample input file and writes
+the analyses. The wall time of the whole process is reported, so
+interpreter startup, imports and definition loading are all included, along
+with the number of modules imported.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_startup [--repeat 10] [--top 15]
+"""
+import argparse
+import os
+import pathlib
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BASE_DIR = pathlib.Path(__file__).parent.parent.resolve()
+SOLUTION_FILE = "solution.py"
+
+# Imports every public class up front, as classes/__init__.py used to, then
+# runs solution.py as a script.
+EAGER_SOLUTION = """
+import runpy
+import classes
+[getattr(classes, name) for name in classes.__all__]
+runpy.run_path({path!r}, run_name="__main__")
+"""
+
+IMPORT_TIME = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def _scenarios():
+    path = f"{BASE_DIR}/{SOLUTION_FILE}"
+    return {
+        "interpreter only": ["-c", "pass"],
+        "eager imports": ["-c", EAGER_SOLUTION.format(path=path)],
+        SOLUTION_FILE: [path],
+    }
+
+
+def _run(arguments, cwd, *options):
+    start = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, *options, *arguments],
+        cwd=cwd,
+        capture_output=True,
+        text=True,
+        check=True,
+        env={**os.environ, "PYTHONPATH": str(BASE_DIR)},
+    )
+    return time.perf_counter() - start, completed.stderr
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        scenarios = _scenarios()
+        # Warm the definition cache (and the OS file cache) once.
+        for arguments in scenarios.values():
+            _run(arguments, work_dir)
+        print(f"median wall time of {args.repeat} runs")
+        for name, arguments in scenarios.items():
+            seconds = statistics.median(
+                _run(arguments, work_dir)[0] for _ in range(args.repeat)
+            )
+            _, stderr = _run(arguments, work_dir, "-X", "importtime")
+            modules = len(IMPORT_TIME.findall(stderr))
+            print(f"{name:>20}: {seconds * 1000:7.1f} ms, {modules} modules")
+
+        for name in ("eager imports", SOLUTION_FILE):
+            _, stderr = _run(scenarios[name], work_dir, "-X", "importtime")
+            imports = [
+                (int(cumulative), len(indent) // 2, module)
+                for _, cumulative, indent, module in IMPORT_TIME.findall(stderr)
+            ]
+            total = sum(cumulative for cumulative, depth, _ in imports if depth == 0)
+            print(f"\n{name}: {total / 1000:.1f} ms of imports, slowest:")
+            for cumulative, depth, module in sorted(imports, reverse=True)[: args.top]:
+                print(f"  {cumulative / 1000:7.1f} ms  {'  ' * depth}{module}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Compares the text summary with the run-length encoded summary.
+
+Synthetic lines are repeated in runs (of --mean-run lines on average, as on
+feeds where consecutive records tend to share their errors) and processed
+once. The time and disk usage of writing their summary are then measured
+for Generator.generate_summary and for RunLengthSummaryWriter.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_summary [--lines 100000] [--mean-run 50]
+"""
+import argparse
+import logging
+import os
+import pathlib
+import random
+import tempfile
+import time
+
+from benchmarks.synthetic import make_lines
+from classes.batch_line_processor import BatchLineProcessor
+from classes.generator import Generator
+from classes.rle_summary import RunLengthSummaryWriter
+from utils import load_json_from_path
+
+BASE_DIR = pathlib.Path(__file__).parent.parent.resolve()
+STANDARD_DEFINITION_FILE = "standard_definition.json"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=100_000)
+    parser.add_argument("--mean-run", type=float, default=50)
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    standard_definition = load_json_from_path(
+        f"{BASE_DIR}/{STANDARD_DEFINITION_FILE}",
+        "Standard definition file not accessible",
+    )
+    rng = random.Random(0)
+    lines = []
+    for line in make_lines(standard_definition, args.lines):
+        lines.extend([line] * (1 + int(rng.expovariate(1 / args.mean_run))))
+        if len(lines) >= args.lines:
+            break
+    data = BatchLineProcessor(standard_definition).process_batch(lines[: args.lines])
+
+    generator = Generator()
+    with tempfile.TemporaryDirectory() as output_dir:
+        summary_path = f"{output_dir}/summary.txt"
+        start = time.perf_counter()
+        for line_data in data:
+            generator.generate_summary(summary_path, line_data)
+        text_seconds = time.perf_counter() - start
+
+        rle_path = f"{output_dir}/summary.rle"
+        start = time.perf_counter()
+        with RunLengthSummaryWriter(rle_path) as writer:
+            writer.write_lines(data)
+        rle_seconds = time.perf_counter() - start
+
+        text_size = os.path.getsize(summary_path)
+        rle_size = os.path.getsize(rle_path)
+    print(f"{len(data)} lines, runs of {args.mean_run:g} lines on average")
+    print(f"{'text':>12}: {text_seconds:.3f}s, {text_size / 1e6:.2f} MB")
+    print(
+        f"{'run-length':>12}: {rle_seconds:.3f}s, {rle_size / 1e6:.2f} MB "
+        f"(x{text_seconds / rle_seconds:.0f} faster, x{text_size / rle_size:.0f} "
+        "smaller)"
+    )
+
+
+if __name__ == "__main__":
+    main()
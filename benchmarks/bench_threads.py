@@ -0,0 +1,92 @@
+"""Measures how the thread and process backends scale with workers.
+
+Synthetic lines are processed with Generator.iter_line_data_chunks by each
+backend, with each --workers count, and the speedup over a single worker is
+reported. Threads only validate lines in parallel on a free-threaded build
+of Python (e.g. python3.13t with PYTHON_GIL=0); on a GIL build, the thread
+backend gives identical results without scaling. Results of every run are
+checked against the single-worker run.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_threads [--lines 200000] [--workers 1 2 4 8]
+"""
+import argparse
+import logging
+import os
+import pathlib
+import sys
+import sysconfig
+import tempfile
+import time
+
+from benchmarks.synthetic import make_lines
+from classes.generator import BACKENDS, Generator
+from classes.overflow_warnings import TokenOverflowWarnings
+from utils import load_json_from_path
+
+BASE_DIR = pathlib.Path(__file__).parent.parent.resolve()
+STANDARD_DEFINITION_FILE = "standard_definition.json"
+
+
+def gil_status():
+    """Describes whether the interpreter runs with the GIL."""
+    if not sysconfig.get_config_var("Py_GIL_DISABLED"):
+        return "GIL build"
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", lambda: True)
+    return "free-threaded build, GIL " + ("on" if is_gil_enabled() else "off")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=200_000)
+    parser.add_argument("--chunk-size", type=int, default=2_000)
+    parser.add_argument("--engine", default="python")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    standard_definition = load_json_from_path(
+        f"{BASE_DIR}/{STANDARD_DEFINITION_FILE}",
+        "Standard definition file not accessible",
+    )
+    print(
+        f"{args.lines} lines, chunks of {args.chunk_size}, {args.engine} engine, "
+        f"{os.cpu_count()} CPUs, {gil_status()}"
+    )
+    with tempfile.TemporaryDirectory() as output_dir:
+        input_path = f"{output_dir}/input_file.txt"
+        with open(input_path, "w") as writer:
+            writer.writelines(make_lines(standard_definition, args.lines))
+
+        reference = None
+        for backend in BACKENDS:
+            baseline = None
+            for workers in args.workers:
+                generator = Generator(
+                    workers,
+                    chunk_size=args.chunk_size,
+                    engine=args.engine,
+                    backend=backend,
+                )
+                start = time.perf_counter()
+                chunks = list(
+                    generator.iter_line_data_chunks(
+                        input_path,
+                        standard_definition,
+                        overflow_warnings=TokenOverflowWarnings(),
+                    )
+                )
+                seconds = time.perf_counter() - start
+                if reference is None:
+                    reference = chunks
+                assert chunks == reference
+                baseline = baseline or seconds
+                print(
+                    f"{backend:>8} x{workers:<2}: {seconds:.3f}s "
+                    f"(speedup x{baseline / seconds:.2f})"
+                )
+
+
+if __name__ == "__main__":
+    main()
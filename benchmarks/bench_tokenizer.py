@@ -0,0 +1,117 @@
+"""Compares scanning tokens in place with splitting lines into substrings.
+
+BatchLineProcessor reads the stripped length and data type of every token
+of an ASCII line from offsets into the classes of its characters
+(scan_tokens), instead of splitting the line and stripping each token.
+Both are run on narrow lines (standard_definition.json) and on wide ones
+(one section of --width sub-sections), checked to agree, and compared on
+time and on memory: with tracemalloc, the memory allocated while processing
+each line that is freed by the time the line is processed (its peak above
+its results, which both share), averaged over the lines.
+Times are the best of --repeat runs.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_tokenizer [--lines 50000] [--width 200]
+"""
+import argparse
+import logging
+import pathlib
+import random
+import time
+import tracemalloc
+
+from benchmarks.synthetic import make_lines
+from classes.batch_line_processor import BatchLineProcessor
+from utils import load_json_from_path
+
+BASE_DIR = pathlib.Path(__file__).parent.parent.resolve()
+STANDARD_DEFINITION_FILE = "standard_definition.json"
+WIDE_TOKENS = ["12", "abc", " ab c ", "x1", "", "hello world", "42 ", "@@", "9999999"]
+
+
+def wide_feed(width, num_lines, seed=0):
+    """Returns a definition with one section of width sub-sections, and
+    num_lines lines for it."""
+    definition = [
+        {
+            "key": "W",
+            "sub_sections": [
+                {"key": f"W{i}", "data_type": "digits", "max_length": 4}
+                for i in range(width)
+            ],
+        }
+    ]
+    rng = random.Random(seed)
+    lines = [
+        "&".join(["W", *(rng.choice(WIDE_TOKENS) for _ in range(width))]) + "\n"
+        for _ in range(num_lines)
+    ]
+    return definition, lines
+
+
+def transient_bytes_per_line(processor, lines):
+    """Returns the average memory allocated while processing a line and
+    freed by the time it is processed (its peak above what it retains, i.e.
+    its results), with tracemalloc."""
+    tracemalloc.start()
+    total = 0
+    for line in lines:
+        tracemalloc.reset_peak()
+        data = processor.process_line(line)
+        current, peak = tracemalloc.get_traced_memory()
+        total += peak - current
+        del data
+    tracemalloc.stop()
+    return total / len(lines)
+
+
+def compare(name, definition, lines, repeat):
+    print(f"{name}: {len(lines)} lines, best of {repeat}")
+    processors = {}
+    for scan_tokens in (False, True):
+        processors[scan_tokens] = BatchLineProcessor(definition)
+        processors[scan_tokens].scan_tokens = scan_tokens
+    assert processors[False].process_batch(lines) == (
+        processors[True].process_batch(lines)
+    )
+    seconds = {scan_tokens: float("inf") for scan_tokens in processors}
+    for _ in range(repeat):
+        for scan_tokens, processor in processors.items():
+            start = time.perf_counter()
+            processor.process_batch(lines)
+            elapsed = time.perf_counter() - start
+            seconds[scan_tokens] = min(seconds[scan_tokens], elapsed)
+    sample = lines[: max(len(lines) // 10, 1)]
+    transient = {
+        scan_tokens: transient_bytes_per_line(processor, sample)
+        for scan_tokens, processor in processors.items()
+    }
+    for scan_tokens in processors:
+        label = "scanned" if scan_tokens else "split"
+        print(
+            f"{label:>10}: {seconds[scan_tokens]:.3f}s, "
+            f"{transient[scan_tokens]:,.0f} transient bytes per line"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=50_000)
+    parser.add_argument("--width", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    standard_definition = load_json_from_path(
+        f"{BASE_DIR}/{STANDARD_DEFINITION_FILE}",
+        "Standard definition file not accessible",
+    )
+    narrow_lines = list(make_lines(standard_definition, args.lines))
+    compare("narrow", standard_definition, narrow_lines, args.repeat)
+    wide_definition, wide_lines = wide_feed(args.width, args.lines // 20)
+    compare(f"wide ({args.width} tokens)", wide_definition, wide_lines, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
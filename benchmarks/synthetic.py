@@ -0,0 +1,55 @@
+import random
+
+from utils import DataTypes
+
+# Characters used to build tokens of each data type.
+ALPHABETS = {
+    DataTypes.DIGITS.value: "0123456789",
+    DataTypes.WORD_CHARACTERS.value: (
+        "abcdefghijklmnopqrstuvwxyz ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+    ),
+    DataTypes.OTHER.value: ".-@#/0123456789abc",
+}
+
+
+def make_lines(standard_definition, num_lines, seed=0):
+    """Returns num_lines random input lines for the standard definition.
+
+    Tokens mostly follow their sub-section's constraints, with a share of
+    wrong data types, over-long tokens, missing tokens and extra tokens so
+    that every error code shows up.
+
+    Args:
+        standard_definition: The loaded standard_definition (a list of dicts).
+        num_lines: The number of lines to generate.
+        seed: The seed of the random number generator.
+
+    Returns:
+        list: The generated lines (str, newline-terminated).
+    """
+    rng = random.Random(seed)
+    sections = [
+        section for section in standard_definition if section.get("sub_sections")
+    ]
+    lines = []
+    for _ in range(num_lines):
+        section = rng.choice(sections)
+        tokens = [section["key"]]
+        for sub_section in section["sub_sections"]:
+            data_type = sub_section["data_type"]
+            if rng.random() < 0.2:
+                data_type = rng.choice(list(ALPHABETS))
+            length = rng.randint(0, sub_section["max_length"] + 2)
+            tokens.append("".join(rng.choices(ALPHABETS[data_type], k=length)))
+        if rng.random() < 0.1 and len(tokens) > 2:
+            tokens.pop()
+        elif rng.random() < 0.1:
+            tokens.append("extra")
+        lines.append("&".join(tokens) + "\n")
+    return lines
+
+
+def write_input_file(path, standard_definition, num_lines, seed=0):
+    """Writes num_lines random input lines to path (see make_lines)."""
+    with open(path, "w") as writer:
+        writer.writelines(make_lines(standard_definition, num_lines, seed))
@@ -1,6 +1,56 @@
 # flake8: noqa
-from classes.custom_errors import LineTokenizationError, StandardDefinitionParseError
-from classes.processor import Processor
-from classes.token_processor import TokenProcessor
-from classes.line_processor import LineProcessor
-from classes.generator import Generator
+import importlib
+
+# Public names are imported lazily, on first access, from the module that
+# defines them: `from classes import Generator` only pays for the modules
+# Generator needs, and a run never imports components it does not use.
+_EXPORTS = {
+    "ColumnarReportFormatError": "classes.custom_errors",
+    "LineIndexError": "classes.custom_errors",
+    "RunLengthSummaryFormatError": "classes.custom_errors",
+    "QualityGateError": "classes.custom_errors",
+    "ReportManifestError": "classes.custom_errors",
+    "DataTypeRuleError": "classes.custom_errors",
+    "LineTokenizationError": "classes.custom_errors",
+    "StandardDefinitionParseError": "classes.custom_errors",
+    "Processor": "classes.processor",
+    "TokenProcessor": "classes.token_processor",
+    "DataTypeClassifier": "classes.datatype_classifier",
+    "BatchLineProcessor": "classes.batch_line_processor",
+    "CompiledDefinition": "classes.batch_line_processor",
+    "CodegenBatchLineProcessor": "classes.codegen_line_processor",
+    "LineProcessor": "classes.line_processor",
+    "ColumnarReportReader": "classes.columnar_report",
+    "ColumnarReportWriter": "classes.columnar_report",
+    "LineIndex": "classes.line_index",
+    "MemoryBudget": "classes.memory_budget",
+    "AutoTuner": "classes.auto_tuner",
+    "ProgressReporter": "classes.progress_reporter",
+    "QualityGate": "classes.quality_gates",
+    "ReportDiff": "classes.report_diff",
+    "ReportManifest": "classes.report_diff",
+    "ReportSerializer": "classes.report_serializer",
+    "RunLengthSummaryWriter": "classes.rle_summary",
+    "SortedReportWriter": "classes.sorted_report",
+    "ErrorRateEstimate": "classes.error_rate_sampler",
+    "DefinitionCache": "classes.definition_cache",
+    "AsyncPipeline": "classes.async_pipeline",
+    "AsyncReportSink": "classes.async_pipeline",
+    "AsyncSummarySink": "classes.async_pipeline",
+    "Generator": "classes.generator",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
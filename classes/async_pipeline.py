@@ -0,0 +1,366 @@
+import asyncio
+import csv
+import itertools
+from collections import deque
+
+from classes.overflow_warnings import DEFAULT_SAMPLE_SIZE, TokenOverflowWarnings
+
+DEFAULT_QUEUE_SIZE = 4
+# Marks the end of the stream on every queue of the pipeline.
+_END = None
+
+
+def _validate_batch(processor, lines, overflow_sample_size):
+    """Processes a batch of lines (in an executor), returning the batch's
+    data and its aggregated overflow warnings."""
+    overflow_warnings = TokenOverflowWarnings(overflow_sample_size)
+    return processor.process_batch(lines, overflow_warnings), overflow_warnings
+
+
+def _read_batch(reader, batch_size):
+    """Reads up to batch_size lines from an open file (in an executor)."""
+    return list(itertools.islice(reader, batch_size))
+
+
+async def _run_in_executor(executor, function, *args):
+    """Runs function(*args) in an executor (None for the event loop's
+    default one) and returns its result.
+
+    A call already handed to a thread cannot be interrupted: if the
+    awaiting task is cancelled meanwhile, the call is waited for before the
+    cancellation propagates, so that the files it uses are never closed
+    under it (e.g. by the cleanup of a cancelled pipeline).
+    """
+    future = asyncio.get_running_loop().run_in_executor(executor, function, *args)
+    try:
+        return await asyncio.shield(future)
+    except asyncio.CancelledError:
+        # Cancelling the pipeline cancels its stages more than once.
+        while not future.done():
+            try:
+                await asyncio.wait([future])
+            except asyncio.CancelledError:
+                pass
+        raise
+
+
+class AsyncReportSink:
+    """The AsyncReportSink class writes a csv report from an asyncio
+    pipeline, one validated batch at a time.
+
+    The file is opened on the first write and kept open until close().
+    Formatting and writing run in the event loop's default executor, so
+    the event loop is never blocked on disk. As with
+    Generator.generate_report, rows are appended and the header is only
+    written to an empty file.
+
+    Attributes:
+        output_path:
+            The path of the report file.
+        serializer:
+            An optional ReportSerializer of the standard definition,
+            rendering whole batches instead of a csv.DictWriter.
+    """
+
+    def __init__(self, output_path, serializer=None):
+        """Inits AsyncReportSink with output_path and serializer."""
+        self.output_path = output_path
+        self.serializer = serializer
+        self._file = None
+        self._dict_writer = None
+
+    def _write(self, chunk):
+        if self.serializer is not None:
+            if self._file is None:
+                self._file = open(self.output_path, "a+", newline="")
+            self.serializer.write_lines(self._file, chunk)
+            return
+        for line_data in chunk:
+            for item in line_data:
+                if self._dict_writer is None:
+                    self._file = open(self.output_path, "a+", newline="")
+                    self._dict_writer = csv.DictWriter(
+                        self._file, item["report_data"].keys()
+                    )
+                    if self._file.tell() == 0:
+                        self._dict_writer.writeheader()
+                self._dict_writer.writerow(item["report_data"])
+
+    def _close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = self._dict_writer = None
+
+    async def write(self, chunk):
+        """Writes the report rows of a batch of lines.
+
+        Args:
+            chunk: A list of lists of dictionaries, each list representing
+            data from a single line.
+
+        Returns:
+
+        Raises:
+
+        """
+        await _run_in_executor(None, self._write, chunk)
+
+    async def close(self):
+        """Flushes and closes the report file."""
+        await _run_in_executor(None, self._close)
+
+
+class AsyncSummarySink:
+    """The AsyncSummarySink class writes a text summary from an asyncio
+    pipeline, one validated batch at a time.
+
+    The file is opened on the first write and kept open until close().
+    Writing runs in the event loop's default executor. As with
+    Generator.generate_summary, messages are appended and every line of
+    the input file is followed by an empty line.
+
+    Attributes:
+        output_path:
+            The path of the summary file.
+    """
+
+    def __init__(self, output_path):
+        """Inits AsyncSummarySink with output_path."""
+        self.output_path = output_path
+        self._file = None
+
+    def _write(self, chunk):
+        if self._file is None:
+            self._file = open(self.output_path, "a+")
+        for line_data in chunk:
+            for item in line_data:
+                self._file.write(f"{item['summary_data']['Error Message']}\n")
+            self._file.write("\n")
+
+    def _close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    async def write(self, chunk):
+        """Writes the summary messages of a batch of lines.
+
+        Args:
+            chunk: A list of lists of dictionaries, each list representing
+            data from a single line.
+
+        Returns:
+
+        Raises:
+
+        """
+        await _run_in_executor(None, self._write, chunk)
+
+    async def close(self):
+        """Flushes and closes the summary file."""
+        await _run_in_executor(None, self._close)
+
+
+class AsyncPipeline:
+    """The AsyncPipeline class validates a stream of lines inside an asyncio
+    event loop, without blocking it.
+
+    Three kinds of stages run as concurrent tasks, chained by bounded
+    asyncio.Queues:
+
+    * a source stage, reading lines (from a file, read in an executor, or
+      from any async iterable) and grouping them into batches;
+    * a validation stage, offloading every batch to an executor. Up to
+      `validators` batches are in flight at once and validated batches are
+      passed on in input order;
+    * one stage per sink (e.g. AsyncReportSink, AsyncSummarySink), each
+      with its own queue, writing batches as they arrive.
+
+    Since every queue holds at most queue_size batches, a slow stage
+    eventually suspends the stages before it (backpressure): the memory
+    held by a pipeline is bounded, however fast its input arrives. If any
+    stage fails, or the task running the pipeline is cancelled, every
+    other stage is cancelled and the sinks are closed before the error
+    propagates. Pipelines share nothing, so many of them (e.g. one per
+    upload) can run concurrently in the same event loop.
+
+    A sink is any object with `async write(chunk)` and `async close()`
+    methods, where chunk is a list holding one list of dictionaries per
+    line (the data contract of LineProcessor.process()).
+
+    Attributes:
+        processor:
+            The BatchLineProcessor (or subclass) validating the batches.
+        sinks:
+            The sinks every validated batch is written to.
+        batch_size:
+            The number of lines validated together as one unit of work.
+        queue_size:
+            The maximum number of batches waiting in each queue.
+        executor:
+            The concurrent.futures.Executor batches are validated in
+            (None for the event loop's default executor). With a process
+            pool, the processor is pickled along with every batch.
+        validators:
+            The maximum number of batches validated at the same time.
+        overflow_warnings:
+            The TokenOverflowWarnings aggregating the warnings for lines
+            with more tokens than LXYs, logged when the pipeline ends.
+    """
+
+    def __init__(
+        self,
+        processor,
+        sinks,
+        batch_size=1000,
+        queue_size=DEFAULT_QUEUE_SIZE,
+        executor=None,
+        validators=1,
+        overflow_sample_size=DEFAULT_SAMPLE_SIZE,
+    ):
+        """Inits AsyncPipeline with a processor, sinks and the sizes of its
+        batches and queues."""
+        self.processor = processor
+        self.sinks = list(sinks)
+        self.batch_size = batch_size
+        self.queue_size = queue_size
+        self.executor = executor
+        self.validators = max(validators, 1)
+        self.overflow_warnings = TokenOverflowWarnings(overflow_sample_size)
+
+    async def _read_file(self, input_path, batches):
+        """Source stage reading the lines of a file, a batch at a time."""
+        reader = await _run_in_executor(None, open, input_path)
+        try:
+            while True:
+                batch = await _run_in_executor(
+                    None, _read_batch, reader, self.batch_size
+                )
+                if not batch:
+                    break
+                await batches.put(batch)
+        finally:
+            reader.close()
+        await batches.put(_END)
+
+    async def _read_lines(self, lines, batches):
+        """Source stage reading lines from an async (or plain) iterable."""
+        batch = []
+        if hasattr(lines, "__aiter__"):
+            async for line in lines:
+                batch.append(line)
+                if len(batch) >= self.batch_size:
+                    await batches.put(batch)
+                    batch = []
+        else:
+            for line in lines:
+                batch.append(line)
+                if len(batch) >= self.batch_size:
+                    await batches.put(batch)
+                    batch = []
+        if batch:
+            await batches.put(batch)
+        await batches.put(_END)
+
+    async def _validate(self, batches, sink_queues):
+        """Validation stage, offloading batches to the executor and passing
+        them on to every sink queue in input order."""
+        loop = asyncio.get_running_loop()
+        sample_size = self.overflow_warnings.sample_size
+        pending = deque()
+
+        async def forward(future):
+            chunk, chunk_warnings = await future
+            self.overflow_warnings.merge(chunk_warnings)
+            for queue in sink_queues:
+                await queue.put(chunk)
+
+        try:
+            while True:
+                batch = await batches.get()
+                if batch is _END:
+                    break
+                pending.append(
+                    loop.run_in_executor(
+                        self.executor,
+                        _validate_batch,
+                        self.processor,
+                        batch,
+                        sample_size,
+                    )
+                )
+                if len(pending) >= self.validators:
+                    await forward(pending.popleft())
+            while pending:
+                await forward(pending.popleft())
+        finally:
+            for future in pending:
+                future.cancel()
+        for queue in sink_queues:
+            await queue.put(_END)
+
+    @staticmethod
+    async def _drain(sink, queue):
+        """Sink stage writing validated batches as they arrive."""
+        while True:
+            chunk = await queue.get()
+            if chunk is _END:
+                return
+            await sink.write(chunk)
+
+    async def _run(self, source):
+        batches = asyncio.Queue(self.queue_size)
+        sink_queues = [asyncio.Queue(self.queue_size) for _ in self.sinks]
+        tasks = [
+            asyncio.ensure_future(source(batches)),
+            asyncio.ensure_future(self._validate(batches, sink_queues)),
+        ] + [
+            asyncio.ensure_future(self._drain(sink, queue))
+            for sink, queue in zip(self.sinks, sink_queues)
+        ]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            # Reached on failure or cancellation too: stop every stage
+            # still running before the sinks are closed. A stage cancelled
+            # while a read or a write runs in a thread only ends once it is
+            # done, so no file is closed while in use.
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            for sink in self.sinks:
+                await sink.close()
+            self.overflow_warnings.log_summary()
+
+    async def run_file(self, input_path):
+        """Validates every line of an input file.
+
+        Args:
+            input_path: Path to the input file (str).
+
+        Returns:
+
+        Raises:
+            LineTokenizationError: Not enough tokens yielded to parse a line
+            into LX sections and LXY subsections.
+            StandardDefinitionParseError: No standard definition sub-sections
+            found for a line's LX section.
+        """
+        await self._run(lambda batches: self._read_file(input_path, batches))
+
+    async def run(self, lines):
+        """Validates every line of an async (or plain) iterable of lines.
+
+        Args:
+            lines: An async iterable (e.g. an async generator) or an
+            iterable of lines.
+
+        Returns:
+
+        Raises:
+            LineTokenizationError: Not enough tokens yielded to parse a line
+            into LX sections and LXY subsections.
+            StandardDefinitionParseError: No standard definition sub-sections
+            found for a line's LX section.
+        """
+        await self._run(lambda batches: self._read_lines(lines, batches))
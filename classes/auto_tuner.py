@@ -0,0 +1,245 @@
+import json
+import os
+import threading
+import time
+
+from classes.batch_line_processor import CompiledDefinition
+from utils import make_dir_if_absent
+
+DEFAULT_MIN_CHUNK_SIZE = 250
+DEFAULT_MAX_CHUNK_SIZE = 16000
+DEFAULT_TRIAL_LINES = 20000
+# Timings of a shared machine easily vary by a few percent between trials.
+DEFAULT_TOLERANCE = 0.1
+# Candidate chunk sizes grow (and worker counts shrink) by this factor.
+STEP = 4
+
+
+def definition_key(standard_definition):
+    """Returns the definition hash of a standard definition (as used to
+    cache its generated validators, see definition_hash)."""
+    from classes.codegen_line_processor import definition_hash
+
+    if not isinstance(standard_definition, CompiledDefinition):
+        standard_definition = CompiledDefinition(standard_definition)
+    return definition_hash(standard_definition.sections, standard_definition.classifier)
+
+
+def _candidates(low, high, factor):
+    """Returns low, low * factor, ... up to high (always included)."""
+    values = []
+    value = low
+    while value < high:
+        values.append(value)
+        value *= factor
+    values.append(high)
+    return values
+
+
+class AutoTuner:
+    """The AutoTuner class chooses the chunk size and the number of workers
+    of a run by measuring its throughput during a warm-up window.
+
+    The warm-up is made of trials, each processing at least trial_lines
+    lines (and two chunks) of the run itself with one setting, timed from
+    the end of the trial's first chunk (which absorbs the switch from the
+    previous setting) to the end of its last. Throughput is measured as
+    the caller consumes chunks, so writing the analyses counts too. The
+    warm-up climbs the chunk size from min_chunk_size up to
+    max_chunk_size (by a factor of STEP) with max_workers workers, then
+    lowers the number of workers from there, each climb stopping once a
+    trial is slower than the best so far by more than tolerance. The
+    fastest setting is kept for the rest of the run.
+
+    With a cache_dir, the chosen setting is saved per definition hash (and
+    per engine and backend), and later runs of the same definition reuse it
+    without a warm-up.
+
+    Attributes:
+        min_chunk_size, max_chunk_size:
+            The bounds of the chunk size.
+        max_workers:
+            The largest number of workers (defaults to the CPU count).
+        trial_lines:
+            The number of lines measured per trial.
+        tolerance:
+            The relative slowdown ending a climb.
+        cache_dir:
+            The directory where chosen settings are saved, or None.
+        chunk_size:
+            The chunk size of the current trial (or the chosen one).
+        workers:
+            The number of workers of the current trial (or the chosen one).
+        trial:
+            The number of the current trial, counting from 0.
+        trials:
+            A list of (chunk_size, workers, lines per second) measured.
+        tuned:
+            True once a setting has been chosen (or loaded).
+        loaded:
+            True if the setting was loaded from the cache.
+    """
+
+    def __init__(
+        self,
+        min_chunk_size=DEFAULT_MIN_CHUNK_SIZE,
+        max_chunk_size=DEFAULT_MAX_CHUNK_SIZE,
+        max_workers=None,
+        trial_lines=DEFAULT_TRIAL_LINES,
+        tolerance=DEFAULT_TOLERANCE,
+        cache_dir=None,
+    ):
+        """Inits AutoTuner with its bounds, trial_lines, tolerance and
+        cache_dir.
+
+        Raises:
+            ValueError: A bound is not a positive integer, or a lower bound
+            is above its upper bound.
+        """
+        max_workers = max_workers or os.cpu_count() or 1
+        if not 0 < min_chunk_size <= max_chunk_size or max_workers < 1:
+            raise ValueError(
+                f"Invalid bounds: chunk sizes {min_chunk_size}-{max_chunk_size}, "
+                f"{max_workers} workers."
+            )
+        self.min_chunk_size = min_chunk_size
+        self.max_chunk_size = max_chunk_size
+        self.max_workers = max_workers
+        self.trial_lines = trial_lines
+        self.tolerance = tolerance
+        self.cache_dir = cache_dir
+        self._key = self._variant = None
+        self.start()
+
+    def _clamp(self, chunk_size, workers):
+        chunk_size = min(max(chunk_size, self.min_chunk_size), self.max_chunk_size)
+        return chunk_size, min(max(workers, 1), self.max_workers)
+
+    def _begin_trial(self, chunk_size, workers):
+        self.chunk_size, self.workers = chunk_size, workers
+        self.trial += 1
+        self._trial_start = None
+        self._trial_lines = self._trial_chunks = 0
+
+    def start(self, standard_definition=None, variant=""):
+        """Starts tuning a run, reusing the setting saved for the standard
+        definition and variant (e.g. "python/process") if any.
+
+        Args:
+            standard_definition: The loaded standard_definition, or None.
+            variant: A string naming the engine and backend of the run.
+
+        Returns:
+
+        Raises:
+
+        """
+        self.trial = -1
+        self.trials = []
+        self.tuned = self.loaded = False
+        self._phase = "chunk_size"
+        self._key = self._variant = None
+        if self.cache_dir is not None and standard_definition is not None:
+            self._key, self._variant = definition_key(standard_definition), variant
+            saved = self._read().get(variant)
+            if saved is not None:
+                try:
+                    chunk_size, workers = self._clamp(
+                        int(saved["chunk_size"]), int(saved["workers"])
+                    )
+                except (KeyError, TypeError, ValueError):
+                    pass
+                else:
+                    self._begin_trial(chunk_size, workers)
+                    self.tuned = self.loaded = True
+                    return
+        self._chunk_sizes = _candidates(self.min_chunk_size, self.max_chunk_size, STEP)
+        self._begin_trial(self._chunk_sizes.pop(0), self.max_workers)
+
+    def cache_path(self):
+        """Returns the path of the saved settings of the current definition
+        hash."""
+        return os.path.join(self.cache_dir, f"{self._key}.json")
+
+    def _read(self):
+        try:
+            with open(self.cache_path()) as cache_file:
+                saved = json.load(cache_file)
+        except (OSError, ValueError):
+            return {}
+        return saved if isinstance(saved, dict) else {}
+
+    def stop(self):
+        """Ends the run, saving the chosen setting if it was tuned (and not
+        loaded) with a cache_dir. A warm-up cut short by the end of the
+        input saves nothing."""
+        if self._key is None or not self.tuned or self.loaded:
+            return
+        saved = self._read()
+        saved[self._variant] = self.settings
+        make_dir_if_absent(self.cache_dir)
+        path = self.cache_path()
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, "w") as cache_file:
+            json.dump(saved, cache_file, indent=2)
+        os.replace(temp_path, path)
+
+    @property
+    def settings(self):
+        """The current setting, as a dict (with the throughput measured for
+        it, if any)."""
+        rates = [
+            rate
+            for chunk_size, workers, rate in self.trials
+            if (chunk_size, workers) == (self.chunk_size, self.workers)
+        ]
+        return {
+            "chunk_size": self.chunk_size,
+            "workers": self.workers,
+            "lines_per_second": round(max(rates), 1) if rates else None,
+        }
+
+    def observe(self, trial, num_lines):
+        """Records that the caller is done with a chunk.
+
+        Args:
+            trial: The value of trial when the chunk was read (chunks read
+            during an earlier trial are ignored).
+            num_lines: The number of lines in the chunk.
+
+        Returns:
+
+        Raises:
+
+        """
+        if self.tuned or trial != self.trial:
+            return
+        now = time.perf_counter()
+        if self._trial_start is None:
+            self._trial_start = now
+            return
+        self._trial_lines += num_lines
+        self._trial_chunks += 1
+        if self._trial_lines >= self.trial_lines and self._trial_chunks >= 2:
+            rate = self._trial_lines / max(now - self._trial_start, 1e-9)
+            self._next_trial(rate)
+
+    def _next_trial(self, rate):
+        """Records the throughput of the current trial and moves on to the
+        next one (or to the fastest setting, once the warm-up is over)."""
+        best_rate = max((best for _, _, best in self.trials), default=0)
+        self.trials.append((self.chunk_size, self.workers, rate))
+        climbing = rate >= best_rate * (1 - self.tolerance)
+        if self._phase == "chunk_size":
+            if climbing and self._chunk_sizes:
+                self._begin_trial(self._chunk_sizes.pop(0), self.workers)
+                return
+            self._phase = "workers"
+            climbing = True
+        if climbing and self.workers > 1:
+            chunk_size = max(self.trials, key=lambda trial: trial[2])[0]
+            self._begin_trial(chunk_size, max(self.workers // STEP, 1))
+            return
+        chunk_size, workers, _ = max(self.trials, key=lambda trial: trial[2])
+        self._begin_trial(chunk_size, workers)
+        self.tuned = True
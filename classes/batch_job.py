@@ -0,0 +1,248 @@
+import collections
+import glob
+import json
+import logging
+import os
+import time
+
+from classes.batch_line_processor import CompiledDefinition
+from classes.custom_errors import Error
+from classes.generator import Generator
+
+BATCH_SUMMARY_FILE = "batch_summary.json"
+REPORT_FILE = "report.csv"
+SUMMARY_FILE = "summary.txt"
+
+# The Generator and compiled definition of a worker process, set once per
+# worker by _init_batch_worker so every file it processes shares them.
+_batch_generator = None
+_batch_definition = None
+
+
+def expand_inputs(inputs):
+    """Returns the input files named by a directory or a glob pattern.
+
+    Args:
+        inputs: A directory (every file directly inside it is an input),
+        a glob pattern (e.g. "incoming/*.txt", "**" is recursive) or a
+        list of those.
+
+    Returns:
+        list: The paths of the input files, sorted and without duplicates.
+
+    Raises:
+
+    """
+    if isinstance(inputs, (str, os.PathLike)):
+        inputs = [inputs]
+    paths = set()
+    for pattern in inputs:
+        pattern = os.fspath(pattern)
+        if os.path.isdir(pattern):
+            pattern = os.path.join(glob.escape(pattern), "*")
+        paths.update(
+            path for path in glob.glob(pattern, recursive=True) if os.path.isfile(path)
+        )
+    return sorted(paths)
+
+
+def schedule(paths):
+    """Orders input files largest first.
+
+    Handing the largest files to the pool first keeps a long file from
+    starting last and running alone once every other file is done
+    (longest-processing-time-first scheduling).
+
+    Args:
+        paths: The paths of the input files.
+
+    Returns:
+        list: The paths, by decreasing size (then by path).
+
+    Raises:
+
+    """
+    return sorted(paths, key=lambda path: (-os.path.getsize(path), path))
+
+
+def output_dirs(paths, output_dir):
+    """Returns the output directory of every input file: its path relative
+    to the deepest directory holding all inputs, under output_dir (e.g.
+    `<output_dir>/day1/input_file.txt/`)."""
+    if not paths:
+        return {}
+    root = os.path.commonpath([os.path.dirname(os.path.abspath(p)) for p in paths])
+    return {
+        path: os.path.join(output_dir, os.path.relpath(os.path.abspath(path), root))
+        for path in paths
+    }
+
+
+def _init_batch_worker(definition, engine, chunk_size, overflow_sample_size):
+    """Sets up the Generator of a worker process. Worker processes rebuild
+    the compiled definition from its primitives, without parsing or
+    compiling the definition again."""
+    global _batch_generator, _batch_definition
+    if not isinstance(definition, CompiledDefinition):
+        definition = CompiledDefinition.from_primitives(definition)
+    _batch_definition = definition
+    _batch_generator = Generator(
+        chunk_size=chunk_size,
+        overflow_sample_size=overflow_sample_size,
+        engine=engine,
+    )
+
+
+class _FileCounter:
+    """Counts the lines, tokens and error codes of one input file, in the
+    calling process.
+
+    generate_analyses_from_input_file drives it as it would a
+    ProgressReporter (see progress_reporter), but nothing is reported while
+    the file is processed, so no reporting thread is started per file.
+    """
+
+    def __init__(self):
+        self.total_bytes = None
+        self.lines = 0
+        self.tokens = 0
+        self.error_codes = collections.Counter()
+
+    def follow(self, input_path, start_line=0, line_index=None):
+        pass
+
+    def start(self):
+        pass
+
+    def submit(self, lines, chunk):
+        self.lines += len(lines)
+        for line_data in chunk:
+            self.tokens += len(line_data)
+            self.error_codes.update(
+                item["report_data"]["Error Code"] for item in line_data
+            )
+
+    def close(self):
+        pass
+
+
+def _process_file(input_path, file_output_dir, report, summary):
+    """Writes the analyses of one input file, returning its statistics
+    (its bytes being the size of the file, as set by the generator).
+
+    Errors reading or validating the file (OSError, UnicodeDecodeError and
+    the errors of custom_errors) are recorded in the statistics instead of
+    being raised, so one unreadable file does not stop the rest of the
+    batch. Other exceptions are bugs, and are raised.
+    """
+    counter = _FileCounter()
+    started = time.perf_counter()
+    error = None
+    try:
+        os.makedirs(file_output_dir, exist_ok=True)
+        for name in (REPORT_FILE, SUMMARY_FILE):
+            path = os.path.join(file_output_dir, name)
+            if os.path.exists(path):
+                os.remove(path)
+        _batch_generator.generate_analyses_from_input_file(
+            input_path,
+            os.path.join(file_output_dir, SUMMARY_FILE),
+            os.path.join(file_output_dir, REPORT_FILE),
+            _batch_definition,
+            report=report,
+            summary=summary,
+            progress_reporter=counter,
+        )
+    except (Error, OSError, UnicodeDecodeError) as exception:
+        error = f"{type(exception).__name__}: {exception}"
+    return {
+        "input": input_path,
+        "output_dir": file_output_dir,
+        "lines": counter.lines,
+        "bytes": counter.total_bytes or 0,
+        "tokens": counter.tokens,
+        "error_codes": dict(sorted(counter.error_codes.items())),
+        "seconds": round(time.perf_counter() - started, 6),
+        "error": error,
+    }
+
+
+def _aggregate(files, seconds):
+    """Returns the totals of the statistics of every file."""
+    error_codes = {}
+    for stats in files:
+        for code, count in stats["error_codes"].items():
+            error_codes[code] = error_codes.get(code, 0) + count
+    return {
+        "files": len(files),
+        "failed": sum(stats["error"] is not None for stats in files),
+        "lines": sum(stats["lines"] for stats in files),
+        "bytes": sum(stats["bytes"] for stats in files),
+        "tokens": sum(stats["tokens"] for stats in files),
+        "error_codes": dict(sorted(error_codes.items())),
+        "seconds": round(seconds, 6),
+    }
+
+
+def run_batch(
+    generator,
+    inputs,
+    output_dir,
+    standard_definition,
+    report=True,
+    summary=True,
+):
+    """Writes the analyses of many input files, spread over a pool of
+    generator.workers processes.
+
+    Args:
+        generator: The Generator whose workers, engine, chunk_size and
+        overflow_sample_size are used.
+        inputs: A directory, a glob pattern or a list of those.
+        output_dir: The directory the analyses are written to (str).
+        standard_definition: The loaded standard_definition
+        (either a list of dicts or a CompiledDefinition).
+        report: Boolean to determine if reports should be generated.
+        summary: Boolean to determine if summaries should be generated.
+
+    Returns:
+        dict: The batch summary (also written to
+        `<output_dir>/batch_summary.json`).
+
+    Raises:
+
+    """
+    started = time.perf_counter()
+    paths = schedule(expand_inputs(inputs))
+    file_output_dirs = output_dirs(paths, output_dir)
+    if not isinstance(standard_definition, CompiledDefinition):
+        standard_definition = CompiledDefinition(standard_definition)
+    options = (generator.engine, generator.chunk_size, generator.overflow_sample_size)
+    tasks = [(path, file_output_dirs[path], report, summary) for path in paths]
+    if generator.workers <= 1 or len(paths) <= 1:
+        _init_batch_worker(standard_definition, *options)
+        files = [_process_file(*task) for task in tasks]
+    else:
+        # Imported here: multiprocessing is only needed with several workers.
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(
+            min(generator.workers, len(paths)),
+            initializer=_init_batch_worker,
+            initargs=(standard_definition.to_primitives(), *options),
+        ) as executor:
+            futures = [executor.submit(_process_file, *task) for task in tasks]
+            files = [future.result() for future in futures]
+
+    files.sort(key=lambda stats: stats["input"])
+    for stats in files:
+        if stats["error"] is not None:
+            logging.warning("Could not process %s: %s", stats["input"], stats["error"])
+    batch_summary = {
+        "totals": _aggregate(files, time.perf_counter() - started),
+        "files": files,
+    }
+    os.makedirs(output_dir, exist_ok=True)
+    with open(os.path.join(output_dir, BATCH_SUMMARY_FILE), "w") as writer:
+        json.dump(batch_summary, writer, indent=2)
+    return batch_summary
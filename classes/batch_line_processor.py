@@ -0,0 +1,419 @@
+import logging
+
+from classes.custom_errors import LineTokenizationError, StandardDefinitionParseError
+from classes.datatype_classifier import DATA_TYPES_KEY, DataTypeClassifier
+from classes.overflow_warnings import TokenOverflowWarnings
+from classes.token_processor import determine_datatype
+from utils import DataTypes, ErrorCodes
+
+# Indices into the pre-rendered messages of a compiled sub-section, in the
+# order of the ErrorCodes enum (E01 ... E05).
+E01, E02, E03, E04, E05 = range(5)
+ERROR_CODES = tuple(error_code.value["code"] for error_code in ErrorCodes)
+
+
+def _character_class(char):
+    """Returns the class of a character in CHARACTER_CLASSES."""
+    if char == "&":
+        return "&"
+    if char.isdecimal():
+        return "d"
+    if char.isalpha():
+        return "a"
+    if char.isspace():
+        return " "
+    return "o"
+
+
+# The class of every ASCII character, as far as tokens are concerned: "d" for
+# decimal digits, "a" for letters, " " for whitespace (what str.strip removes),
+# "&" for the separator and "o" for anything else. An ASCII line translated
+# with it is tokenized and classified by offsets (see scan_token), without
+# copying any of its tokens.
+CHARACTER_CLASSES = str.maketrans(
+    {code: _character_class(chr(code)) for code in range(128)}
+)
+
+
+def scan_token(classes, start, end):
+    """Determines the stripped length and the data type of the token in
+    [start, end) of a line translated with CHARACTER_CLASSES, from offsets
+    only (as len(token.strip()) and determine_datatype would).
+
+    Returns:
+        tuple: (stripped length, data type).
+    """
+    while start < end and classes[start] == " ":
+        start += 1
+    while end > start and classes[end - 1] == " ":
+        end -= 1
+    length = end - start
+    if not length:
+        return 0, DataTypes.MISSING.value
+    digits = classes.count("d", start, end)
+    if digits == length:
+        return length, DataTypes.DIGITS.value
+    if not digits and classes.find("o", start, end) < 0:
+        return length, DataTypes.WORD_CHARACTERS.value
+    return length, DataTypes.OTHER.value
+
+
+class SubSection:
+    """The SubSection class holds an LXY sub-section of the standard
+    definition, compiled for repeated use.
+
+    Everything a report row or summary line needs that does not depend on
+    the token itself (including the message of every error code) is
+    rendered once, when the standard definition is compiled.
+
+    Attributes:
+        lx:
+            The LX section the sub-section belongs to.
+        key:
+            The LXY key of the sub-section.
+        data_type:
+            The expected data type of the sub-section's tokens.
+        max_length:
+            The maximum length of the sub-section's tokens.
+        messages:
+            The summary message of each error code, indexed E01 ... E05.
+    """
+
+    __slots__ = ("lx", "key", "data_type", "max_length", "messages")
+
+    def __init__(self, lx, constraint):
+        """Inits SubSection with lx and a sub-section of the definition."""
+        self.lx = lx
+        self.key = constraint["key"]
+        self.data_type = constraint["data_type"]
+        self.max_length = constraint["max_length"]
+        self.messages = tuple(
+            error_code.value["message_template"].format(
+                lx=lx,
+                lxy=self.key,
+                data_type=self.data_type,
+                max_length=self.max_length,
+            )
+            for error_code in ErrorCodes
+        )
+
+    @classmethod
+    def from_fields(cls, lx, key, data_type, max_length, messages):
+        """Rebuilds a SubSection from its fields (e.g. as stored by
+        CompiledDefinition.to_primitives), without rendering messages."""
+        sub_section = cls.__new__(cls)
+        sub_section.lx = lx
+        sub_section.key = key
+        sub_section.data_type = data_type
+        sub_section.max_length = max_length
+        sub_section.messages = tuple(messages)
+        return sub_section
+
+    def to_fields(self):
+        """Returns the fields of the SubSection as a tuple of primitives."""
+        return (self.lx, self.key, self.data_type, self.max_length, self.messages)
+
+
+def compile_sections(standard_definition):
+    """Compiles the standard definition into a dictionary mapping every LX
+    section to a tuple of SubSections.
+
+    As with the lookup performed for every line, the first entry of a
+    section wins. Sections whose sub-sections are absent or malformed are
+    mapped to None so that StandardDefinitionParseError is raised if (and
+    only if) a line of that section is processed. Entries declaring data
+    types (see DataTypeClassifier) are not sections and are skipped.
+
+    Args:
+        standard_definition: The loaded standard_definition (a list of dicts).
+
+    Returns:
+        dict: The compiled sections.
+
+    Raises:
+
+    """
+    sections = {}
+    for item in standard_definition:
+        lx = item.get("key")
+        if not item or DATA_TYPES_KEY in item or lx in sections:
+            continue
+        try:
+            sections[lx] = tuple(
+                SubSection(lx, constraint) for constraint in item["sub_sections"]
+            )
+        except (KeyError, TypeError, AttributeError):
+            sections[lx] = None
+    return sections
+
+
+class CompiledDefinition(list):
+    """The CompiledDefinition class is a standard definition (the list of
+    dicts loaded from JSON) that carries its compiled sections along.
+
+    It can be used wherever a standard definition is expected. Processors
+    built from a CompiledDefinition reuse its sections instead of compiling
+    the definition again, and the whole definition can be turned into
+    primitives (see to_primitives) to be cached on disk.
+
+    Attributes:
+        sections:
+            A dictionary mapping every LX section of the standard definition
+            to a tuple of SubSections (or None if it has no valid
+            sub-sections).
+        classifier:
+            The DataTypeClassifier of the data types the definition
+            declares, or None if it declares none.
+    """
+
+    def __init__(self, standard_definition, sections=None):
+        """Inits CompiledDefinition with standard_definition, compiling it
+        unless its sections are given.
+
+        Raises:
+            DataTypeRuleError: A declared data type is invalid.
+        """
+        super().__init__(standard_definition)
+        self.sections = compile_sections(self) if sections is None else sections
+        # Rebuilt from the definition itself (rather than stored in the
+        # primitives): compiling the fused pattern is cheap.
+        self.classifier = DataTypeClassifier.from_definition(self)
+
+    def to_primitives(self):
+        """Returns the definition and its sections as nested tuples, lists,
+        dicts, strings and numbers only (e.g. for marshal)."""
+        sections = {
+            lx: None
+            if sub_sections is None
+            else tuple(sub_section.to_fields() for sub_section in sub_sections)
+            for lx, sub_sections in self.sections.items()
+        }
+        return list(self), sections
+
+    @classmethod
+    def from_primitives(cls, primitives):
+        """Rebuilds a CompiledDefinition from the output of to_primitives."""
+        standard_definition, sections = primitives
+        return cls(
+            standard_definition,
+            {
+                lx: None
+                if fields is None
+                else tuple(SubSection.from_fields(*field) for field in fields)
+                for lx, fields in sections.items()
+            },
+        )
+
+
+class BatchLineProcessor:
+    """The BatchLineProcessor class processes batches of lines against a
+    standard definition compiled once, up front.
+
+    Unlike LineProcessor and TokenProcessor, no object is created per line
+    or per token: the standard definition is compiled into SubSections when
+    the BatchLineProcessor is built, and process_batch() walks a list of
+    lines, filling in a preallocated list of results. A BatchLineProcessor
+    holds no per-line state, so a single instance can be reused for a whole
+    run (or shared between threads). Results follow the same data contract
+    as LineProcessor.process().
+
+    Tokens are never copied out of ASCII lines: the line is translated to
+    the class of each of its characters (CHARACTER_CLASSES) and the
+    stripped length and data type of every token are read from offsets into
+    it, so a line allocates two strings (its LX section and its classes)
+    instead of one per token. Lines with other characters, or a definition
+    declaring data types (whose rules need the text of a token), are split
+    into tokens instead.
+
+    Attributes:
+        sections:
+            A dictionary mapping every LX section of the standard definition
+            to a tuple of SubSections (or None if it has no valid
+            sub-sections).
+        classifier:
+            The DataTypeClassifier of the data types the definition
+            declares, or None if it only uses the built-in DataTypes.
+        scan_tokens:
+            Whether the tokens of ASCII lines are scanned in place (always
+            False with declared data types).
+    """
+
+    def __init__(self, standard_definition):
+        """Inits BatchLineProcessor by compiling standard_definition (or
+        reusing its sections, for a CompiledDefinition).
+
+        Raises:
+            DataTypeRuleError: A declared data type is invalid.
+        """
+        if isinstance(standard_definition, CompiledDefinition):
+            self.sections = standard_definition.sections
+            self.classifier = standard_definition.classifier
+        else:
+            self.sections = compile_sections(standard_definition)
+            self.classifier = DataTypeClassifier.from_definition(standard_definition)
+        self.scan_tokens = self.classifier is None
+
+    def _tokenize_line(self, line):
+        """Splits a line into its LX section, its sub-sections and its tokens.
+
+        Args:
+            line: A line from the input file.
+
+        Returns:
+            tuple: (lx, tuple of SubSections, list of tokens).
+
+        Raises:
+            LineTokenizationError: Not enough tokens yielded to parse line
+            into LX sections and LXY subsections.
+            StandardDefinitionParseError: No standard definition sub-sections
+            found for the line's LX section.
+        """
+        tokens = line.split("&")
+        if len(tokens) < 2:
+            raise LineTokenizationError(line)
+        lx = tokens[0]
+        sub_sections = self.sections.get(lx)
+        if sub_sections is None:
+            raise StandardDefinitionParseError(lx)
+        return lx, sub_sections, tokens
+
+    def _scan_line(self, line):
+        """Splits an ASCII line into its LX section and its sub-sections,
+        and translates it with CHARACTER_CLASSES, to scan its tokens.
+
+        Args:
+            line: An ASCII line from the input file.
+
+        Returns:
+            tuple: (lx, tuple of SubSections, the classes of the line's
+            characters).
+
+        Raises:
+            LineTokenizationError: Not enough tokens yielded to parse line
+            into LX sections and LXY subsections.
+            StandardDefinitionParseError: No standard definition sub-sections
+            found for the line's LX section.
+        """
+        end = line.find("&")
+        if end < 0:
+            raise LineTokenizationError(line)
+        lx = line[:end]
+        sub_sections = self.sections.get(lx)
+        if sub_sections is None:
+            raise StandardDefinitionParseError(lx)
+        return lx, sub_sections, line.translate(CHARACTER_CLASSES)
+
+    def _warn_overflow(self, line, lx, overflow_warnings):
+        """Records or logs a line with more tokens than LXYs."""
+        if not TokenOverflowWarnings.enabled():
+            return
+        if overflow_warnings is not None:
+            overflow_warnings.record(lx, line)
+        else:
+            logging.warning(
+                "Number of LXYs less than the number of tokens in line %s for %s",
+                line.strip(),
+                lx,
+            )
+            logging.warning(
+                "Scaling the number of tokens back to match the number of LXYs."
+            )
+
+    def process_line(self, line, overflow_warnings=None):
+        """Processes a single line.
+
+        Args:
+            line: A line from the input file.
+            overflow_warnings: An optional TokenOverflowWarnings aggregating
+            the warnings for lines with more tokens than LXYs (by default,
+            they are logged for every such line).
+
+        Returns:
+            data: A list of dictionaries required for all analyses,
+            with each dictionary representing the validation properties
+            and error codes associated with a single token.
+
+        Raises:
+            LineTokenizationError: Not enough tokens yielded to parse line
+            into LX sections and LXY subsections.
+            StandardDefinitionParseError: No standard definition sub-sections
+            found for the line's LX section.
+        """
+        scanned = self.scan_tokens and line.isascii()
+        if scanned:
+            lx, sub_sections, classes = self._scan_line(line)
+            num_tokens = classes.count("&")
+            end = len(lx)
+        else:
+            lx, sub_sections, tokens = self._tokenize_line(line)
+            num_tokens = len(tokens) - 1
+        if len(sub_sections) < num_tokens:
+            self._warn_overflow(line, lx, overflow_warnings)
+        data = [None] * len(sub_sections)
+        classifier = self.classifier
+        for i, sub_section in enumerate(sub_sections):
+            if i < num_tokens:
+                if scanned:
+                    start = end + 1
+                    end = classes.find("&", start)
+                    if end < 0:
+                        end = len(classes)
+                    length, given_data_type = scan_token(classes, start, end)
+                else:
+                    token = tokens[i + 1].strip()
+                    length = len(token)
+                    if classifier is None:
+                        given_data_type = determine_datatype(token)
+                    else:
+                        given_data_type = classifier.datatype(
+                            token, sub_section.data_type
+                        )
+                len_isvalid = 0 < length <= sub_section.max_length
+                datatype_isvalid = given_data_type == sub_section.data_type
+                if len_isvalid:
+                    code = E01 if datatype_isvalid else E02
+                else:
+                    code = E03 if datatype_isvalid else E04
+                given_length = length if length else ""
+            else:
+                # Following the order of the definitions, missing fields are
+                # always the later ones.
+                given_data_type = given_length = ""
+                code = E05
+            data[i] = {
+                "report_data": {
+                    "Section": lx,
+                    "Sub-Section": sub_section.key,
+                    "Given DataType": given_data_type,
+                    "Expected DataType": sub_section.data_type,
+                    "Given Length": given_length,
+                    "Expected MaxLength": sub_section.max_length,
+                    "Error Code": ERROR_CODES[code],
+                },
+                "summary_data": {"Error Message": sub_section.messages[code]},
+            }
+        return data
+
+    def process_batch(self, lines, overflow_warnings=None):
+        """Processes a batch of lines in one call.
+
+        Args:
+            lines: A list (or any sequence) of lines from the input file.
+            overflow_warnings: An optional TokenOverflowWarnings aggregating
+            the warnings for lines with more tokens than LXYs (by default,
+            they are logged for every such line).
+
+        Returns:
+            list: One list of dictionaries per line, in the order of lines.
+
+        Raises:
+            LineTokenizationError: Not enough tokens yielded to parse a line
+            into LX sections and LXY subsections.
+            StandardDefinitionParseError: No standard definition sub-sections
+            found for a line's LX section.
+        """
+        results = [None] * len(lines)
+        process_line = self.process_line
+        for i, line in enumerate(lines):
+            results[i] = process_line(line, overflow_warnings)
+        return results
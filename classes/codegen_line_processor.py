@@ -0,0 +1,277 @@
+import hashlib
+import linecache
+import threading
+
+from classes.batch_line_processor import E01, E02, E03, E04, E05, ERROR_CODES
+from classes.batch_line_processor import BatchLineProcessor
+from utils import DataTypes
+
+# The error codes indexed by `length is valid * 2 + data type is invalid`, the
+# expression every generated validator uses to pick the code of a token.
+CODE_ORDER = (E03, E04, E01, E02)
+
+# The generated validators of every definition compiled so far, keyed by
+# definition_hash: {hash: {lx: validator function}}.
+_validators_cache = {}
+# Serializes the generation of validators, so that threads building
+# processors for the same definition at once share one set of functions.
+_validators_lock = threading.Lock()
+
+# Keys come from the standard definition: they only ever appear in the
+# generated code as repr() literals, never inside other string literals.
+SECTION_TEMPLATE = '''\
+SECTION = {lx!r}
+CODES = {codes!r}
+{messages}
+
+def {name}(tokens):
+    """Validates the tokens of a line of section SECTION.
+
+    Generated from the standard definition {digest}.
+    tokens[0] is the section itself, tokens[1:] are the LXY tokens.
+    """
+    num_tokens = len(tokens)
+{body}
+    return [{rows}]
+'''
+
+SUB_SECTION_TEMPLATE = """\
+    # {key!r}: {data_type!r}, at most {max_length!r} characters
+    if num_tokens > {position}:
+        token = tokens[{position}].strip()
+        length = len(token)
+{datatype}
+        code = (0 < length <= {max_length!r}) * 2 + (data_type != {data_type!r})
+        row_{index} = {{
+            "report_data": {{
+                "Section": {lx!r},
+                "Sub-Section": {key!r},
+                "Given DataType": data_type,
+                "Expected DataType": {data_type!r},
+                "Given Length": length if length else "",
+                "Expected MaxLength": {max_length!r},
+                "Error Code": CODES[code],
+            }},
+            "summary_data": {{"Error Message": MESSAGES_{index}[code]}},
+        }}
+    else:
+        row_{index} = {{
+            "report_data": {{
+                "Section": {lx!r},
+                "Sub-Section": {key!r},
+                "Given DataType": "",
+                "Expected DataType": {data_type!r},
+                "Given Length": "",
+                "Expected MaxLength": {max_length!r},
+                "Error Code": {missing_code!r},
+            }},
+            "summary_data": {{"Error Message": {missing_message!r}}},
+        }}"""
+
+
+# How every generated validator determines the data type of a token: with
+# determine_datatype inlined, or with the DataTypeClassifier of the data types
+# the definition declares (bound to DATATYPE in the generated module).
+BUILTIN_DATATYPE_TEMPLATE = """\
+        # determine_datatype, inlined
+        if not token:
+            data_type = {missing!r}
+        elif token.isdecimal():
+            data_type = {digits!r}
+        elif token.isalpha() or all(c.isalpha() or c.isspace() for c in token):
+            data_type = {word_characters!r}
+        else:
+            data_type = {other!r}"""
+DECLARED_DATATYPE_TEMPLATE = """\
+        # DataTypeClassifier.datatype, with the declared data types
+        data_type = DATATYPE(token, {data_type!r})"""
+
+
+def definition_hash(sections, classifier=None):
+    """Returns a hash identifying compiled sections (as returned by
+    compile_sections) and the classifier of their declared data types, used
+    to cache their generated validators."""
+    fields = sorted(
+        (
+            lx,
+            None
+            if sub_sections is None
+            else tuple(sub_section.to_fields() for sub_section in sub_sections),
+        )
+        for lx, sub_sections in sections.items()
+    )
+    if classifier is not None:
+        fields.append((classifier.names, classifier.pattern.pattern))
+    return hashlib.sha256(repr(fields).encode()).hexdigest()
+
+
+def generate_section_source(lx, sub_sections, name, digest, declared=False):
+    """Returns the Python source of the validator of an LX section.
+
+    Args:
+        lx: The LX section.
+        sub_sections: The section's tuple of SubSections.
+        name: The name of the generated function.
+        digest: The definition hash, quoted in the function's docstring.
+        declared: Boolean, True if the definition declares data types (the
+        generated module then expects their classifier's datatype method
+        as DATATYPE).
+
+    Returns:
+        str: The source of a module defining the function `name`.
+    """
+    messages = "\n".join(
+        f"MESSAGES_{index} = {tuple(sub.messages[code] for code in CODE_ORDER)!r}"
+        for index, sub in enumerate(sub_sections)
+    )
+    datatype_template = (
+        DECLARED_DATATYPE_TEMPLATE if declared else BUILTIN_DATATYPE_TEMPLATE
+    )
+    body = "\n".join(
+        SUB_SECTION_TEMPLATE.format(
+            index=index,
+            position=index + 1,
+            lx=lx,
+            key=sub.key,
+            data_type=sub.data_type,
+            max_length=sub.max_length,
+            missing_code=ERROR_CODES[E05],
+            missing_message=sub.messages[E05],
+            datatype=datatype_template.format(
+                data_type=sub.data_type,
+                missing=DataTypes.MISSING.value,
+                digits=DataTypes.DIGITS.value,
+                word_characters=DataTypes.WORD_CHARACTERS.value,
+                other=DataTypes.OTHER.value,
+            ),
+        )
+        for index, sub in enumerate(sub_sections)
+    )
+    return SECTION_TEMPLATE.format(
+        codes=tuple(ERROR_CODES[code] for code in CODE_ORDER),
+        messages=messages,
+        name=name,
+        lx=lx,
+        digest=digest,
+        body=body,
+        rows=", ".join(f"row_{index}" for index in range(len(sub_sections))),
+    )
+
+
+def compile_validators(sections, classifier=None):
+    """Generates (or fetches from the cache) one validator function per LX
+    section of compiled sections.
+
+    Every generated source is registered with linecache under a
+    `<codegen ...>` file name, so that tracebacks, pdb and
+    inspect.getsource() show the generated code.
+
+    Args:
+        sections: The compiled sections (as returned by compile_sections).
+        classifier: The DataTypeClassifier of the declared data types, or
+        None.
+
+    Returns:
+        dict: Maps every LX section with valid sub-sections to its
+        validator, which takes the tokens of a line (section included) and
+        returns the line's result rows.
+    """
+    digest = definition_hash(sections, classifier)
+    validators = _validators_cache.get(digest)
+    if validators is not None:
+        return validators
+    with _validators_lock:
+        validators = _validators_cache.get(digest)
+        if validators is None:
+            validators = _generate_validators(sections, classifier, digest)
+            _validators_cache[digest] = validators
+    return validators
+
+
+def _generate_validators(sections, classifier, digest):
+    """Generates the validator function of every LX section of compiled
+    sections (see compile_validators)."""
+    validators = {}
+    for position, (lx, sub_sections) in enumerate(sections.items()):
+        if sub_sections is None:
+            continue
+        name = f"validate_section_{position}"
+        source = generate_section_source(
+            lx, sub_sections, name, digest, declared=classifier is not None
+        )
+        filename = f"<codegen {digest[:12]} {lx}>"
+        linecache.cache[filename] = (
+            len(source),
+            None,
+            source.splitlines(keepends=True),
+            filename,
+        )
+        namespace = {}
+        if classifier is not None:
+            namespace["DATATYPE"] = classifier.datatype
+        exec(compile(source, filename, "exec"), namespace)
+        validators[lx] = namespace[name]
+    return validators
+
+
+class CodegenBatchLineProcessor(BatchLineProcessor):
+    """The CodegenBatchLineProcessor class validates lines with Python
+    functions generated from the standard definition.
+
+    Every LX section is turned into one function with the constraints of
+    its sub-sections inlined as constants: no dictionary or SubSection is
+    consulted per token, and the error code is picked by indexing rather
+    than an if/elif chain. Each function takes the tokens of a line and
+    returns its finished result rows in a single straight-line routine.
+    Functions are cached per definition hash, so processors built from the
+    same definition share them, and their source can be inspected with
+    source() (or inspect.getsource()). Results follow the same data
+    contract as LineProcessor.process().
+
+    Attributes:
+        sections:
+            A dictionary mapping every LX section of the standard definition
+            to a tuple of SubSections (or None if it has no valid
+            sub-sections).
+        definition_hash:
+            The hash of the compiled definition the validators belong to.
+        validators:
+            A dictionary mapping every LX section to its generated function.
+    """
+
+    def __init__(self, standard_definition):
+        """Inits CodegenBatchLineProcessor by compiling standard_definition
+        and generating (or fetching) its validators."""
+        super().__init__(standard_definition)
+        self.definition_hash = definition_hash(self.sections, self.classifier)
+        self.validators = compile_validators(self.sections, self.classifier)
+
+    def source(self, lx):
+        """Returns the generated source of the validator of section lx."""
+        validator = self.validators[lx]
+        return "".join(linecache.getlines(validator.__code__.co_filename))
+
+    def process_line(self, line, overflow_warnings=None):
+        """Processes a single line with its section's generated validator.
+
+        Args:
+            line: A line from the input file.
+            overflow_warnings: An optional TokenOverflowWarnings aggregating
+            the warnings for lines with more tokens than LXYs (by default,
+            they are logged for every such line).
+
+        Returns:
+            data: A list of dictionaries required for all analyses,
+            with each dictionary representing the validation properties
+            and error codes associated with a single token.
+
+        Raises:
+            LineTokenizationError: Not enough tokens yielded to parse line
+            into LX sections and LXY subsections.
+            StandardDefinitionParseError: No standard definition sub-sections
+            found for the line's LX section.
+        """
+        lx, sub_sections, tokens = self._tokenize_line(line)
+        if len(sub_sections) < len(tokens) - 1:
+            self._warn_overflow(line, lx, overflow_warnings)
+        return self.validators[lx](tokens)
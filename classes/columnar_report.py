@@ -0,0 +1,333 @@
+import csv
+import json
+import struct
+from array import array
+
+from classes.custom_errors import ColumnarReportFormatError
+from utils import from_little_endian_bytes, to_little_endian_bytes
+
+# The layout of a columnar report file is:
+#
+#   MAGIC | row group 0 | row group 1 | ... | footer (JSON) | footer length | MAGIC
+#
+# Each row group stores every column contiguously as a little-endian array.
+# The footer records the dictionaries used to encode string columns and the
+# byte range of every column chunk, so a reader can seek straight to the
+# columns (and row groups) it needs without touching the rest of the file.
+MAGIC = b"GUACCOL1"
+FOOTER_LENGTH = struct.Struct("<I")
+FORMAT_VERSION = 1
+DEFAULT_ROW_GROUP_SIZE = 65536
+
+# Column order matches the report.csv header. Dictionary encoded columns are
+# stored as unsigned 16-bit codes into the footer dictionary, integer columns
+# as signed 32-bit values (with -1 standing in for an empty length).
+DICTIONARY_COLUMNS = (
+    "Section",
+    "Sub-Section",
+    "Given DataType",
+    "Expected DataType",
+    "Error Code",
+)
+INTEGER_COLUMNS = ("Given Length", "Expected MaxLength")
+COLUMNS = (
+    "Section",
+    "Sub-Section",
+    "Given DataType",
+    "Expected DataType",
+    "Given Length",
+    "Expected MaxLength",
+    "Error Code",
+)
+TYPECODES = {
+    **{column: "H" for column in DICTIONARY_COLUMNS},
+    **{column: "i" for column in INTEGER_COLUMNS},
+}
+MAX_DICTIONARY_SIZE = 2**16
+EMPTY_LENGTH = -1
+
+
+class ColumnarReportWriter:
+    """The ColumnarReportWriter class writes report rows to a compact,
+    column-oriented binary file.
+
+    Rows are buffered column-wise and flushed in fixed-size row groups.
+    String columns (sections, sub-sections, datatypes and error codes)
+    are dictionary-encoded into small integer arrays, and lengths are
+    stored as integer arrays. The footer written on close() describes
+    where every column chunk lives so that ColumnarReportReader can load
+    single columns without parsing the whole file.
+
+    Attributes:
+        output_path:
+            The path of the columnar report file being written.
+        row_group_size:
+            The number of rows buffered before a row group is flushed.
+    """
+
+    def __init__(self, output_path, row_group_size=DEFAULT_ROW_GROUP_SIZE):
+        """Inits ColumnarReportWriter with output_path and row_group_size."""
+        self.output_path = output_path
+        self.row_group_size = row_group_size
+        self._file = open(output_path, "wb")
+        self._file.write(MAGIC)
+        self._dictionaries = {column: {} for column in DICTIONARY_COLUMNS}
+        self._buffers = {column: array(TYPECODES[column]) for column in COLUMNS}
+        self._row_groups = []
+        self._num_rows = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _encode(self, column, value):
+        """Returns the dictionary code for value, registering it if new."""
+        dictionary = self._dictionaries[column]
+        code = dictionary.get(value)
+        if code is None:
+            code = len(dictionary)
+            if code >= MAX_DICTIONARY_SIZE:
+                raise ColumnarReportFormatError(
+                    self.output_path, f"too many distinct values in {column}"
+                )
+            dictionary[value] = code
+        return code
+
+    def write_rows(self, report_rows):
+        """Buffers report rows, flushing full row groups to disk.
+
+        Args:
+            report_rows: An iterable of dictionaries keyed by the report
+            columns (the "report_data" part of the data contract).
+
+        Returns:
+
+        Raises:
+            ColumnarReportFormatError: A dictionary column has more
+            distinct values than can be encoded.
+        """
+        buffers = self._buffers
+        for row in report_rows:
+            for column in DICTIONARY_COLUMNS:
+                buffers[column].append(self._encode(column, row[column]))
+            for column in INTEGER_COLUMNS:
+                value = row[column]
+                buffers[column].append(EMPTY_LENGTH if value == "" else value)
+            if len(buffers["Section"]) >= self.row_group_size:
+                self._flush_row_group()
+
+    def _flush_row_group(self):
+        """Writes the buffered rows as one row group."""
+        num_rows = len(self._buffers["Section"])
+        if num_rows == 0:
+            return
+        chunks = {}
+        for column in COLUMNS:
+            raw = to_little_endian_bytes(self._buffers[column])
+            chunks[column] = [self._file.tell(), len(raw)]
+            self._file.write(raw)
+        self._row_groups.append(
+            {
+                "num_rows": num_rows,
+                "columns": chunks,
+                "error_codes": sorted(set(self._buffers["Error Code"])),
+            }
+        )
+        self._num_rows += num_rows
+        for values in self._buffers.values():
+            del values[:]
+
+    def close(self):
+        """Flushes any buffered rows and writes the footer."""
+        if self._file.closed:
+            return
+        self._flush_row_group()
+        footer = {
+            "version": FORMAT_VERSION,
+            "columns": list(COLUMNS),
+            "num_rows": self._num_rows,
+            "row_group_size": self.row_group_size,
+            "dictionaries": {
+                column: list(dictionary)
+                for column, dictionary in self._dictionaries.items()
+            },
+            "row_groups": self._row_groups,
+        }
+        raw_footer = json.dumps(footer, separators=(",", ":")).encode("utf-8")
+        self._file.write(raw_footer)
+        self._file.write(FOOTER_LENGTH.pack(len(raw_footer)))
+        self._file.write(MAGIC)
+        self._file.close()
+
+
+class ColumnarReportReader:
+    """The ColumnarReportReader class reads a file written by
+    ColumnarReportWriter.
+
+    Only the footer is read on initialisation. Columns are then loaded
+    on demand by seeking to their chunks, row groups that cannot contain
+    a requested error code are skipped entirely, and the whole file can be
+    converted back to the report.csv layout.
+
+    Attributes:
+        input_path:
+            The path of the columnar report file being read.
+        num_rows:
+            The total number of report rows in the file.
+        columns:
+            The report columns, in report.csv header order.
+        dictionaries:
+            The decoded values of every dictionary-encoded column.
+    """
+
+    def __init__(self, input_path):
+        """Inits ColumnarReportReader with input_path and reads the footer."""
+        self.input_path = input_path
+        self._footer = self._read_footer()
+        self.num_rows = self._footer["num_rows"]
+        self.columns = tuple(self._footer["columns"])
+        self.dictionaries = self._footer["dictionaries"]
+
+    def _read_footer(self):
+        """Reads and validates the footer at the end of the file.
+
+        Args:
+
+        Returns:
+            dict: The decoded footer.
+
+        Raises:
+            ColumnarReportFormatError: The file is not a columnar report.
+        """
+        trailer_size = FOOTER_LENGTH.size + len(MAGIC)
+        with open(self.input_path, "rb") as reader:
+            if reader.read(len(MAGIC)) != MAGIC:
+                raise ColumnarReportFormatError(self.input_path, "bad header")
+            reader.seek(0, 2)
+            file_size = reader.tell()
+            if file_size < len(MAGIC) + trailer_size:
+                raise ColumnarReportFormatError(self.input_path, "truncated file")
+            reader.seek(file_size - trailer_size)
+            trailer = reader.read(trailer_size)
+            if trailer[FOOTER_LENGTH.size :] != MAGIC:
+                raise ColumnarReportFormatError(self.input_path, "bad trailer")
+            (footer_length,) = FOOTER_LENGTH.unpack(trailer[: FOOTER_LENGTH.size])
+            reader.seek(file_size - trailer_size - footer_length)
+            footer = json.loads(reader.read(footer_length).decode("utf-8"))
+        if footer.get("version") != FORMAT_VERSION:
+            raise ColumnarReportFormatError(
+                self.input_path, f"unsupported version {footer.get('version')}"
+            )
+        return footer
+
+    def _read_chunk(self, reader, row_group, column):
+        """Reads the raw (still encoded) values of one column chunk."""
+        offset, size = row_group["columns"][column]
+        reader.seek(offset)
+        return from_little_endian_bytes(TYPECODES[column], reader.read(size))
+
+    def _decode(self, column, values):
+        """Decodes an array of stored values into report values."""
+        if column in DICTIONARY_COLUMNS:
+            dictionary = self.dictionaries[column]
+            return [dictionary[code] for code in values]
+        return ["" if value == EMPTY_LENGTH else value for value in values]
+
+    def read_column(self, column):
+        """Loads a single column without reading the other columns.
+
+        Args:
+            column: The name of a report column (e.g. "Error Code").
+
+        Returns:
+            list: The decoded values of the column, in row order.
+
+        Raises:
+            KeyError: The column does not exist.
+        """
+        if column not in TYPECODES:
+            raise KeyError(column)
+        values = []
+        with open(self.input_path, "rb") as reader:
+            for row_group in self._footer["row_groups"]:
+                values.extend(
+                    self._decode(column, self._read_chunk(reader, row_group, column))
+                )
+        return values
+
+    def iter_rows(self, columns=None):
+        """Yields the rows of the report as dictionaries.
+
+        Args:
+            columns: The columns to load (all columns by default).
+
+        Returns:
+            A generator of dictionaries keyed by column name.
+
+        Raises:
+
+        """
+        columns = self.columns if columns is None else tuple(columns)
+        with open(self.input_path, "rb") as reader:
+            for row_group in self._footer["row_groups"]:
+                decoded = [
+                    self._decode(column, self._read_chunk(reader, row_group, column))
+                    for column in columns
+                ]
+                for values in zip(*decoded):
+                    yield dict(zip(columns, values))
+
+    def filter_by_error_code(self, error_code, columns=None):
+        """Yields the rows with the given error code.
+
+        Row groups whose statistics show they hold no row with the error
+        code are skipped without being read. In the remaining row groups,
+        the error code column is read first and the other columns are only
+        decoded for the matching rows.
+
+        Args:
+            error_code: The error code to filter on (e.g. "E04").
+            columns: The columns to load (all columns by default).
+
+        Returns:
+            A generator of dictionaries keyed by column name.
+
+        Raises:
+
+        """
+        columns = self.columns if columns is None else tuple(columns)
+        try:
+            code = self.dictionaries["Error Code"].index(error_code)
+        except ValueError:
+            return
+        with open(self.input_path, "rb") as reader:
+            for row_group in self._footer["row_groups"]:
+                if code not in row_group["error_codes"]:
+                    continue
+                error_codes = self._read_chunk(reader, row_group, "Error Code")
+                matches = [i for i, value in enumerate(error_codes) if value == code]
+                decoded = []
+                for column in columns:
+                    values = self._read_chunk(reader, row_group, column)
+                    decoded.append(self._decode(column, [values[i] for i in matches]))
+                for values in zip(*decoded):
+                    yield dict(zip(columns, values))
+
+    def to_csv(self, output_path):
+        """Converts the columnar report back to the report.csv layout.
+
+        Args:
+            output_path: The path for the csv report to be written.
+
+        Returns:
+
+        Raises:
+
+        """
+        with open(output_path, "w", newline="") as report_file:
+            dict_writer = csv.DictWriter(report_file, self.columns)
+            dict_writer.writeheader()
+            for row in self.iter_rows():
+                dict_writer.writerow(row)
@@ -35,6 +35,11 @@ class LineTokenizationError(Error):
         )
         super().__init__(self.message)
 
+    def __reduce__(self):
+        # Rebuild from the offending line when unpickled (e.g. when the
+        # error is raised in a worker process).
+        return (type(self), (self.line,))
+
 
 class StandardDefinitionParseError(Error):
     """Exception raised for errors in parsing the standard definition file.
@@ -54,3 +59,161 @@ class StandardDefinitionParseError(Error):
         self.lx = lx
         self.message = f"No standard definition sub-sections for {self.lx}"
         super().__init__(self.message)
+
+    def __reduce__(self):
+        return (type(self), (self.lx,))
+
+
+class ColumnarReportFormatError(Error):
+    """Exception raised for errors in reading or writing a columnar report.
+
+    A columnar report is a binary file framed by a magic header and
+    trailer, with a JSON footer describing the dictionary-encoded
+    columns and the row groups. This exception is raised when a file
+    does not follow that layout, or when a column has more distinct
+    values than its dictionary encoding can represent.
+
+    Attributes:
+        path -- The path of the offending columnar report file
+        reason -- Why the file is invalid
+        message -- Description of the error
+    """
+
+    def __init__(self, path, reason):
+        self.path = path
+        self.reason = reason
+        self.message = f"Invalid columnar report {self.path}: {self.reason}."
+        super().__init__(self.message)
+
+    def __reduce__(self):
+        return (type(self), (self.path, self.reason))
+
+
+class LineIndexError(Error):
+    """Exception raised for errors in loading a line-offset index.
+
+    A line-offset index is a sidecar file recording the byte offset of
+    every Nth line of an input file. This exception is raised when the
+    sidecar file is malformed, or when the input file has changed since
+    it was indexed (so that the recorded offsets can no longer be trusted).
+
+    Attributes:
+        path -- The path of the offending sidecar index file
+        reason -- Why the file is invalid
+        message -- Description of the error
+    """
+
+    def __init__(self, path, reason):
+        self.path = path
+        self.reason = reason
+        self.message = f"Invalid line index {self.path}: {self.reason}."
+        super().__init__(self.message)
+
+    def __reduce__(self):
+        return (type(self), (self.path, self.reason))
+
+
+class RunLengthSummaryFormatError(Error):
+    """Exception raised for errors in reading a run-length summary.
+
+    A run-length summary is a text file starting with a header line,
+    followed by one block per run of identical line-level summaries
+    (a `@@ lines <first>-<last> x<count>` line, the run's messages and an
+    empty line). This exception is raised when a file does not follow
+    that layout.
+
+    Attributes:
+        path -- The path of the offending run-length summary file
+        reason -- Why the file is invalid
+        message -- Description of the error
+    """
+
+    def __init__(self, path, reason):
+        self.path = path
+        self.reason = reason
+        self.message = f"Invalid run-length summary {self.path}: {self.reason}."
+        super().__init__(self.message)
+
+    def __reduce__(self):
+        return (type(self), (self.path, self.reason))
+
+
+class QualityGateError(Error):
+    """Exception raised when a quality gate is breached.
+
+    A quality gate limits the number or the share of tokens with some
+    error codes, in the whole input or in one LX section. This exception
+    is raised as soon as a gate is decisively breached, which stops the
+    run at that point of the input.
+
+    Attributes:
+        gate -- Description of the breached gate
+        line -- The (0-based) number of the input line at which it tripped
+        matched -- The number of tokens with the gate's error codes
+        tokens -- The number of tokens the gate applies to
+        message -- Description of the error
+    """
+
+    def __init__(self, gate, line, matched, tokens):
+        self.gate = gate
+        self.line = line
+        self.matched = matched
+        self.tokens = tokens
+        self.message = (
+            f"Quality gate {self.gate} tripped at input line {self.line} "
+            f"({self.matched} of {self.tokens} tokens)."
+        )
+        super().__init__(self.message)
+
+    def __reduce__(self):
+        return (type(self), (self.gate, self.line, self.matched, self.tokens))
+
+
+class ReportManifestError(Error):
+    """Exception raised for errors in loading a report manifest.
+
+    A report manifest is a JSON sidecar file recording the byte range,
+    digest and error-code counts of every chunk of lines of a report.
+    This exception is raised when the sidecar file is malformed, or when
+    the report has changed since the manifest was built.
+
+    Attributes:
+        path -- The path of the offending manifest file
+        reason -- Why the file is invalid
+        message -- Description of the error
+    """
+
+    def __init__(self, path, reason):
+        self.path = path
+        self.reason = reason
+        self.message = f"Invalid report manifest {self.path}: {self.reason}."
+        super().__init__(self.message)
+
+    def __reduce__(self):
+        return (type(self), (self.path, self.reason))
+
+
+class DataTypeRuleError(Error):
+    """Exception raised for errors in compiling the data types declared in
+    the standard definition file.
+
+    Additional data types are declared in an entry of the standard
+    definition holding a "data_types" list, each with a "name" and either
+    a "chars" character class or a "regex". This exception is raised when
+    a declaration is malformed, its name is already taken, or its pattern
+    does not compile (or uses named groups or backreferences).
+
+    Attributes:
+        name -- The name of the offending data type (or None)
+        reason -- Why the declaration is invalid
+        message -- Description of the error
+    """
+
+    def __init__(self, name, reason):
+        self.name = name
+        self.reason = reason
+        self.message = f"Invalid data type {self.name!r}: {self.reason}."
+        super().__init__(self.message)
+
+    def __reduce__(self):
+        return (type(self), (self.name, self.reason))
@@ -0,0 +1,177 @@
+import re
+
+from classes.custom_errors import DataTypeRuleError
+from classes.token_processor import determine_datatype
+from utils import DataTypes
+
+# The key of the standard definition entry declaring additional data types:
+#
+#   {"data_types": [
+#       {"name": "hex", "chars": "0-9A-Fa-f"},
+#       {"name": "iso_date", "regex": "\\d{4}-\\d{2}-\\d{2}"}
+#   ]}
+#
+# "chars" is the body of a regex character class every character of a token
+# must belong to; "regex" must match the whole (stripped) token.
+DATA_TYPES_KEY = "data_types"
+BUILTIN_DATATYPES = frozenset(datatype.value for datatype in DataTypes)
+# Backreferences (\1, (?P=name), (?(1)...)) of a rule would point at the
+# wrong groups once its groups are renumbered in the fused pattern. Escapes
+# are matched as pairs, so that an escaped backslash starts none.
+REFERENCE = re.compile(r"\\[1-9]|\(\?P=|\(\?\(|(\\.)", re.DOTALL)
+
+
+def declared_data_types(standard_definition):
+    """Returns the data type declarations of a standard definition (a
+    list, empty if it declares none)."""
+    declarations = []
+    for item in standard_definition:
+        if isinstance(item, dict) and DATA_TYPES_KEY in item:
+            if not isinstance(item[DATA_TYPES_KEY], list):
+                raise DataTypeRuleError(None, f"{DATA_TYPES_KEY!r} must be a list")
+            declarations.extend(item[DATA_TYPES_KEY])
+    return declarations
+
+
+def _rule_pattern(declaration):
+    """Returns the name and the regex source of one data type declaration.
+
+    Raises:
+        DataTypeRuleError: The declaration is malformed.
+    """
+    if not isinstance(declaration, dict) or not isinstance(
+        declaration.get("name"), str
+    ):
+        raise DataTypeRuleError(None, "a data type needs a string name")
+    name = declaration["name"]
+    if name in BUILTIN_DATATYPES:
+        raise DataTypeRuleError(name, "the name of a built-in data type")
+    if ("chars" in declaration) == ("regex" in declaration):
+        raise DataTypeRuleError(name, "declare exactly one of chars and regex")
+    if "chars" in declaration:
+        source = f"[{declaration['chars']}]+"
+    else:
+        source = f"(?:{declaration['regex']})"
+    try:
+        pattern = re.compile(source)
+    except (re.error, TypeError) as error:
+        raise DataTypeRuleError(name, f"bad pattern ({error})")
+    if pattern.groupindex:
+        raise DataTypeRuleError(name, "named groups are not supported")
+    if any(match[1] is None for match in REFERENCE.finditer(source)):
+        raise DataTypeRuleError(name, "backreferences are not supported")
+    return name, source
+
+
+class DataTypeClassifier:
+    """The DataTypeClassifier class determines the data types of tokens
+    when the standard definition declares data types besides DataTypes.
+
+    Every declared rule is compiled, at load time, into a single fused
+    pattern: an alternation of the rules, in declaration order, each
+    anchored at the end of the token and wrapped in its own capture group.
+    A single match call therefore finds the first declared type a token
+    matches inside the regex engine, and the index of the group that
+    matched names it, instead of a Python loop trying each rule in turn.
+
+    Declared types may overlap each other and the built-in ones (e.g. "12"
+    is both digits and hex), so a token passes the data type validation of
+    a sub-section whenever it matches the expected type. Its given data
+    type is then the expected one; otherwise, it is the first declared
+    type it matches, or its built-in type (see determine_datatype).
+
+    Attributes:
+        names:
+            The names of the declared data types, in declaration order.
+        pattern:
+            The fused compiled pattern.
+        patterns:
+            A dictionary mapping every declared data type to its own
+            compiled pattern (to test a token against an expected type).
+    """
+
+    def __init__(self, declarations):
+        """Inits DataTypeClassifier by compiling a list of data type
+        declarations.
+
+        Raises:
+            DataTypeRuleError: A declaration is malformed, its name is
+            already taken, or its pattern does not compile (or uses named
+            groups or backreferences).
+        """
+        rules = [_rule_pattern(declaration) for declaration in declarations]
+        self.names = tuple(name for name, _ in rules)
+        if len(set(self.names)) < len(self.names):
+            duplicate = next(n for n in self.names if self.names.count(n) > 1)
+            raise DataTypeRuleError(duplicate, "declared more than once")
+        try:
+            self.pattern = re.compile(
+                "|".join(
+                    f"(?P<_dt{index}>{source})\\Z"
+                    for index, (_, source) in enumerate(rules)
+                )
+            )
+        except re.error as error:
+            raise DataTypeRuleError(
+                None, f"the rules do not compile together ({error})"
+            )
+        self.patterns = {name: re.compile(source) for name, source in rules}
+        # The wrapping group of a rule closes after any group of its own, so
+        # match.lastindex is the wrapping group of the rule that matched.
+        self._name_of_group = {
+            self.pattern.groupindex[f"_dt{index}"]: name
+            for index, name in enumerate(self.names)
+        }
+        self._match = self.pattern.match
+        self._fullmatch = {
+            name: pattern.fullmatch for name, pattern in self.patterns.items()
+        }
+
+    @classmethod
+    def from_definition(cls, standard_definition):
+        """Returns the classifier of the data types declared in a standard
+        definition, or None if it declares none."""
+        declarations = declared_data_types(standard_definition)
+        return cls(declarations) if declarations else None
+
+    def matches(self, token):
+        """Returns the names of the declared data types a (stripped) token
+        matches, in declaration order."""
+        if not token:
+            return []
+        return [name for name in self.names if self._fullmatch[name](token)]
+
+    def first_match(self, token):
+        """Returns the first declared data type a (stripped, non-empty)
+        token matches, with a single call of the fused pattern, or None."""
+        match = self._match(token)
+        return None if match is None else self._name_of_group[match.lastindex]
+
+    def datatype(self, token, expected=None):
+        """Determines the given data type of a (stripped) token.
+
+        Args:
+            token: The token.
+            expected: The data type expected by the token's sub-section.
+
+        Returns:
+            A string naming the data type: expected if the token matches
+            it, otherwise the first declared type the token matches, or its
+            built-in type.
+
+        Raises:
+
+        """
+        if not token:
+            return DataTypes.MISSING.value
+        fullmatch = self._fullmatch.get(expected)
+        if fullmatch is None:
+            builtin = determine_datatype(token)
+            if builtin == expected:
+                return builtin
+        elif fullmatch(token):
+            return expected
+        match = self._match(token)
+        if match is not None:
+            return self._name_of_group[match.lastindex]
+        return determine_datatype(token)
@@ -0,0 +1,108 @@
+import hashlib
+import marshal
+import os
+import sys
+import threading
+
+from classes.batch_line_processor import CompiledDefinition
+from utils import ErrorCodes, make_dir_if_absent
+
+# Bumped whenever the layout of CompiledDefinition.to_primitives changes, so
+# that entries written by an older version are ignored.
+CACHE_FORMAT_VERSION = 1
+# Entries hold the error messages of every sub-section, rendered from the
+# ErrorCodes templates: editing a template must miss the cache too.
+MESSAGES_DIGEST = hashlib.sha256(
+    repr([error_code.value for error_code in ErrorCodes]).encode()
+).hexdigest()
+
+
+class DefinitionCache:
+    """The DefinitionCache class keeps compiled standard definitions on
+    disk, keyed by the content hash of the standard definition file.
+
+    Loading a standard definition through the cache skips both parsing
+    the JSON and compiling the definition whenever the same file content
+    has been loaded before: the CompiledDefinition is stored with marshal,
+    which is built into the interpreter and needs no import. Entries are
+    keyed by the SHA-256 of the file's bytes, so editing the file (or
+    switching Python versions, as marshal formats may differ) simply
+    misses the cache, as does editing the error message templates the
+    cached messages were rendered from. Unreadable or corrupt entries are
+    rebuilt.
+
+    Attributes:
+        cache_dir:
+            The directory holding the cached definitions.
+    """
+
+    def __init__(self, cache_dir):
+        """Inits DefinitionCache with cache_dir."""
+        self.cache_dir = cache_dir
+
+    @staticmethod
+    def content_hash(raw):
+        """Returns the cache key of the raw bytes of a definition file."""
+        digest = hashlib.sha256(raw)
+        major, minor = sys.version_info[:2]
+        digest.update(
+            f"{CACHE_FORMAT_VERSION}:{major}.{minor}:{MESSAGES_DIGEST}".encode()
+        )
+        return digest.hexdigest()
+
+    def cache_path(self, digest):
+        """Returns the path of the cache entry of a content hash."""
+        return os.path.join(self.cache_dir, f"{digest}.marshal")
+
+    def _read(self, digest):
+        """Returns the cached CompiledDefinition of a content hash, or None."""
+        try:
+            with open(self.cache_path(digest), "rb") as cache_file:
+                return CompiledDefinition.from_primitives(marshal.load(cache_file))
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+
+    def _write(self, digest, compiled_definition):
+        """Stores a CompiledDefinition, replacing the entry atomically so
+        that concurrent runs (or threads) never read a partial file."""
+        make_dir_if_absent(self.cache_dir)
+        path = self.cache_path(digest)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, "wb") as cache_file:
+            marshal.dump(compiled_definition.to_primitives(), cache_file)
+        os.replace(temp_path, path)
+
+    def load(self, path, error_message):
+        """Loads the standard definition file at path as a
+        CompiledDefinition, from the cache whenever possible.
+
+        Args:
+            path: The path to the standard definition JSON file.
+            error_message: The custom error message to be displayed if the
+            file is not found.
+
+        Returns:
+            CompiledDefinition: The standard definition and its sections.
+
+        Raises:
+            FileNotFoundError with custom error message.
+        """
+        try:
+            with open(path, "rb") as definition_file:
+                raw = definition_file.read()
+        except FileNotFoundError as e:
+            e.strerror = error_message
+            raise e
+        digest = self.content_hash(raw)
+        compiled_definition = self._read(digest)
+        if compiled_definition is None:
+            # Only imported on a cache miss.
+            import json
+
+            compiled_definition = CompiledDefinition(json.loads(raw))
+            try:
+                self._write(digest, compiled_definition)
+            except OSError:
+                # A read-only cache only costs speed.
+                pass
+        return compiled_definition
@@ -0,0 +1,306 @@
+import itertools
+import json
+import math
+import os
+import random
+from statistics import NormalDist
+
+from classes.custom_errors import LineTokenizationError, StandardDefinitionParseError
+from classes.overflow_warnings import TokenOverflowWarnings
+
+DEFAULT_SAMPLE_SIZE = 10_000
+DEFAULT_CONFIDENCE = 0.95
+SAMPLING_METHODS = ("seek", "reservoir")
+# How far back (in bytes) to look for the start of a line at a time.
+BACKTRACK_SIZE = 4096
+
+
+def reservoir_sample(lines, sample_size, rng):
+    """Draws a uniform random sample of lines from a stream, in one pass.
+
+    Uses Algorithm L (Li, 1994): after the reservoir is filled, the number
+    of lines to skip before the next replacement is drawn directly, so the
+    cost of sampling is O(k log(N / k)) random draws for N lines.
+
+    Args:
+        lines: An iterable of lines.
+        sample_size: The number of lines to sample (k).
+        rng: A random.Random.
+
+    Returns:
+        tuple: (list of sampled lines, number of lines in the stream).
+    """
+    lines = iter(lines)
+    reservoir = list(itertools.islice(lines, sample_size))
+    seen = len(reservoir)
+    if seen < sample_size or sample_size == 0:
+        seen += sum(1 for _ in lines)
+        return reservoir, seen
+    w = math.exp(math.log(rng.random()) / sample_size)
+    while True:
+        skip = math.floor(math.log(rng.random()) / math.log(1 - w))
+        skipped = sum(1 for _ in itertools.islice(lines, skip))
+        seen += skipped
+        if skipped < skip:
+            return reservoir, seen
+        line = next(lines, None)
+        if line is None:
+            return reservoir, seen
+        seen += 1
+        reservoir[rng.randrange(sample_size)] = line
+        w *= math.exp(math.log(rng.random()) / sample_size)
+
+
+def _line_containing(reader, offset):
+    """Returns the (raw) line of a binary file containing byte offset."""
+    start = offset
+    while start > 0:
+        block_start = max(start - BACKTRACK_SIZE, 0)
+        reader.seek(block_start)
+        newline = reader.read(start - block_start).rfind(b"\n")
+        if newline >= 0:
+            start = block_start + newline + 1
+            break
+        start = block_start
+    reader.seek(start)
+    return reader.readline()
+
+
+def seek_sample(input_path, sample_size, rng):
+    """Draws random lines of a file by seeking to random byte offsets.
+
+    Every draw picks a byte offset uniformly and returns the line holding
+    it, so lines are drawn with a probability proportional to their length
+    (in bytes, newline included) and with replacement. The length of each
+    drawn line is returned as well, so that estimates can weight every line
+    by 1 / length to undo the bias. Only sample_size lines are read, however
+    large the file is.
+
+    Args:
+        input_path: Path to the input file (str).
+        sample_size: The number of lines to draw.
+        rng: A random.Random.
+
+    Returns:
+        list: (line, length in bytes) pairs.
+    """
+    file_size = os.path.getsize(input_path)
+    if file_size == 0:
+        return []
+    sample = []
+    with open(input_path, "rb") as reader:
+        for _ in range(sample_size):
+            raw = _line_containing(reader, rng.randrange(file_size))
+            sample.append((raw.decode("utf-8", errors="replace"), len(raw)))
+    return sample
+
+
+class ErrorRateEstimate:
+    """The ErrorRateEstimate class estimates error-code rates from a
+    random sample of processed lines.
+
+    Every sampled line has a weight (1 for uniform samples, 1 / length for
+    length-biased samples drawn by seek_sample). Rates are ratio estimates
+    (weighted error codes over weighted tokens), and their confidence
+    intervals come from the linearised (delta-method) variance of the
+    ratio, treating lines as the sampling units. Sampled lines that would
+    make a full run fail (see LineTokenizationError and
+    StandardDefinitionParseError) are counted apart, per error type.
+
+    Attributes:
+        method:
+            The sampling method ("seek" or "reservoir").
+        confidence:
+            The confidence level of the intervals (e.g. 0.95).
+        estimated_lines:
+            The (estimated) number of lines in the input.
+        samples:
+            A list of (weight, section, token count, {error code: count})
+            tuples, one per sampled line.
+        invalid_lines:
+            A dictionary mapping an error type name to the number of sampled
+            lines that raised it.
+    """
+
+    def __init__(self, method, confidence=DEFAULT_CONFIDENCE):
+        """Inits ErrorRateEstimate with method and confidence."""
+        self.method = method
+        self.confidence = confidence
+        self.estimated_lines = 0
+        self.samples = []
+        self.invalid_lines = {}
+
+    def add(self, line_data, weight=1.0):
+        """Adds the data of one sampled line.
+
+        Args:
+            line_data: A list of dictionaries representing data
+            from a single line.
+            weight: The weight of the line in the estimates.
+
+        Returns:
+
+        Raises:
+
+        """
+        codes = {}
+        for item in line_data:
+            code = item["report_data"]["Error Code"]
+            codes[code] = codes.get(code, 0) + 1
+        section = line_data[0]["report_data"]["Section"] if line_data else None
+        self.samples.append((weight, section, len(line_data), codes))
+
+    def add_invalid(self, error, weight=1.0):
+        """Records a sampled line that raised error."""
+        name = type(error).__name__
+        self.invalid_lines[name] = self.invalid_lines.get(name, 0) + 1
+        self.samples.append((weight, None, 0, {}))
+
+    def _interval(self, numerators, denominators):
+        """Returns the ratio of two weighted sums over the samples with
+        its confidence interval, or None if the denominator is zero."""
+        n = len(numerators)
+        total = sum(denominators)
+        if n == 0 or total == 0:
+            return None
+        ratio = sum(numerators) / total
+        spread = 0.0
+        if n > 1:
+            residuals = sum(
+                (y - ratio * x) ** 2 for y, x in zip(numerators, denominators)
+            )
+            z = NormalDist().inv_cdf((1 + self.confidence) / 2)
+            spread = z * math.sqrt(n / (n - 1) * residuals) / total
+        return {
+            "rate": ratio,
+            "low": max(ratio - spread, 0.0),
+            "high": min(ratio + spread, 1.0),
+        }
+
+    def to_dict(self):
+        """Returns the estimates as a JSON-serialisable dictionary: the
+        share of lines per section, and the rate of every error code
+        across all tokens and within every section's tokens."""
+        sections = sorted({s for _, s, _, _ in self.samples if s is not None})
+        codes = sorted({c for *_, line_codes in self.samples for c in line_codes})
+        weights = [w for w, _, _, _ in self.samples]
+        tokens = [w * n for w, _, n, _ in self.samples]
+        estimates = {
+            "method": self.method,
+            "sampled_lines": len(self.samples),
+            "estimated_lines": round(self.estimated_lines),
+            "confidence": self.confidence,
+            "invalid_lines": self.invalid_lines,
+            "error_codes": {
+                code: self._interval(
+                    [
+                        w * line_codes.get(code, 0)
+                        for w, _, _, line_codes in self.samples
+                    ],
+                    tokens,
+                )
+                for code in codes
+            },
+            "sections": {},
+        }
+        for section in sections:
+            in_section = [s == section for _, s, _, _ in self.samples]
+            section_tokens = [
+                x if inside else 0 for x, inside in zip(tokens, in_section)
+            ]
+            estimates["sections"][section] = {
+                "line_share": self._interval(
+                    [w if inside else 0 for w, inside in zip(weights, in_section)],
+                    weights,
+                ),
+                "error_codes": {
+                    code: self._interval(
+                        [
+                            w * line_codes.get(code, 0) if inside else 0
+                            for (w, _, _, line_codes), inside in zip(
+                                self.samples, in_section
+                            )
+                        ],
+                        section_tokens,
+                    )
+                    for code in codes
+                },
+            }
+        return estimates
+
+    def write(self, output_path):
+        """Writes the estimates to output_path as JSON.
+
+        Args:
+            output_path: The path of the JSON file.
+
+        Returns:
+
+        Raises:
+
+        """
+        with open(output_path, "w") as writer:
+            json.dump(self.to_dict(), writer, indent=2)
+            writer.write("\n")
+
+
+def estimate_error_rates(
+    processor,
+    input_path,
+    sample_size=DEFAULT_SAMPLE_SIZE,
+    seed=0,
+    method=None,
+    confidence=DEFAULT_CONFIDENCE,
+):
+    """Estimates the error-code rates of an input file (or stream) from a
+    reproducible random sample of its lines.
+
+    Args:
+        processor: A BatchLineProcessor (or subclass).
+        input_path: Path to the input file (str), or an iterable of lines
+        (e.g. sys.stdin) to be sampled with the "reservoir" method.
+        sample_size: The number of lines to sample.
+        seed: The seed of the random number generator.
+        method: "seek" to draw lines at random byte offsets (regular files
+        only; reads sample_size lines whatever the size of the file) or
+        "reservoir" to sample the lines of a single pass over the input.
+        Defaults to "seek" for regular files and "reservoir" otherwise.
+        confidence: The confidence level of the intervals.
+
+    Returns:
+        ErrorRateEstimate: The estimates.
+
+    Raises:
+        ValueError: The sampling method is unknown.
+    """
+    is_path = isinstance(input_path, (str, os.PathLike))
+    if method is None:
+        method = "seek" if is_path and os.path.isfile(input_path) else "reservoir"
+    if method not in SAMPLING_METHODS:
+        raise ValueError(
+            f"Unknown sampling method {method!r}, expected one of {SAMPLING_METHODS}."
+        )
+    rng = random.Random(seed)
+    estimate = ErrorRateEstimate(method, confidence)
+    if method == "seek":
+        sample = seek_sample(input_path, sample_size, rng)
+        weighted = [(line, 1 / length) for line, length in sample]
+        if weighted:
+            # E[1 / length] over length-biased draws is lines / bytes.
+            mean_weight = sum(w for _, w in weighted) / len(weighted)
+            estimate.estimated_lines = os.path.getsize(input_path) * mean_weight
+    elif is_path:
+        with open(input_path) as reader:
+            lines, estimate.estimated_lines = reservoir_sample(reader, sample_size, rng)
+        weighted = [(line, 1.0) for line in lines]
+    else:
+        lines, estimate.estimated_lines = reservoir_sample(input_path, sample_size, rng)
+        weighted = [(line, 1.0) for line in lines]
+    # Overflowing lines are not logged: the sample is not the full run.
+    overflow_warnings = TokenOverflowWarnings()
+    for line, weight in weighted:
+        try:
+            estimate.add(processor.process_line(line, overflow_warnings), weight)
+        except (LineTokenizationError, StandardDefinitionParseError) as e:
+            estimate.add_invalid(e, weight)
+    return estimate
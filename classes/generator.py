@@ -1,6 +1,73 @@
 import csv
+import itertools
+import os
+import shutil
+from collections import deque
 
-from classes.line_processor import LineProcessor
+from classes.batch_line_processor import BatchLineProcessor
+from classes.overflow_warnings import DEFAULT_SAMPLE_SIZE, TokenOverflowWarnings
+from classes.section_writer import (
+    DEFAULT_BUFFER_SIZE,
+    DEFAULT_MAX_OPEN_FILES,
+    SectionPartitionedWriter,
+)
+
+DEFAULT_CHUNK_SIZE = 1000
+ENGINES = ("python", "numpy", "codegen")
+BACKENDS = ("process", "thread")
+
+# The BatchLineProcessor of a worker process, built once per worker by
+# _init_worker so that the standard definition is neither pickled along
+# with every chunk of lines nor compiled more than once per worker.
+_worker_processor = None
+
+
+def make_line_processor(standard_definition, engine="python"):
+    """Builds the batch line processor of a validation engine.
+
+    Args:
+        standard_definition: The loaded standard_definition (a list of dicts).
+        engine: "python" for BatchLineProcessor, "numpy" for
+        NumpyBatchLineProcessor (which requires NumPy) or "codegen" for
+        CodegenBatchLineProcessor.
+
+    Returns:
+        A BatchLineProcessor (or subclass) bound to standard_definition.
+
+    Raises:
+        ValueError: The engine is unknown.
+    """
+    if engine == "python":
+        return BatchLineProcessor(standard_definition)
+    if engine == "numpy":
+        # Imported lazily, as NumPy is an optional dependency.
+        from classes.numpy_line_processor import NumpyBatchLineProcessor
+
+        return NumpyBatchLineProcessor(standard_definition)
+    if engine == "codegen":
+        from classes.codegen_line_processor import CodegenBatchLineProcessor
+
+        return CodegenBatchLineProcessor(standard_definition)
+    raise ValueError(f"Unknown engine {engine!r}, expected one of {ENGINES}.")
+
+
+def _init_worker(standard_definition, engine):
+    """Builds the batch line processor of a worker process."""
+    global _worker_processor
+    _worker_processor = make_line_processor(standard_definition, engine)
+
+
+def _process_chunk(lines, overflow_sample_size, processor=None):
+    """Processes a chunk of lines in a worker process (or, given a shared
+    processor, in a worker thread), returning the chunk's data and its
+    aggregated overflow warnings.
+
+    Every chunk gets its own TokenOverflowWarnings, merged by the caller
+    in input order, so that workers never share mutable state."""
+    overflow_warnings = TokenOverflowWarnings(overflow_sample_size)
+    processor = _worker_processor if processor is None else processor
+    chunk = processor.process_batch(lines, overflow_warnings)
+    return chunk, overflow_warnings
 
 
 class Generator:
@@ -13,10 +80,69 @@ class Generator:
     to generate analyses specifically from a provided input file
     and standard definition file.
 
-    Attributes:
+    Lines are processed in chunks. With more than one worker, chunks are
+    processed in parallel by a pool of processes (or of threads) and their
+    results are written back in input order.
 
+    Attributes:
+        workers:
+            The number of processes used to process lines
+            (1 processes lines in the calling process).
+        chunk_size:
+            The number of lines processed together as one unit of work.
+        overflow_sample_size:
+            The number of example lines kept per section for the
+            end-of-run summary of lines with more tokens than LXYs.
+        engine:
+            The validation engine: "python" (BatchLineProcessor),
+            "numpy" (NumpyBatchLineProcessor, vectorized over each chunk)
+            or "codegen" (CodegenBatchLineProcessor, with one generated
+            function per section).
+        memory_budget:
+            An optional MemoryBudget: chunks (up to chunk_size lines), the
+            number of chunks in flight and the per-section file cache are
+            then sized to stay within its limit.
+        backend:
+            How chunks are processed with more than one worker: "process"
+            (a process pool, with the definition compiled once per worker
+            and results pickled back) or "thread" (a thread pool sharing
+            one processor, with no pickling; threads only validate lines
+            in parallel on a free-threaded build of Python).
+        auto_tuner:
+            An optional AutoTuner: the chunk size and the number of workers
+            are then chosen, within its bounds, by measuring throughput at
+            the start of the run (or reused from an earlier run of the same
+            standard definition), instead of chunk_size and workers.
     """
 
+    def __init__(
+        self,
+        workers=1,
+        chunk_size=DEFAULT_CHUNK_SIZE,
+        overflow_sample_size=DEFAULT_SAMPLE_SIZE,
+        engine="python",
+        memory_budget=None,
+        backend="process",
+        auto_tuner=None,
+    ):
+        """Inits Generator with workers, chunk_size, overflow_sample_size,
+        engine, memory_budget, backend and auto_tuner.
+
+        Raises:
+            ValueError: The backend is unknown.
+        """
+        if backend not in BACKENDS:
+            raise ValueError(
+                f"Unknown backend {backend!r}, expected one of {BACKENDS}."
+            )
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.overflow_sample_size = overflow_sample_size
+        self.engine = engine
+        self.memory_budget = memory_budget
+        self.backend = backend
+        self.auto_tuner = auto_tuner
+
     def generate_report(self, output_path, line_data):
         """Generate a csv report (to be stored at output_path and
         to be written line-by-line).
@@ -68,6 +194,279 @@ class Generator:
                 summary_writer.write(f"{row['Error Message']}\n")
             summary_writer.write("\n")
 
+    def generate_columnar_report(self, columnar_writer, line_data):
+        """Generate a columnar report (written through an open
+        ColumnarReportWriter, row group by row group).
+
+        The report data parsed from a line of the input file is buffered
+        column-wise by the writer, which flushes it to disk once a full
+        row group has been collected.
+
+        Args:
+            columnar_writer: An open ColumnarReportWriter.
+            line_data: A list of dictionaries representing data
+            from a single line.
+
+        Returns:
+
+        Raises:
+
+        """
+        columnar_writer.write_rows(item["report_data"] for item in line_data)
+
+    def iter_input_lines(
+        self, input_path, start_line=None, end_line=None, line_index=None
+    ):
+        """Yield the lines of the input file in the range
+        [start_line, end_line).
+
+        Lines are numbered from 0. When a LineIndex of the input file is
+        given, the reader seeks straight to the nearest indexed line at or
+        before start_line instead of streaming the file from the top.
+
+        Args:
+            input_path: Path to the input file (str).
+            start_line: The first line to yield (defaults to 0).
+            end_line: The line to stop before (defaults to the end
+            of the file).
+            line_index: An optional LineIndex of the input file.
+
+        Returns:
+            A generator of lines (str) from the input file.
+
+        Raises:
+
+        """
+        start_line = start_line or 0
+        with open(input_path) as reader:
+            skip = start_line
+            if line_index is not None and start_line > 0:
+                indexed_line, offset = line_index.seek_point(start_line)
+                # Offsets are byte positions, which TextIOWrapper.seek
+                # accepts as cookies for stateless decoders such as UTF-8.
+                reader.seek(offset)
+                skip = start_line - indexed_line
+            stop = None if end_line is None else max(end_line - start_line, 0) + skip
+            yield from itertools.islice(reader, skip, stop)
+
+    def iter_line_data_chunks(
+        self,
+        input_path,
+        standard_definition,
+        start_line=None,
+        end_line=None,
+        line_index=None,
+        overflow_warnings=None,
+        with_lines=False,
+    ):
+        """Yield the data parsed from the input file in the range
+        [start_line, end_line), one chunk of lines at a time.
+
+        Chunks hold up to self.chunk_size lines. With more than one worker,
+        chunks are processed in a process (or thread) pool; at most two
+        chunks per worker are in flight at once, and chunks are yielded in
+        input order.
+        With a memory budget, chunks and the number of chunks in flight can
+        be smaller (see MemoryBudget). With an auto tuner, the chunk size and
+        the number of workers are chosen by it (see AutoTuner).
+
+        Args:
+            input_path: Path to the input file (str).
+            standard_definition: The loaded standard_definition
+            (either a list of dicts or a dict).
+            start_line: The first line to process (defaults to 0).
+            end_line: The line to stop before (defaults to the end
+            of the file).
+            line_index: An optional LineIndex of the input file.
+            overflow_warnings: An optional TokenOverflowWarnings aggregating
+            the warnings for lines with more tokens than LXYs (by default,
+            they are logged for every such line).
+            with_lines: Boolean to also yield the lines of every chunk.
+
+        Returns:
+            A generator of lists, each holding one list of dictionaries
+            per line of the chunk (or of (lines, list) pairs, if with_lines
+            is True).
+
+        Raises:
+
+        """
+        lines = self.iter_input_lines(input_path, start_line, end_line, line_index)
+        budget = self.memory_budget
+        if budget is not None:
+            budget.start()
+        tuner = self.auto_tuner
+        if tuner is not None:
+            tuner.start(standard_definition, f"{self.engine}/{self.backend}")
+        try:
+            yield from self._iter_chunks(
+                lines, standard_definition, overflow_warnings, with_lines
+            )
+        finally:
+            if tuner is not None:
+                tuner.stop()
+            if budget is not None:
+                budget.stop()
+
+    def _iter_chunks(self, lines, standard_definition, overflow_warnings, with_lines):
+        """Yield the data of the lines, processed in chunks (see
+        iter_line_data_chunks).
+
+        With a memory budget, every chunk is measured from before its
+        lines are read until its data is ready, so the budget learns the
+        memory needed per line and sizes the next chunks. In the calling
+        process, the chunk being processed and the one the caller still
+        holds are in memory at once; with a pool, the results of every
+        chunk in flight are too, and fewer chunks are kept in flight when
+        even the smallest chunks would not fit.
+
+        With the thread backend, the workers share a single processor
+        (which holds no per-line state) and give every chunk its own
+        overflow warnings, so nothing mutable is shared between threads;
+        results are consumed in submission order, as with processes.
+
+        With an auto tuner, chunks are sized and processed by as many
+        workers as its current trial sets, and it is told when the caller is
+        done with each chunk; one worker processes chunks in the calling
+        process.
+        """
+        budget = self.memory_budget
+        tuner = self.auto_tuner
+        processor = None
+
+        def read_chunk(chunks_held):
+            size = self.chunk_size if tuner is None else tuner.chunk_size
+            if budget is not None:
+                size = budget.chunk_size(size, chunks_held)
+            return list(itertools.islice(lines, size))
+
+        def get_processor():
+            nonlocal processor
+            if processor is None:
+                processor = make_line_processor(standard_definition, self.engine)
+            return processor
+
+        def make_executor(workers):
+            # Imported here: pools are only needed with several workers.
+            if self.backend == "thread":
+                from concurrent.futures import ThreadPoolExecutor
+
+                return ThreadPoolExecutor(workers), (get_processor(),)
+            from concurrent.futures import ProcessPoolExecutor
+
+            executor = ProcessPoolExecutor(
+                workers,
+                initializer=_init_worker,
+                initargs=(standard_definition, self.engine),
+            )
+            return executor, ()
+
+        sample_size = (
+            overflow_warnings.sample_size
+            if overflow_warnings is not None
+            else self.overflow_sample_size
+        )
+
+        def collect(chunk, future, trial, before):
+            data, chunk_warnings = future.result()
+            if budget is not None:
+                budget.observe(len(chunk), before)
+            if tuner is not None:
+                tuner.observe(trial, len(chunk))
+            if overflow_warnings is not None:
+                overflow_warnings.merge(chunk_warnings)
+            else:
+                chunk_warnings.log_summary()
+            return (chunk, data) if with_lines else data
+
+        executor = None
+        executor_workers = 1
+        pending = deque()
+        try:
+            while True:
+                workers = self.workers if tuner is None else tuner.workers
+                if workers != executor_workers:
+                    # The tuner moved on to another number of workers: the
+                    # chunks in flight are collected and the pool replaced.
+                    while pending:
+                        yield collect(*pending.popleft())
+                    if executor is not None:
+                        executor.shutdown()
+                    executor = None
+                    if workers > 1:
+                        executor, submit_args = make_executor(workers)
+                    executor_workers = workers
+                trial = None if tuner is None else tuner.trial
+                if executor is None:
+                    before = budget.usage() if budget is not None else None
+                    chunk = read_chunk(2)
+                    if not chunk:
+                        return
+                    data = get_processor().process_batch(chunk, overflow_warnings)
+                    if budget is not None:
+                        budget.observe(len(chunk), before)
+                    if tuner is not None:
+                        tuner.observe(trial, len(chunk))
+                    yield (chunk, data) if with_lines else data
+                    continue
+                max_in_flight = 2 * workers
+                # Measured from before the chunk is read, so that the memory
+                # its worker uses to process it is included.
+                before = budget.usage() if budget is not None else None
+                chunk = read_chunk(max_in_flight + 1)
+                if not chunk:
+                    break
+                future = executor.submit(
+                    _process_chunk, chunk, sample_size, *submit_args
+                )
+                pending.append((chunk, future, trial, before))
+                in_flight = max_in_flight
+                if budget is not None:
+                    in_flight = budget.chunks_in_flight(len(chunk), max_in_flight)
+                while len(pending) >= in_flight:
+                    yield collect(*pending.popleft())
+            while pending:
+                yield collect(*pending.popleft())
+        finally:
+            # When the caller stops early, chunks not started yet are
+            # dropped rather than processed for nothing.
+            for _, future, _, _ in pending:
+                future.cancel()
+            if executor is not None:
+                executor.shutdown()
+
+    def iter_line_data(
+        self,
+        input_path,
+        standard_definition,
+        start_line=None,
+        end_line=None,
+        line_index=None,
+    ):
+        """Yield the data parsed from each line of the input file in the
+        range [start_line, end_line).
+
+        Args:
+            input_path: Path to the input file (str).
+            standard_definition: The loaded standard_definition
+            (either a list of dicts or a dict).
+            start_line: The first line to process (defaults to 0).
+            end_line: The line to stop before (defaults to the end
+            of the file).
+            line_index: An optional LineIndex of the input file.
+
+        Returns:
+            A generator of lists of dictionaries, each list representing
+            data from a single line.
+
+        Raises:
+
+        """
+        for chunk in self.iter_line_data_chunks(
+            input_path, standard_definition, start_line, end_line, line_index
+        ):
+            yield from chunk
+
     def generate_analyses_from_input_file(
         self,
         input_path,
@@ -76,12 +475,38 @@ class Generator:
         standard_definition,
         report=True,
         summary=True,
+        columnar_path=None,
+        start_line=None,
+        end_line=None,
+        line_index=None,
+        section_dir=None,
+        max_open_section_files=DEFAULT_MAX_OPEN_FILES,
+        sketches_path=None,
+        rle_summary_path=None,
+        progress_reporter=None,
+        quality_gates=None,
+        group_by_error_code=False,
+        sort_memory_limit=None,
     ):
         """Generate analyses in output files based on parsing a line
         from an input file. Reading and writing is performed line-by-line.
 
         The data parsed from a line of the input file is used to write
-        analyses into files.
+        analyses into files. The report is rendered one chunk at a time by
+        a ReportSerializer built once for the standard definition, and
+        written through a single open file. Lines with more tokens than LXYs are not
+        logged one by one: they are counted per section and summarised in
+        a single warning at the end of the run.
+
+        Quality gates are checked after every line. As soon as one is
+        decisively breached, reading and processing stop (the analyses
+        then only cover the chunks of lines before the breaching one)
+        and a QualityGateError is raised.
+
+        When group_by_error_code is set, the report and the summary are
+        grouped by error code and section instead (see SortedReportWriter):
+        they are only written once the whole input has been processed, by
+        merging sorted runs spilled to disk under sort_memory_limit.
 
         Args:
             input_path: Path to the input file (str)
@@ -93,17 +518,368 @@ class Generator:
             (either a list of dicts or a dict).
             report: Boolean to determine if report should be generated.
             summary: Boolean to determine if summary should be generated.
+            columnar_path: Path to where a columnar report should be
+            written (str), or None to skip the columnar report.
+            start_line: The first line of the input file to process
+            (0-based, defaults to 0).
+            end_line: The line of the input file to stop before
+            (defaults to the end of the file).
+            line_index: An optional LineIndex of the input file, used to
+            seek directly to start_line.
+            section_dir: Directory where one report and one summary per
+            LX section should be written (e.g. `<section_dir>/L1/report.csv`),
+            or None to skip the per-section analyses. With more than one
+            worker, the files of different sections are written concurrently.
+            max_open_section_files: The maximum number of per-section files
+            held open at the same time (fewer if the memory budget cannot
+            hold their buffers).
+            sketches_path: Path to where the token sketches (E03 length
+            quantiles and most frequent E02 values per sub-section, see
+            TokenSketches) should be written as JSON (str), or None to
+            skip them.
+            rle_summary_path: Path to where a run-length encoded summary
+            (see RunLengthSummaryWriter) should be written (str), or None
+            to skip it.
+            progress_reporter: An optional ProgressReporter, started for the
+            run, following the input file and handed every processed chunk
+            (its total_bytes defaults to the size of the input file when no
+            line range is given).
+            quality_gates: An optional list of QualityGates.
+            group_by_error_code: Boolean to write the report and the summary
+            grouped by error code and section, in input order within each
+            group.
+            sort_memory_limit: The number of bytes of rows held in memory
+            before a sorted run is spilled to disk (defaults to 64 MiB, or
+            less if the memory budget cannot hold it).
 
         Returns:
 
+        Raises:
+            QualityGateError: A quality gate is breached.
+        """
+        overflow_warnings = TokenOverflowWarnings(self.overflow_sample_size)
+        columnar_writer = None
+        section_writer = None
+        section_executor = None
+        if columnar_path is not None:
+            from classes.columnar_report import ColumnarReportWriter
+
+            columnar_writer = ColumnarReportWriter(columnar_path)
+        budget = self.memory_budget
+        if budget is not None:
+            budget.start()
+        if section_dir is not None:
+            if budget is not None:
+                # Every open section file holds a write buffer.
+                max_open_section_files = budget.fit(
+                    DEFAULT_BUFFER_SIZE, max_open_section_files
+                )
+            section_writer = SectionPartitionedWriter(
+                section_dir,
+                report=report,
+                summary=summary,
+                max_open_files=max_open_section_files,
+            )
+            if self.workers > 1:
+                from concurrent.futures import ThreadPoolExecutor
+
+                section_executor = ThreadPoolExecutor(
+                    min(self.workers, section_writer.max_concurrent_sections)
+                )
+        rle_summary_writer = None
+        if rle_summary_path is not None:
+            from classes.rle_summary import RunLengthSummaryWriter
+
+            rle_summary_writer = RunLengthSummaryWriter(
+                rle_summary_path, first_line=start_line or 0
+            )
+        sketches = None
+        if sketches_path is not None:
+            from classes.token_sketches import TokenSketches
+
+            sketches = TokenSketches()
+        sorted_writer = None
+        if group_by_error_code and (report or summary):
+            from classes.sorted_report import DEFAULT_MEMORY_LIMIT, SortedReportWriter
+
+            sort_memory_limit = sort_memory_limit or DEFAULT_MEMORY_LIMIT
+            if budget is not None:
+                sort_memory_limit = budget.fit(1, sort_memory_limit)
+            sorted_writer = SortedReportWriter(
+                report_path if report else None,
+                summary_path if summary else None,
+                memory_limit=sort_memory_limit,
+                first_line=start_line or 0,
+            )
+            # The grouped files replace the ones written line by line.
+            report = summary = False
+        report_serializer = None
+        report_file = None
+        if report:
+            from classes.report_serializer import ReportSerializer
+
+            report_serializer = ReportSerializer(standard_definition)
+        gate_monitor = None
+        if quality_gates:
+            from classes.quality_gates import QualityGateMonitor
+
+            gate_monitor = QualityGateMonitor(quality_gates, first_line=start_line or 0)
+        if progress_reporter is not None:
+            whole_file = start_line is None and end_line is None
+            if progress_reporter.total_bytes is None and whole_file:
+                progress_reporter.total_bytes = os.path.getsize(input_path)
+            progress_reporter.follow(input_path, start_line, line_index)
+            progress_reporter.start()
+        try:
+            for lines, chunk in self.iter_line_data_chunks(
+                input_path,
+                standard_definition,
+                start_line,
+                end_line,
+                line_index,
+                overflow_warnings,
+                with_lines=True,
+            ):
+                if gate_monitor is not None:
+                    gate_monitor.check_lines(chunk)
+                if report_serializer is not None:
+                    if report_file is None:
+                        report_file = open(report_path, "a", newline="")
+                    report_serializer.write_lines(report_file, chunk)
+                for line_data in chunk:
+                    if summary:
+                        self.generate_summary(summary_path, line_data)
+                    if columnar_writer is not None:
+                        self.generate_columnar_report(columnar_writer, line_data)
+                if sorted_writer is not None:
+                    sorted_writer.write_lines(chunk)
+                if section_writer is not None:
+                    section_writer.write_lines(chunk, section_executor)
+                if rle_summary_writer is not None:
+                    rle_summary_writer.write_lines(chunk)
+                if sketches is not None:
+                    sketches.update(lines, chunk)
+                if progress_reporter is not None:
+                    progress_reporter.submit(lines, chunk)
+            if sketches is not None:
+                sketches.write(sketches_path)
+            if gate_monitor is not None:
+                gate_monitor.finish()
+            if sorted_writer is not None:
+                sorted_writer.finish()
+        finally:
+            if progress_reporter is not None:
+                progress_reporter.close()
+            overflow_warnings.log_summary()
+            if report_file is not None:
+                report_file.close()
+            if columnar_writer is not None:
+                columnar_writer.close()
+            if rle_summary_writer is not None:
+                rle_summary_writer.close()
+            if section_executor is not None:
+                section_executor.shutdown()
+            if section_writer is not None:
+                section_writer.close()
+            if sorted_writer is not None:
+                sorted_writer.close()
+            if budget is not None:
+                budget.stop()
+
+    def generate_analyses_from_input_files(
+        self,
+        inputs,
+        output_dir,
+        standard_definition,
+        report=True,
+        summary=True,
+    ):
+        """Generate analyses for many input files at once, sharing one
+        compiled standard definition.
+
+        The definition is compiled once and handed to a pool of
+        self.workers processes, which rebuild it once each and process one
+        file at a time, largest files first. Every file gets its own
+        report and summary under output_dir (e.g.
+        `<output_dir>/input_file.txt/report.csv`), and the line, token and
+        error-code counts of every file and of the whole batch are written
+        to `<output_dir>/batch_summary.json`. A file that cannot be
+        processed is logged and recorded with its error in the batch
+        summary instead of stopping the batch.
+
+        Args:
+            inputs: A directory, a glob pattern (e.g. "incoming/*.txt")
+            or a list of those.
+            output_dir: The directory the analyses are written to (str).
+            standard_definition: The loaded standard_definition
+            (either a list of dicts or a CompiledDefinition).
+            report: Boolean to determine if reports should be generated.
+            summary: Boolean to determine if summaries should be generated.
+
+        Returns:
+            dict: The batch summary, with "totals" and per-file "files"
+            statistics.
+
         Raises:
 
         """
-        with open(input_path) as reader:
-            for line in reader:
-                lp = LineProcessor(line, standard_definition)
-                line_data = lp.process()
-                if report:
-                    self.generate_report(report_path, line_data)
-                if summary:
-                    self.generate_summary(summary_path, line_data)
+        from classes.batch_job import run_batch
+
+        return run_batch(self, inputs, output_dir, standard_definition, report, summary)
+
+    def estimate_error_rates(
+        self,
+        input_path,
+        standard_definition,
+        sample_size=10_000,
+        seed=0,
+        method=None,
+        confidence=0.95,
+    ):
+        """Estimate the error-code rates of an input file from a
+        reproducible random sample of its lines, instead of processing
+        every line.
+
+        For regular files, lines are drawn at random byte offsets, so only
+        sample_size lines are read however large the file is (estimates are
+        weighted to undo the bias towards long lines). Streams are sampled
+        in one pass with reservoir sampling. See ErrorRateEstimate for the
+        estimates and their confidence intervals.
+
+        Args:
+            input_path: Path to the input file (str), or an iterable
+            of lines.
+            standard_definition: The loaded standard_definition
+            (either a list of dicts or a dict).
+            sample_size: The number of lines to sample.
+            seed: The seed of the random number generator.
+            method: "seek" or "reservoir" (by default, "seek" for regular
+            files and "reservoir" otherwise).
+            confidence: The confidence level of the intervals.
+
+        Returns:
+            ErrorRateEstimate: The estimated rates, per code and per
+            section (see ErrorRateEstimate.to_dict and write).
+
+        Raises:
+            ValueError: The sampling method is unknown.
+        """
+        from classes.error_rate_sampler import estimate_error_rates
+
+        return estimate_error_rates(
+            make_line_processor(standard_definition, self.engine),
+            input_path,
+            sample_size=sample_size,
+            seed=seed,
+            method=method,
+            confidence=confidence,
+        )
+
+    async def generate_analyses_async(
+        self,
+        input_path,
+        summary_path,
+        report_path,
+        standard_definition,
+        report=True,
+        summary=True,
+        executor=None,
+        queue_size=4,
+    ):
+        """Generate analyses in output files based on parsing an input file,
+        without blocking the running asyncio event loop.
+
+        The same report and summary as generate_analyses_from_input_file
+        are written by an AsyncPipeline: reading, validation (in chunks of
+        self.chunk_size lines, up to self.workers of them at once) and
+        writing all run in executors, chained by queues holding at most
+        queue_size chunks. Cancelling the awaiting task stops the pipeline
+        and closes the output files.
+
+        Args:
+            input_path: Path to the input file (str)
+            summary_path: Path to where the summary file should
+            be written (str).
+            report_path: Path to where the report file should
+            be written (str).
+            standard_definition: The loaded standard_definition
+            (either a list of dicts or a dict).
+            report: Boolean to determine if report should be generated.
+            summary: Boolean to determine if summary should be generated.
+            executor: The concurrent.futures.Executor chunks are validated
+            in (None for the event loop's default executor).
+            queue_size: The maximum number of chunks waiting between
+            two stages of the pipeline.
+
+        Returns:
+
+        Raises:
+
+        """
+        # Imported here, so that synchronous runs never import asyncio.
+        from classes.async_pipeline import (
+            AsyncPipeline,
+            AsyncReportSink,
+            AsyncSummarySink,
+        )
+
+        from classes.report_serializer import ReportSerializer
+
+        sinks = []
+        if report:
+            serializer = ReportSerializer(standard_definition)
+            sinks.append(AsyncReportSink(report_path, serializer))
+        if summary:
+            sinks.append(AsyncSummarySink(summary_path))
+        pipeline = AsyncPipeline(
+            make_line_processor(standard_definition, self.engine),
+            sinks,
+            batch_size=self.chunk_size,
+            queue_size=queue_size,
+            executor=executor,
+            validators=self.workers,
+            overflow_sample_size=self.overflow_sample_size,
+        )
+        await pipeline.run_file(input_path)
+
+    def merge_analyses(
+        self,
+        shard_summary_paths,
+        shard_report_paths,
+        summary_path,
+        report_path,
+    ):
+        """Merge the analyses generated for consecutive shards of an
+        input file into a single summary and report, in shard order.
+
+        Summaries are concatenated as they are. Reports are concatenated
+        with a single header: the header of each shard report is dropped
+        unless the merged report is still empty. Files are copied in
+        blocks, so merging needs constant memory.
+
+        Args:
+            shard_summary_paths: Paths to the shard summaries, in
+            input order (list of str).
+            shard_report_paths: Paths to the shard reports, in
+            input order (list of str).
+            summary_path: Path to where the merged summary should
+            be written (str).
+            report_path: Path to where the merged report should
+            be written (str).
+
+        Returns:
+
+        Raises:
+
+        """
+        with open(summary_path, "ab") as summary_writer:
+            for path in shard_summary_paths:
+                with open(path, "rb") as shard_reader:
+                    shutil.copyfileobj(shard_reader, summary_writer)
+        with open(report_path, "ab") as report_writer:
+            for path in shard_report_paths:
+                with open(path, "rb") as shard_reader:
+                    header = shard_reader.readline()
+                    if report_writer.tell() == 0:
+                        report_writer.write(header)
+                    shutil.copyfileobj(shard_reader, report_writer)
@@ -0,0 +1,222 @@
+import bisect
+import os
+import struct
+from array import array
+
+from classes.custom_errors import LineIndexError
+from utils import from_little_endian_bytes, to_little_endian_bytes
+
+# The sidecar file starts with MAGIC and a fixed-size header
+# (interval, number of lines, input file size, input file mtime in ns),
+# followed by the byte offsets of lines 0, interval, 2 * interval, ...
+# stored as little-endian unsigned 64-bit integers.
+MAGIC = b"GUACIDX1"
+HEADER = struct.Struct("<QQQQ")
+DEFAULT_INTERVAL = 1024
+INDEX_SUFFIX = ".idx"
+READ_SIZE = 1 << 20
+
+
+class LineIndex:
+    """The LineIndex class records the byte offset of every Nth line of
+    an input file so that line ranges can be read without streaming the
+    file from the top.
+
+    An index is built with a single binary pass over the input file and
+    stored in a sidecar file next to it (`<input_path>.idx` by default).
+    Lines are counted on the '\\n' character. The index can locate the
+    nearest indexed line at or before any line number, and can cut the
+    input into shards of roughly equal byte size for processing on
+    several machines.
+
+    Attributes:
+        input_path:
+            The path to the indexed input file.
+        interval:
+            The distance (in lines) between two indexed lines.
+        num_lines:
+            The total number of lines in the input file.
+        file_size:
+            The size of the input file (in bytes) when it was indexed.
+        mtime_ns:
+            The modification time of the input file when it was indexed.
+        offsets:
+            An array with the byte offset of lines 0, interval,
+            2 * interval, ...
+    """
+
+    def __init__(self, input_path, interval, num_lines, file_size, mtime_ns, offsets):
+        """Inits LineIndex with the index metadata and offsets."""
+        self.input_path = input_path
+        self.interval = interval
+        self.num_lines = num_lines
+        self.file_size = file_size
+        self.mtime_ns = mtime_ns
+        self.offsets = offsets
+
+    @staticmethod
+    def sidecar_path(input_path):
+        """Returns the default sidecar path of the index for input_path."""
+        return f"{input_path}{INDEX_SUFFIX}"
+
+    @classmethod
+    def build(cls, input_path, interval=DEFAULT_INTERVAL):
+        """Builds an index by scanning the input file once.
+
+        Args:
+            input_path: Path to the input file (str).
+            interval: Record the byte offset of every interval-th line.
+
+        Returns:
+            LineIndex: The index of the input file.
+
+        Raises:
+            ValueError: The interval is not a positive integer.
+        """
+        if interval < 1:
+            raise ValueError("The line index interval must be at least 1.")
+        stat = os.stat(input_path)
+        offsets = array("Q")
+        num_lines = 0
+        position = 0
+        # The offset of the line following the latest newline, recorded
+        # lazily so that a trailing newline does not index an empty line.
+        line_start = 0
+        with open(input_path, "rb") as reader:
+            while True:
+                block = reader.read(READ_SIZE)
+                if not block:
+                    break
+                newline = block.find(b"\n")
+                while newline != -1:
+                    if num_lines % interval == 0:
+                        offsets.append(line_start)
+                    num_lines += 1
+                    line_start = position + newline + 1
+                    newline = block.find(b"\n", newline + 1)
+                position += len(block)
+        if line_start < position:
+            if num_lines % interval == 0:
+                offsets.append(line_start)
+            num_lines += 1
+        return cls(input_path, interval, num_lines, position, stat.st_mtime_ns, offsets)
+
+    def save(self, index_path=None):
+        """Writes the index to its sidecar file.
+
+        Args:
+            index_path: Path of the sidecar file (defaults to
+            `<input_path>.idx`).
+
+        Returns:
+
+        Raises:
+
+        """
+        index_path = index_path or self.sidecar_path(self.input_path)
+        with open(index_path, "wb") as writer:
+            writer.write(MAGIC)
+            writer.write(
+                HEADER.pack(
+                    self.interval, self.num_lines, self.file_size, self.mtime_ns
+                )
+            )
+            writer.write(to_little_endian_bytes(self.offsets))
+
+    @classmethod
+    def load(cls, input_path, index_path=None):
+        """Loads the index of input_path from its sidecar file.
+
+        Args:
+            input_path: Path to the indexed input file (str).
+            index_path: Path of the sidecar file (defaults to
+            `<input_path>.idx`).
+
+        Returns:
+            LineIndex: The index of the input file.
+
+        Raises:
+            LineIndexError: The sidecar file is malformed or the input
+            file has changed since it was indexed.
+        """
+        index_path = index_path or cls.sidecar_path(input_path)
+        with open(index_path, "rb") as reader:
+            if reader.read(len(MAGIC)) != MAGIC:
+                raise LineIndexError(index_path, "bad header")
+            header = reader.read(HEADER.size)
+            if len(header) != HEADER.size:
+                raise LineIndexError(index_path, "truncated header")
+            interval, num_lines, file_size, mtime_ns = HEADER.unpack(header)
+            offsets = from_little_endian_bytes("Q", reader.read())
+        stat = os.stat(input_path)
+        if stat.st_size != file_size or stat.st_mtime_ns != mtime_ns:
+            raise LineIndexError(index_path, f"{input_path} changed since indexing")
+        return cls(input_path, interval, num_lines, file_size, mtime_ns, offsets)
+
+    @classmethod
+    def load_or_build(cls, input_path, interval=DEFAULT_INTERVAL, index_path=None):
+        """Loads the sidecar index of input_path, (re)building and saving
+        it if it is missing or stale.
+
+        Args:
+            input_path: Path to the input file (str).
+            interval: The interval used if the index has to be built.
+            index_path: Path of the sidecar file (defaults to
+            `<input_path>.idx`).
+
+        Returns:
+            LineIndex: The index of the input file.
+
+        Raises:
+
+        """
+        try:
+            return cls.load(input_path, index_path)
+        except (FileNotFoundError, LineIndexError):
+            line_index = cls.build(input_path, interval)
+            line_index.save(index_path)
+            return line_index
+
+    def seek_point(self, line_number):
+        """Returns the nearest indexed line at or before line_number.
+
+        Args:
+            line_number: A 0-based line number.
+
+        Returns:
+            tuple: (indexed line number, byte offset of that line).
+
+        Raises:
+
+        """
+        if not self.offsets or line_number <= 0:
+            return 0, 0
+        slot = min(line_number // self.interval, len(self.offsets) - 1)
+        return slot * self.interval, self.offsets[slot]
+
+    def shards(self, num_shards):
+        """Cuts the input file into line ranges of roughly equal byte size.
+
+        Shard boundaries fall on indexed lines, so shards are balanced to
+        within `interval` lines of each other.
+
+        Args:
+            num_shards: The desired number of shards.
+
+        Returns:
+            list: (start_line, end_line) tuples covering the whole file,
+            in order, with end_line exclusive. Fewer shards are returned
+            when the file is too small to be cut num_shards ways.
+
+        Raises:
+
+        """
+        boundaries = [0]
+        for shard in range(1, num_shards):
+            target = self.file_size * shard // num_shards
+            slot = bisect.bisect_left(self.offsets, target)
+            line_number = slot * self.interval
+            if boundaries[-1] < line_number < self.num_lines:
+                boundaries.append(line_number)
+        boundaries.append(self.num_lines)
+        return list(zip(boundaries, boundaries[1:]))
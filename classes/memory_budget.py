@@ -0,0 +1,254 @@
+import logging
+import os
+import sys
+import tracemalloc
+
+METHODS = ("rss", "tracemalloc")
+MIN_CHUNK_SIZE = 16
+# The size of the first chunk, processed before the memory needed per line
+# has been measured.
+PROBE_CHUNK_SIZE = 64
+# The shares of the budget (above the memory in use when tracking starts)
+# given to the chunks of lines in flight and to caches such as open file
+# buffers. The rest is left as slack for the interpreter and the writers.
+CHUNK_SHARE = 0.6
+CACHE_SHARE = 0.2
+
+
+def current_rss():
+    """Returns the resident set size of the process, in bytes.
+
+    On systems without /proc (e.g. macOS), the peak resident set size is
+    returned instead, which only overestimates the memory in use.
+    """
+    try:
+        with open("/proc/self/statm") as reader:
+            resident_pages = int(reader.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        import resource
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def children_private_bytes():
+    """Returns the memory private to the child processes (e.g. the workers
+    of a process pool), in bytes: their resident pages shared with no other
+    process. The pages a forked child still shares with its parent are
+    already part of the parent's resident set size.
+
+    On systems without /proc, 0 is returned.
+    """
+    total = 0
+    try:
+        tasks = os.listdir("/proc/self/task")
+    except OSError:
+        return 0
+    for task in tasks:
+        try:
+            with open(f"/proc/self/task/{task}/children") as reader:
+                pids = reader.read().split()
+        except OSError:
+            continue
+        for pid in pids:
+            try:
+                with open(f"/proc/{pid}/smaps_rollup") as reader:
+                    for line in reader:
+                        if line.startswith(("Private_Clean:", "Private_Dirty:")):
+                            total += int(line.split()[1]) * 1024
+            except (OSError, ValueError):
+                # The child has exited since it was listed.
+                continue
+    return total
+
+
+class MemoryBudget:
+    """The MemoryBudget class keeps the memory used by a run within a
+    fixed limit, by sizing its chunks of lines, the number of chunks in
+    flight and its caches.
+
+    Memory is measured either as the resident set size of the process plus
+    the memory private to its child processes, such as the workers of a
+    process pool ("rss", cheap enough to sample after every chunk), or as
+    the memory allocated by Python in the calling process ("tracemalloc",
+    exact but slowing processing down noticeably, and blind to the
+    workers). The memory in use when tracking starts is the baseline; the
+    rest of the limit is shared out between chunks and caches.
+
+    The memory needed per line is measured on a small first chunk and then
+    after every chunk, keeping the largest value seen, and chunks are sized
+    so that all the chunks held at once fit in CHUNK_SHARE of the budget.
+    A chunk measured as using no memory (memory freed by earlier chunks
+    was reused) tells nothing, so chunks stay small until one has grown
+    the memory in use. Whenever a measurement exceeds the limit anyway,
+    the chunk size is halved for the rest of the run (down to
+    min_chunk_size), so the run degrades to smaller chunks instead of
+    growing past the limit.
+
+    Attributes:
+        limit_bytes:
+            The memory limit, in bytes.
+        method:
+            How memory is measured: "rss" or "tracemalloc".
+        min_chunk_size:
+            The smallest number of lines processed as one chunk.
+        baseline_bytes:
+            The memory in use when tracking started.
+        peak_bytes:
+            The largest memory use measured while tracking.
+        bytes_per_line:
+            The largest memory measured per processed line (None until
+            a chunk has been measured using memory).
+        degradations:
+            The number of times the chunk size was halved after the limit
+            was exceeded.
+    """
+
+    def __init__(self, limit_bytes, method="rss", min_chunk_size=MIN_CHUNK_SIZE):
+        """Inits MemoryBudget with limit_bytes, method and min_chunk_size."""
+        if method not in METHODS:
+            raise ValueError(f"Unknown method {method!r}, expected one of {METHODS}.")
+        self.limit_bytes = limit_bytes
+        self.method = method
+        self.min_chunk_size = min_chunk_size
+        self.baseline_bytes = None
+        self.peak_bytes = 0
+        self.bytes_per_line = None
+        self.degradations = 0
+        self._ceiling = None
+        self._depth = 0
+        self._started_tracing = False
+
+    def start(self):
+        """Starts tracking memory, measuring the baseline.
+
+        Calls can be nested: only the outermost start() and stop() take
+        effect, so a run and the chunk iterator it drives share one
+        baseline.
+        """
+        self._depth += 1
+        if self._depth > 1:
+            return
+        if self.method == "tracemalloc":
+            self._started_tracing = not tracemalloc.is_tracing()
+            if self._started_tracing:
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+        self.baseline_bytes = self.usage()
+        self.peak_bytes = self.baseline_bytes
+        self.bytes_per_line = None
+        self.degradations = 0
+        self._ceiling = None
+        if self.available_bytes == 0:
+            logging.warning(
+                "%d bytes are already in use, above the memory budget of %d "
+                "bytes: processing with chunks of %d lines.",
+                self.baseline_bytes,
+                self.limit_bytes,
+                self.min_chunk_size,
+            )
+
+    def stop(self):
+        """Stops tracking memory."""
+        if self._depth == 0:
+            return
+        self._depth -= 1
+        if self._depth > 0:
+            return
+        self.peak_bytes = max(self.peak_bytes, self.usage(peak=True))
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def usage(self, peak=False):
+        """Returns the memory in use (or, with tracemalloc and peak set,
+        the most used since tracking started), in bytes."""
+        if self.method == "tracemalloc":
+            current, peak_bytes = tracemalloc.get_traced_memory()
+            return peak_bytes if peak else current
+        return current_rss() + children_private_bytes()
+
+    @property
+    def available_bytes(self):
+        """The memory left for chunks and caches above the baseline."""
+        return max(self.limit_bytes - (self.baseline_bytes or 0), 0)
+
+    def fit(self, item_bytes, max_items, share=CACHE_SHARE):
+        """Returns how many items of item_bytes fit in a share of the
+        budget, between 1 and max_items.
+
+        Args:
+            item_bytes: The memory held by one item (e.g. a file buffer).
+            max_items: The number of items wanted.
+            share: The share of the available memory the items may use.
+
+        Returns:
+            int: The number of items to keep.
+
+        Raises:
+
+        """
+        return max(min(int(self.available_bytes * share // item_bytes), max_items), 1)
+
+    def chunk_size(self, max_chunk_size, chunks_held=2):
+        """Returns the number of lines to read for the next chunk.
+
+        Args:
+            max_chunk_size: The chunk size used without a budget.
+            chunks_held: The number of chunks held in memory at once (e.g.
+            the chunk being processed and the one being written).
+
+        Returns:
+            int: The chunk size, between min_chunk_size and max_chunk_size.
+
+        Raises:
+
+        """
+        if self.bytes_per_line is None:
+            size = PROBE_CHUNK_SIZE
+        else:
+            chunk_bytes = self.available_bytes * CHUNK_SHARE / chunks_held
+            size = int(chunk_bytes // self.bytes_per_line)
+        size = min(size, max_chunk_size)
+        if self._ceiling is not None:
+            size = min(size, self._ceiling)
+        return max(size, min(self.min_chunk_size, max_chunk_size))
+
+    def chunks_in_flight(self, chunk_size, max_chunks):
+        """Returns how many chunks of chunk_size lines can be in flight at
+        once, between 1 and max_chunks (max_chunks until a chunk has been
+        measured)."""
+        if self.bytes_per_line is None:
+            return max_chunks
+        return self.fit(chunk_size * self.bytes_per_line, max_chunks, CHUNK_SHARE)
+
+    def observe(self, num_lines, before_bytes):
+        """Records the memory used by a chunk that was just processed.
+
+        Args:
+            num_lines: The number of lines in the chunk.
+            before_bytes: The value of usage() before the chunk was read.
+
+        Returns:
+
+        Raises:
+
+        """
+        after_bytes = self.usage()
+        if num_lines and after_bytes > before_bytes:
+            per_line = (after_bytes - before_bytes) / num_lines
+            self.bytes_per_line = max(self.bytes_per_line or 0, per_line)
+        if after_bytes > self.limit_bytes and after_bytes >= self.peak_bytes:
+            ceiling = max(num_lines // 2, self.min_chunk_size)
+            if self._ceiling is None or ceiling < self._ceiling:
+                self._ceiling = ceiling
+                self.degradations += 1
+        self.peak_bytes = max(self.peak_bytes, after_bytes)
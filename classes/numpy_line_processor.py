@@ -0,0 +1,248 @@
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only without numpy
+    np = None
+
+from classes.batch_line_processor import ERROR_CODES, E01, E02, E03, E04, E05
+from classes.batch_line_processor import BatchLineProcessor
+from classes.custom_errors import LineTokenizationError, StandardDefinitionParseError
+from utils import DataTypes
+
+# Data type classes, in the order their names appear in DATATYPE_NAMES.
+MISSING, DIGITS, WORD_CHARACTERS, OTHER = range(4)
+DATATYPE_NAMES = (
+    DataTypes.MISSING.value,
+    DataTypes.DIGITS.value,
+    DataTypes.WORD_CHARACTERS.value,
+    DataTypes.OTHER.value,
+)
+DATATYPE_CLASSES = {name: datatype for datatype, name in enumerate(DATATYPE_NAMES)}
+# An expected data type outside of DataTypes never matches a token.
+UNKNOWN_DATATYPE = -1
+
+# The ASCII characters for which str.isspace() (and so str.strip()) holds.
+ASCII_WHITESPACE = b" \t\n\r\x0b\x0c\x1c\x1d\x1e\x1f"
+# Terminates every line in the byte buffer of a section. Lines holding it
+# are left to BatchLineProcessor.
+LINE_END = 0
+
+
+def _byte_class_tables():
+    """Returns lookup tables mapping each byte to its character classes."""
+    codes = np.arange(256)
+    space = np.isin(codes, np.frombuffer(ASCII_WHITESPACE, dtype=np.uint8))
+    digit = (codes >= ord("0")) & (codes <= ord("9"))
+    alpha = ((codes | 0x20) >= ord("a")) & ((codes | 0x20) <= ord("z"))
+    delimiter = (codes == ord("&")) | (codes == LINE_END)
+    return space, digit, alpha & (codes < 0x80), delimiter
+
+
+def _vectorizable(line):
+    """Returns True if a line can be validated on a byte buffer.
+
+    Non-ASCII characters would need Unicode-aware isdecimal/isalpha checks,
+    and NUL bytes are used to terminate lines in the buffer, so lines
+    holding either are left to BatchLineProcessor.
+    """
+    return line.isascii() and "\x00" not in line
+
+
+class NumpyBatchLineProcessor(BatchLineProcessor):
+    """The NumpyBatchLineProcessor class validates batches of lines with
+    vectorized NumPy operations.
+
+    Lines of a batch are grouped by LX section. The lines of a section are
+    then scanned as one byte array: character classes come from lookup
+    tables, token boundaries from the positions of '&', and stripped token
+    lengths and data type classes from searches and prefix sums over those
+    arrays, with no Python work per token. Results are laid out column-wise,
+    in arrays with one row per line and one column per LXY sub-section,
+    from which the error codes E01 - E05 are computed at once. Lines that
+    cannot be represented exactly as bytes (non-ASCII characters, NUL) are
+    processed by BatchLineProcessor, so results always match TokenProcessor
+    semantics exactly. Data types declared in the standard definition (see
+    DataTypeClassifier) may be arbitrary regexes, which have no vectorized
+    equivalent: batches of such definitions are processed by
+    BatchLineProcessor as well. NumPy is an optional dependency, only
+    required by this class.
+
+    Attributes:
+        sections:
+            A dictionary mapping every LX section of the standard definition
+            to a tuple of SubSections (or None if it has no valid
+            sub-sections).
+    """
+
+    def __init__(self, standard_definition):
+        """Inits NumpyBatchLineProcessor by compiling standard_definition.
+
+        Raises:
+            ImportError: NumPy is not installed.
+        """
+        if np is None:
+            raise ImportError(
+                "NumPy is required by NumpyBatchLineProcessor (pip install numpy)."
+            )
+        super().__init__(standard_definition)
+        self._space, self._digit, self._alpha, self._delimiter = _byte_class_tables()
+        self._constraints = {
+            lx: (
+                np.array([sub.max_length for sub in sub_sections]),
+                np.array(
+                    [
+                        DATATYPE_CLASSES.get(sub.data_type, UNKNOWN_DATATYPE)
+                        for sub in sub_sections
+                    ]
+                ),
+            )
+            for lx, sub_sections in self.sections.items()
+            if sub_sections is not None
+        }
+
+    def _group_by_section(self, lines, overflow_warnings, results):
+        """Groups the vectorizable lines by LX section.
+
+        Lines that cannot be vectorized are processed straight away and
+        stored in results. Errors and warnings are raised in line order.
+
+        Returns:
+            dict: Maps every LX section to a (line indices, lines) pair.
+        """
+        groups = {}
+        for i, line in enumerate(lines):
+            if not _vectorizable(line):
+                results[i] = self.process_line(line, overflow_warnings)
+                continue
+            lx, separator, _ = line.partition("&")
+            if not separator:
+                raise LineTokenizationError(line)
+            sub_sections = self.sections.get(lx)
+            if sub_sections is None:
+                raise StandardDefinitionParseError(lx)
+            if line.count("&") > len(sub_sections):
+                self._warn_overflow(line, lx, overflow_warnings)
+            indices, section_lines = groups.setdefault(lx, ([], []))
+            indices.append(i)
+            section_lines.append(line)
+        return groups
+
+    def validate_section(self, lx, lines):
+        """Validates several lines of one LX section.
+
+        Args:
+            lx: The LX section of the lines.
+            lines: Lines of section lx, ASCII and without NUL characters.
+
+        Returns:
+            tuple: (error codes, stripped lengths, data type classes), each a
+            NumPy array with one row per line and one column per LXY
+            sub-section. Error codes index ERROR_CODES and data type classes
+            index DATATYPE_NAMES.
+        """
+        max_lengths, expected_datatypes = self._constraints[lx]
+        num_sub_sections = len(max_lengths)
+        shape = (len(lines), num_sub_sections)
+        lengths = np.zeros(shape, dtype=np.int64)
+        datatypes = np.full(shape, MISSING, dtype=np.int64)
+        present = np.zeros(shape, dtype=bool)
+
+        text = "\x00".join(lines) + "\x00"
+        chars = np.frombuffer(text.encode("ascii"), dtype=np.uint8)
+        space = self._space[chars]
+        delimiter = self._delimiter[chars]
+        # Every token ends on a delimiter; the first token of a line (LX)
+        # starts right after the end of the previous line.
+        delimiters = np.flatnonzero(delimiter)
+        ends_line = chars[delimiters] == LINE_END
+        starts = np.concatenate(([0], delimiters[:-1] + 1))
+        line_ids = np.cumsum(ends_line) - ends_line
+        first_token = np.concatenate(([0], np.flatnonzero(ends_line)[:-1] + 1))
+        sub_section_ids = np.arange(len(delimiters)) - first_token[line_ids] - 1
+        tokens = (sub_section_ids >= 0) & (sub_section_ids < num_sub_sections)
+        starts, ends = starts[tokens], delimiters[tokens]
+        line_ids, sub_section_ids = line_ids[tokens], sub_section_ids[tokens]
+
+        # Stripping: find the first and last non-whitespace character of
+        # every token. A sentinel past the end keeps the lookups in bounds.
+        solid = np.append(np.flatnonzero(~space & ~delimiter), len(chars))
+        first = solid[np.searchsorted(solid, starts)]
+        last = solid[np.searchsorted(solid, ends) - 1]
+        has_solid = first < ends
+        stop = np.where(has_solid, last + 1, first)
+        token_lengths = np.where(has_solid, stop - first, 0)
+
+        # A stripped token is digits (or word characters) if it holds no
+        # character outside that class, counted with prefix sums.
+        not_digit = np.concatenate(
+            ([0], np.cumsum(~self._digit[chars], dtype=np.int32))
+        )
+        not_word = np.concatenate(
+            ([0], np.cumsum(~(self._alpha[chars] | space), dtype=np.int32))
+        )
+        all_digits = not_digit[stop] == not_digit[np.minimum(first, stop)]
+        all_word = not_word[stop] == not_word[np.minimum(first, stop)]
+        token_datatypes = np.where(
+            all_digits, DIGITS, np.where(all_word, WORD_CHARACTERS, OTHER)
+        )
+        token_datatypes = np.where(has_solid, token_datatypes, MISSING)
+
+        lengths[line_ids, sub_section_ids] = token_lengths
+        datatypes[line_ids, sub_section_ids] = token_datatypes
+        present[line_ids, sub_section_ids] = True
+
+        len_isvalid = (lengths > 0) & (lengths <= max_lengths)
+        datatype_isvalid = datatypes == expected_datatypes
+        codes = np.where(
+            len_isvalid,
+            np.where(datatype_isvalid, E01, E02),
+            np.where(datatype_isvalid, E03, E04),
+        )
+        codes = np.where(present, codes, E05)
+        return codes, lengths, datatypes
+
+    def process_batch(self, lines, overflow_warnings=None):
+        """Processes a batch of lines in one call.
+
+        Args:
+            lines: A list (or any sequence) of lines from the input file.
+            overflow_warnings: An optional TokenOverflowWarnings aggregating
+            the warnings for lines with more tokens than LXYs (by default,
+            they are logged for every such line).
+
+        Returns:
+            list: One list of dictionaries per line, in the order of lines.
+
+        Raises:
+            LineTokenizationError: Not enough tokens yielded to parse a line
+            into LX sections and LXY subsections.
+            StandardDefinitionParseError: No standard definition sub-sections
+            found for a line's LX section.
+        """
+        if self.classifier is not None:
+            return super().process_batch(lines, overflow_warnings)
+        results = [None] * len(lines)
+        groups = self._group_by_section(lines, overflow_warnings, results)
+        for lx, (indices, section_lines) in groups.items():
+            sub_sections = self.sections[lx]
+            codes, lengths, datatypes = self.validate_section(lx, section_lines)
+            for i, line_codes, line_lengths, line_datatypes in zip(
+                indices, codes.tolist(), lengths.tolist(), datatypes.tolist()
+            ):
+                results[i] = [
+                    {
+                        "report_data": {
+                            "Section": lx,
+                            "Sub-Section": sub_section.key,
+                            "Given DataType": DATATYPE_NAMES[datatype],
+                            "Expected DataType": sub_section.data_type,
+                            "Given Length": length if length else "",
+                            "Expected MaxLength": sub_section.max_length,
+                            "Error Code": ERROR_CODES[code],
+                        },
+                        "summary_data": {"Error Message": sub_section.messages[code]},
+                    }
+                    for sub_section, code, length, datatype in zip(
+                        sub_sections, line_codes, line_lengths, line_datatypes
+                    )
+                ]
+        return results
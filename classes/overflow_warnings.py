@@ -0,0 +1,99 @@
+import logging
+
+DEFAULT_SAMPLE_SIZE = 3
+
+
+class TokenOverflowWarnings:
+    """The TokenOverflowWarnings class aggregates the warnings raised when
+    a line has more tokens than there are LXY sub-sections for its section.
+
+    Instead of logging two warnings for every such line, occurrences are
+    counted per LX section and the first few offending lines of every
+    section are kept as examples. A single summary is logged at the end
+    of a run. Nothing is recorded (and no line is formatted) while the
+    WARNING level is disabled for the root logger.
+
+    Attributes:
+        sample_size:
+            The number of example lines kept per section.
+        counts:
+            A dictionary mapping each LX section to its number of
+            offending lines.
+        samples:
+            A dictionary mapping each LX section to a list of example
+            offending lines (stripped).
+    """
+
+    def __init__(self, sample_size=DEFAULT_SAMPLE_SIZE):
+        """Inits TokenOverflowWarnings with sample_size."""
+        self.sample_size = sample_size
+        self.counts = {}
+        self.samples = {}
+
+    @staticmethod
+    def enabled():
+        """Returns True if warnings would currently be emitted."""
+        return logging.getLogger().isEnabledFor(logging.WARNING)
+
+    def record(self, lx, line):
+        """Records that line (from section lx) had too many tokens.
+
+        Args:
+            lx: The LX section of the line.
+            line: The offending line.
+
+        Returns:
+
+        Raises:
+
+        """
+        count = self.counts.get(lx, 0)
+        self.counts[lx] = count + 1
+        if count < self.sample_size:
+            self.samples.setdefault(lx, []).append(line.strip())
+
+    def merge(self, other):
+        """Adds the counts and samples of another TokenOverflowWarnings
+        (e.g. one filled in by a worker process).
+
+        Args:
+            other: A TokenOverflowWarnings.
+
+        Returns:
+
+        Raises:
+
+        """
+        for lx, count in other.counts.items():
+            self.counts[lx] = self.counts.get(lx, 0) + count
+            samples = self.samples.setdefault(lx, [])
+            samples.extend(other.samples.get(lx, [])[: self.sample_size - len(samples)])
+
+    @property
+    def total(self):
+        """The total number of offending lines."""
+        return sum(self.counts.values())
+
+    def log_summary(self):
+        """Logs a single warning summarising every offending line
+        recorded so far, if there are any.
+
+        Args:
+
+        Returns:
+
+        Raises:
+
+        """
+        if not self.counts or not self.enabled():
+            return
+        sections = "\n".join(
+            f"  {lx}: {count} line(s), e.g. {self.samples.get(lx, [])}"
+            for lx, count in self.counts.items()
+        )
+        logging.warning(
+            "Number of LXYs less than the number of tokens in %d line(s); "
+            "the tokens were scaled back to match the number of LXYs.\n%s",
+            self.total,
+            sections,
+        )
@@ -0,0 +1,292 @@
+import collections
+import os
+import queue
+import sys
+import threading
+import time
+
+from classes.line_index import READ_SIZE
+
+DEFAULT_INTERVAL = 5.0
+# The number of chunks submitted but not tallied yet held at most: past it,
+# submit() waits for the reporting thread, so a reporter falling behind
+# never holds more than a few chunks of data.
+MAX_QUEUED_CHUNKS = 2
+METRIC_PREFIX = "line_validation"
+
+
+def _format_duration(seconds):
+    """Formats a number of seconds as H:MM:SS."""
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}"
+
+
+class ProgressReporter:
+    """The ProgressReporter class publishes the progress of a run at a
+    fixed interval, to a text stream (stderr by default) and to a
+    Prometheus-format text file.
+
+    The processing loop hands every processed chunk to submit(), which only
+    queues it. A background thread tallies the queued chunks' lines, tokens
+    and error codes into the running counts, and once per interval takes a
+    consistent snapshot of the counts, estimates the remaining time from the
+    bytes consumed relative to the size of the input, and writes the
+    reports, so the processing loop neither counts nor waits on I/O. The
+    queue holds at most MAX_QUEUED_CHUNKS chunks, so the data held for the
+    reporter stays bounded if it falls behind. The metrics file is replaced
+    atomically, so a scraper never reads a partial file.
+
+    The bytes consumed are the byte offset reached in the input file (see
+    follow), read by the background thread from a binary handle of its own,
+    so line endings such as CRLF count for what they weigh on disk. Like a
+    LineIndex, it tells lines apart by their line feeds.
+
+    Attributes:
+        total_bytes:
+            The size of the input (in bytes), used for the progress ratio
+            and the ETA (None if unknown).
+        interval:
+            The number of seconds between two reports.
+        stream:
+            The text stream progress lines are written to (None to skip).
+        metrics_path:
+            The path of the Prometheus text file (None to skip).
+        lines:
+            The number of lines processed so far.
+        bytes:
+            The number of input bytes processed so far (those of the
+            lines' text, encoded, when no input file is followed).
+        tokens:
+            The number of tokens processed so far.
+        error_codes:
+            A dictionary mapping each error code to its count so far.
+    """
+
+    def __init__(
+        self,
+        total_bytes=None,
+        interval=DEFAULT_INTERVAL,
+        stream=sys.stderr,
+        metrics_path=None,
+    ):
+        """Inits ProgressReporter with total_bytes, interval and where
+        to report to."""
+        self.total_bytes = total_bytes
+        self.interval = interval
+        self.stream = stream
+        self.metrics_path = metrics_path
+        self.lines = 0
+        self.bytes = 0
+        self.tokens = 0
+        self.error_codes = collections.Counter()
+        self._lock = threading.Lock()
+        self._chunks = queue.Queue(MAX_QUEUED_CHUNKS)
+        self._thread = None
+        self._started_at = None
+        self._input = None
+        self._block = b""
+        self._block_start = 0
+
+    def follow(self, input_path, start_line=0, line_index=None):
+        """Measures the bytes consumed as the byte offset reached in the
+        input file, from its line start_line on.
+
+        Args:
+            input_path: Path to the input file (str).
+            start_line: The first line processed (defaults to 0).
+            line_index: An optional LineIndex of the input file, used to
+            seek to start_line.
+
+        Returns:
+
+        Raises:
+
+        """
+        self._close_input()
+        self._input = open(input_path, "rb")
+        skip = start_line or 0
+        if line_index is not None and skip > 0:
+            indexed_line, offset = line_index.seek_point(skip)
+            self._input.seek(offset)
+            skip -= indexed_line
+        self._skip_lines(skip)
+        self.bytes = 0
+
+    def _skip_lines(self, num_lines):
+        """Moves past num_lines lines of the followed input, adding their
+        size to bytes."""
+        block, start = self._block, self._block_start
+        while num_lines > 0:
+            if start == len(block):
+                block, start = self._input.read(READ_SIZE), 0
+                if not block:
+                    break
+            newlines = block.count(b"\n", start)
+            if newlines < num_lines:
+                # Past the end of the block (a last line with no newline
+                # ends where the file does).
+                num_lines -= newlines
+                self.bytes += len(block) - start
+                start = len(block)
+                continue
+            end = start
+            for _ in range(num_lines):
+                end = block.index(b"\n", end) + 1
+            self.bytes += end - start
+            start = end
+            num_lines = 0
+        self._block, self._block_start = block, start
+
+    def _close_input(self):
+        if self._input is not None:
+            self._input.close()
+            self._input = None
+            self._block, self._block_start = b"", 0
+
+    def start(self):
+        """Starts the reporting thread."""
+        self._started_at = time.monotonic()
+        self._thread = threading.Thread(
+            target=self._run, name="progress-reporter", daemon=True
+        )
+        self._thread.start()
+
+    def submit(self, lines, chunk):
+        """Queues a processed chunk, to be added to the counts by the
+        reporting thread (waiting while MAX_QUEUED_CHUNKS chunks are
+        queued already).
+
+        Args:
+            lines: The lines of the input file that were processed.
+            chunk: Their data, one list of dictionaries per line.
+
+        Returns:
+
+        Raises:
+
+        """
+        self._chunks.put((lines, chunk))
+
+    def _tally(self, lines, chunk):
+        """Adds a processed chunk to the counts."""
+        tokens = sum(map(len, chunk))
+        error_codes = collections.Counter(
+            item["report_data"]["Error Code"]
+            for line_data in chunk
+            for item in line_data
+        )
+        with self._lock:
+            if self._input is not None:
+                self._skip_lines(len(lines))
+            else:
+                self.bytes += sum(map(len, map(str.encode, lines)))
+            self.lines += len(lines)
+            self.tokens += tokens
+            self.error_codes.update(error_codes)
+
+    def close(self):
+        """Tallies the chunks left, publishes a last report and stops the
+        reporting thread."""
+        if self._thread is not None:
+            self._chunks.put(None)
+            self._thread.join()
+            self._thread = None
+        self._close_input()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _run(self):
+        next_report = time.monotonic() + self.interval
+        while True:
+            try:
+                item = self._chunks.get(timeout=max(next_report - time.monotonic(), 0))
+            except queue.Empty:
+                item = ()
+            if item is None:
+                break
+            if item:
+                self._tally(*item)
+            if time.monotonic() >= next_report:
+                self.publish()
+                next_report = time.monotonic() + self.interval
+        self.publish()
+
+    def snapshot(self):
+        """Returns the current metrics as a dictionary."""
+        with self._lock:
+            lines, done, tokens = self.lines, self.bytes, self.tokens
+            error_codes = dict(sorted(self.error_codes.items()))
+        elapsed = max(time.monotonic() - self._started_at, 1e-9)
+        progress = eta = None
+        if self.total_bytes:
+            progress = min(done / self.total_bytes, 1.0)
+            if done:
+                eta = elapsed * max(self.total_bytes - done, 0) / done
+        return {
+            "lines": lines,
+            "bytes": done,
+            "tokens": tokens,
+            "tokens_per_second": tokens / elapsed,
+            "error_codes": error_codes,
+            "elapsed_seconds": elapsed,
+            "progress": progress,
+            "eta_seconds": eta,
+        }
+
+    def publish(self):
+        """Writes the current metrics to the stream and the metrics file."""
+        snapshot = self.snapshot()
+        if self.stream is not None:
+            self.stream.write(f"{self.format_line(snapshot)}\n")
+            self.stream.flush()
+        if self.metrics_path is not None:
+            temp_path = f"{self.metrics_path}.tmp"
+            with open(temp_path, "w") as writer:
+                writer.write(self.format_metrics(snapshot))
+            os.replace(temp_path, self.metrics_path)
+
+    @staticmethod
+    def format_line(snapshot):
+        """Formats a snapshot as a single human-readable progress line."""
+        parts = []
+        if snapshot["progress"] is not None:
+            parts.append(f"{snapshot['progress']:6.1%}")
+        parts.append(f"{snapshot['lines']:,} lines")
+        parts.append(f"{snapshot['tokens_per_second']:,.0f} tokens/s")
+        parts.append(
+            " ".join(f"{code} {n:,}" for code, n in snapshot["error_codes"].items())
+        )
+        if snapshot["eta_seconds"] is not None:
+            parts.append(f"ETA {_format_duration(snapshot['eta_seconds'])}")
+        return "progress: " + " | ".join(part for part in parts if part)
+
+    @staticmethod
+    def format_metrics(snapshot):
+        """Formats a snapshot in the Prometheus text exposition format."""
+        metrics = (
+            ("lines_processed_total", "counter", "Lines processed.", "lines"),
+            ("bytes_processed_total", "counter", "Input bytes processed.", "bytes"),
+            ("tokens_processed_total", "counter", "Tokens processed.", "tokens"),
+            ("tokens_per_second", "gauge", "Tokens per second.", "tokens_per_second"),
+            ("progress_ratio", "gauge", "Share of the input processed.", "progress"),
+            ("eta_seconds", "gauge", "Estimated seconds left.", "eta_seconds"),
+        )
+        lines = []
+        for name, kind, help_text, key in metrics:
+            if snapshot[key] is None:
+                continue
+            lines.append(f"# HELP {METRIC_PREFIX}_{name} {help_text}")
+            lines.append(f"# TYPE {METRIC_PREFIX}_{name} {kind}")
+            lines.append(f"{METRIC_PREFIX}_{name} {snapshot[key]}")
+        name = f"{METRIC_PREFIX}_error_codes_total"
+        lines.append(f"# HELP {name} Tokens processed, per error code.")
+        lines.append(f"# TYPE {name} counter")
+        for code, count in snapshot["error_codes"].items():
+            lines.append(f'{name}{{code="{code}"}} {count}')
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,166 @@
+import math
+from statistics import NormalDist
+
+from classes.custom_errors import QualityGateError
+
+DEFAULT_CONFIDENCE = 0.999
+
+
+class QualityGate:
+    """The QualityGate class is a limit on the tokens with some error codes,
+    in the whole input or in one LX section: at most max_count of them, or
+    at most a share max_rate of the tokens.
+
+    A count limit is breached as soon as it is exceeded. While the input is
+    still being processed, a rate limit is only breached decisively: when
+    the lower bound of the (one-sided, Wilson score) confidence interval of
+    the rate seen so far exceeds max_rate, so that a run of bad lines at the
+    top of a good feed does not trip it. The confidence is high by default
+    because the gate is checked again after every line. At the end of the
+    input, the rate itself is compared with max_rate.
+
+    Attributes:
+        codes:
+            The error codes counted against the limit (a tuple of str).
+        max_rate:
+            The largest acceptable share of tokens with those codes,
+            or None.
+        max_count:
+            The largest acceptable number of tokens with those codes,
+            or None.
+        section:
+            The LX section the gate applies to, or None for every section.
+        confidence:
+            The confidence required to trip a rate limit before the end
+            of the input.
+    """
+
+    def __init__(
+        self,
+        codes,
+        max_rate=None,
+        max_count=None,
+        section=None,
+        confidence=DEFAULT_CONFIDENCE,
+    ):
+        """Inits QualityGate with codes (an error code or a sequence of
+        them), one of max_rate and max_count, section and confidence."""
+        if (max_rate is None) == (max_count is None):
+            raise ValueError("A quality gate needs one of max_rate and max_count.")
+        self.codes = (codes,) if isinstance(codes, str) else tuple(codes)
+        self.max_rate = max_rate
+        self.max_count = max_count
+        self.section = section
+        self.confidence = confidence
+        self._z = NormalDist().inv_cdf(confidence)
+
+    def __str__(self):
+        codes = "+".join(self.codes)
+        scope = f" in {self.section}" if self.section is not None else ""
+        if self.max_count is not None:
+            return f"{codes} count{scope} <= {self.max_count}"
+        return f"{codes} rate{scope} <= {self.max_rate:g}"
+
+    def rate_lower_bound(self, matched, tokens):
+        """Returns the lower bound of the Wilson score interval of the rate
+        of matched tokens among tokens."""
+        z2 = self._z * self._z
+        rate = matched / tokens
+        centre = rate + z2 / (2 * tokens)
+        spread = self._z * math.sqrt(
+            rate * (1 - rate) / tokens + z2 / (4 * tokens**2)
+        )
+        return (centre - spread) / (1 + z2 / tokens)
+
+    def breached(self, matched, tokens, final=False):
+        """Returns whether the gate is breached by matched tokens with its
+        codes among tokens.
+
+        Args:
+            matched: The number of tokens with the gate's error codes.
+            tokens: The number of tokens the gate applies to.
+            final: Boolean, True once the whole input has been processed.
+
+        Returns:
+            bool: Whether the gate is breached.
+
+        Raises:
+
+        """
+        if self.max_count is not None:
+            return matched > self.max_count
+        if not tokens or matched <= self.max_rate * tokens:
+            return False
+        return final or self.rate_lower_bound(matched, tokens) > self.max_rate
+
+
+class QualityGateMonitor:
+    """The QualityGateMonitor class evaluates quality gates incrementally,
+    line by line, over the data of a run.
+
+    Attributes:
+        gates:
+            The QualityGates evaluated.
+        matched:
+            For every gate, the number of tokens with its error codes.
+        tokens:
+            For every gate, the number of tokens it applies to.
+        next_line:
+            The number of the next input line to be checked.
+    """
+
+    def __init__(self, gates, first_line=0):
+        """Inits QualityGateMonitor with gates and the number of the first
+        input line (e.g. the start of a line range)."""
+        self.gates = list(gates)
+        self.matched = [0] * len(self.gates)
+        self.tokens = [0] * len(self.gates)
+        self.next_line = first_line
+
+    def _trip(self, index, line):
+        raise QualityGateError(
+            str(self.gates[index]), line, self.matched[index], self.tokens[index]
+        )
+
+    def check_lines(self, lines_data):
+        """Adds the data of consecutive input lines, checking every gate
+        after every line.
+
+        Args:
+            lines_data: A list of lists of dictionaries, each list
+            representing data from a single line.
+
+        Returns:
+
+        Raises:
+            QualityGateError: A gate is breached.
+        """
+        gates = [
+            (index, gate, frozenset(gate.codes).__contains__)
+            for index, gate in enumerate(self.gates)
+        ]
+        matched, tokens = self.matched, self.tokens
+        for line, line_data in enumerate(lines_data, self.next_line):
+            if not line_data:
+                continue
+            section = line_data[0]["report_data"]["Section"]
+            codes = [item["report_data"]["Error Code"] for item in line_data]
+            for index, gate, counted in gates:
+                if gate.section is not None and gate.section != section:
+                    continue
+                tokens[index] += len(codes)
+                matched[index] += sum(map(counted, codes))
+                if gate.breached(matched[index], tokens[index]):
+                    self.next_line = line + 1
+                    self._trip(index, line)
+        self.next_line += len(lines_data)
+
+    def finish(self):
+        """Checks the rate limits against the rates of the whole input.
+
+        Raises:
+            QualityGateError: A gate is breached.
+        """
+        for index, gate in enumerate(self.gates):
+            if gate.breached(self.matched[index], self.tokens[index], final=True):
+                self._trip(index, self.next_line - 1)
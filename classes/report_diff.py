@@ -0,0 +1,525 @@
+import csv
+import hashlib
+import io
+import itertools
+import json
+import os
+import random
+
+from classes.custom_errors import ReportManifestError
+
+# A report manifest is a JSON sidecar (`<report path>.manifest`) cutting a
+# report into chunks of lines_per_chunk input lines. For every chunk it
+# records the byte range of its rows, the sha256 digest of those bytes and
+# its error-code counts per section, so two reports can be diffed without
+# reading the chunks they have in common.
+MANIFEST_SUFFIX = ".manifest"
+MANIFEST_VERSION = 1
+DEFAULT_LINES_PER_CHUNK = 4096
+DEFAULT_SAMPLE_SIZE = 5
+# The error code of a sub-section a line does not have in one of the reports
+# (e.g. after sub-sections were added to or removed from the definition).
+ABSENT = "-"
+KEY_COLUMNS = ("Section", "Sub-Section", "Error Code")
+
+
+def _key_columns(header, path):
+    """Returns the positions of the section, sub-section and error code
+    columns in a report header.
+
+    Raises:
+        ValueError: The header lacks one of those columns.
+    """
+    missing = [column for column in KEY_COLUMNS if column not in header]
+    if missing:
+        raise ValueError(f"{path} is not a report: no {', '.join(missing)} column.")
+    return tuple(header.index(column) for column in KEY_COLUMNS)
+
+
+def _parse_row(raw):
+    """Splits a raw report row (bytes), falling back to the csv module for
+    quoted fields."""
+    text = raw.decode("utf-8")
+    if '"' in text:
+        return next(csv.reader([text]))
+    return text.rstrip("\r\n").split(",")
+
+
+def iter_report_lines(rows, section_column=0, sub_section_column=1):
+    """Groups the rows of a report by input line.
+
+    A report holds one row per sub-section of every input line, in input
+    order, so a new line starts whenever the section changes or a
+    sub-section repeats.
+
+    Args:
+        rows: An iterable of report rows (lists of fields), without the
+        header.
+        section_column: The position of the Section column.
+        sub_section_column: The position of the Sub-Section column.
+
+    Returns:
+        A generator of lists of rows, one list per input line.
+
+    Raises:
+
+    """
+    line = []
+    seen = set()
+    for row in rows:
+        repeated = row[sub_section_column] in seen
+        if repeated or (line and row[section_column] != line[0][section_column]):
+            yield line
+            line = []
+            seen = set()
+        line.append(row)
+        seen.add(row[sub_section_column])
+    if line:
+        yield line
+
+
+class ReportManifest:
+    """The ReportManifest class records, for every chunk of input lines of
+    a csv report, where its rows are, a digest of their bytes and their
+    error-code counts per section.
+
+    Two reports whose manifests have the same lines_per_chunk can be
+    diffed chunk by chunk: chunks with the same digest are identical, so
+    their counts are added to the diff without reading them (see
+    diff_reports). A manifest is stored in a sidecar file next to the
+    report and is only trusted while the report keeps the size and
+    modification time it had when the manifest was built.
+
+    Attributes:
+        report_path:
+            The path to the report.
+        lines_per_chunk:
+            The number of input lines per chunk.
+        file_size:
+            The size of the report (in bytes) when the manifest was built.
+        mtime_ns:
+            The modification time of the report when the manifest was built.
+        header:
+            The header row of the report.
+        chunks:
+            A list with, for every chunk, a dictionary holding the "offset"
+            and "end" of its rows, its number of "lines", the "sha256" of
+            its rows and its "counts" (section -> error code -> count).
+    """
+
+    def __init__(
+        self, report_path, lines_per_chunk, file_size, mtime_ns, header, chunks
+    ):
+        """Inits ReportManifest with the manifest metadata and chunks."""
+        self.report_path = report_path
+        self.lines_per_chunk = lines_per_chunk
+        self.file_size = file_size
+        self.mtime_ns = mtime_ns
+        self.header = header
+        self.chunks = chunks
+
+    @staticmethod
+    def sidecar_path(report_path):
+        """Returns the default sidecar path of the manifest of report_path."""
+        return f"{report_path}{MANIFEST_SUFFIX}"
+
+    @classmethod
+    def build(cls, report_path, lines_per_chunk=DEFAULT_LINES_PER_CHUNK):
+        """Builds the manifest of a report with a single pass over it.
+
+        Args:
+            report_path: Path to the report (str).
+            lines_per_chunk: The number of input lines per chunk.
+
+        Returns:
+            ReportManifest: The manifest of the report.
+
+        Raises:
+            ValueError: The file is not a report.
+        """
+        stat = os.stat(report_path)
+        chunks = []
+        with open(report_path, "rb") as reader:
+            raw_header = reader.readline()
+            header = _parse_row(raw_header) if raw_header else list(KEY_COLUMNS)
+            section, sub_section, error_code = _key_columns(header, report_path)
+            position = len(raw_header)
+            chunk = {"offset": position, "lines": 0, "counts": {}}
+            digest = hashlib.sha256()
+            line_section = None
+            seen = set()
+            for raw in reader:
+                row = _parse_row(raw)
+                # The same rule as iter_report_lines, tracking byte offsets.
+                if row[sub_section] in seen or row[section] != line_section:
+                    if chunk["lines"] == lines_per_chunk:
+                        chunks.append(cls._close_chunk(chunk, digest, position))
+                        chunk = {"offset": position, "lines": 0, "counts": {}}
+                        digest = hashlib.sha256()
+                    chunk["lines"] += 1
+                    line_section = row[section]
+                    seen = set()
+                seen.add(row[sub_section])
+                digest.update(raw)
+                counts = chunk["counts"].setdefault(row[section], {})
+                counts[row[error_code]] = counts.get(row[error_code], 0) + 1
+                position += len(raw)
+            if chunk["lines"]:
+                chunks.append(cls._close_chunk(chunk, digest, position))
+        return cls(
+            report_path, lines_per_chunk, stat.st_size, stat.st_mtime_ns, header, chunks
+        )
+
+    @staticmethod
+    def _close_chunk(chunk, digest, end):
+        return {
+            "offset": chunk["offset"],
+            "end": end,
+            "lines": chunk["lines"],
+            "sha256": digest.hexdigest(),
+            "counts": chunk["counts"],
+        }
+
+    def save(self, manifest_path=None):
+        """Writes the manifest to its sidecar file.
+
+        Args:
+            manifest_path: Path of the sidecar file (defaults to
+            `<report_path>.manifest`).
+
+        Returns:
+
+        Raises:
+
+        """
+        manifest_path = manifest_path or self.sidecar_path(self.report_path)
+        with open(manifest_path, "w") as writer:
+            json.dump(
+                {
+                    "version": MANIFEST_VERSION,
+                    "lines_per_chunk": self.lines_per_chunk,
+                    "file_size": self.file_size,
+                    "mtime_ns": self.mtime_ns,
+                    "header": self.header,
+                    "chunks": self.chunks,
+                },
+                writer,
+            )
+
+    @classmethod
+    def load(cls, report_path, manifest_path=None):
+        """Loads the manifest of report_path from its sidecar file.
+
+        Args:
+            report_path: Path to the report (str).
+            manifest_path: Path of the sidecar file (defaults to
+            `<report_path>.manifest`).
+
+        Returns:
+            ReportManifest: The manifest of the report.
+
+        Raises:
+            ReportManifestError: The sidecar file is malformed or the report
+            has changed since the manifest was built.
+        """
+        manifest_path = manifest_path or cls.sidecar_path(report_path)
+        with open(manifest_path) as reader:
+            try:
+                fields = json.load(reader)
+            except ValueError:
+                raise ReportManifestError(manifest_path, "not JSON")
+        if not isinstance(fields, dict) or fields.get("version") != MANIFEST_VERSION:
+            raise ReportManifestError(manifest_path, "unknown version")
+        stat = os.stat(report_path)
+        if (stat.st_size, stat.st_mtime_ns) != (
+            fields["file_size"],
+            fields["mtime_ns"],
+        ):
+            raise ReportManifestError(
+                manifest_path, f"{report_path} changed since the manifest was built"
+            )
+        return cls(
+            report_path,
+            fields["lines_per_chunk"],
+            fields["file_size"],
+            fields["mtime_ns"],
+            fields["header"],
+            fields["chunks"],
+        )
+
+    @classmethod
+    def load_if_fresh(cls, report_path):
+        """Returns the manifest of report_path from its sidecar file, or
+        None if it is missing, malformed or stale."""
+        try:
+            return cls.load(report_path)
+        except (FileNotFoundError, ReportManifestError):
+            return None
+
+
+class ReportDiff:
+    """The ReportDiff class holds the differences between the reports of
+    two runs over the same input: for every section, how many tokens went
+    from one error code to another, plus sampled example rows of every
+    change.
+
+    Lines are matched by position and, within a line, rows by sub-section.
+    A sub-section found in one report only counts as a transition from or
+    to ABSENT.
+
+    Attributes:
+        transitions:
+            A dictionary mapping every section to a dictionary mapping
+            (old error code, new error code) pairs to token counts.
+        examples:
+            A dictionary mapping (section, old code, new code) changes to
+            up to sample_size examples, sampled uniformly (reservoir
+            sampling), each a dictionary with the 0-based input "line" and
+            the "old" and "new" rows (None when absent).
+        lines:
+            The number of lines compared.
+        lines_only_in_old:
+            The number of lines at the end of the old report only.
+        lines_only_in_new:
+            The number of lines at the end of the new report only.
+        chunks_skipped:
+            The number of manifest chunks found identical and not read.
+        sample_size:
+            The maximum number of examples kept per change.
+    """
+
+    def __init__(self, sample_size=DEFAULT_SAMPLE_SIZE, seed=0):
+        """Inits ReportDiff with sample_size and the seed of the example
+        sampling."""
+        self.transitions = {}
+        self.examples = {}
+        self.lines = 0
+        self.lines_only_in_old = 0
+        self.lines_only_in_new = 0
+        self.chunks_skipped = 0
+        self.sample_size = sample_size
+        self._seen = {}
+        self._rng = random.Random(seed)
+
+    def _count(self, section, old_code, new_code, count=1):
+        section_transitions = self.transitions.setdefault(section, {})
+        key = (old_code, new_code)
+        section_transitions[key] = section_transitions.get(key, 0) + count
+
+    def _sample(self, key, line, old_row, new_row):
+        seen = self._seen.get(key, 0) + 1
+        self._seen[key] = seen
+        examples = self.examples.setdefault(key, [])
+        example = {"line": line, "old": old_row, "new": new_row}
+        if len(examples) < self.sample_size:
+            examples.append(example)
+        else:
+            slot = self._rng.randrange(seen)
+            if slot < self.sample_size:
+                examples[slot] = example
+
+    def add_counts(self, counts):
+        """Adds unchanged tokens (section -> error code -> count)."""
+        for section, codes in counts.items():
+            for code, count in codes.items():
+                self._count(section, code, code, count)
+
+    def compare_lines(self, old_lines, new_lines, first_line, old_columns, new_columns):
+        """Compares two sequences of report lines in lockstep.
+
+        Args:
+            old_lines: An iterable of lines (lists of rows) of the old report.
+            new_lines: An iterable of lines of the new report.
+            first_line: The number of the first line compared.
+            old_columns: The positions of the key columns in old rows.
+            new_columns: The positions of the key columns in new rows.
+
+        Returns:
+            int: The number of the line after the last one compared.
+
+        Raises:
+
+        """
+        old_section, old_sub_section, old_code = old_columns
+        new_section, new_sub_section, new_code = new_columns
+        line = first_line
+        for old_line, new_line in itertools.zip_longest(old_lines, new_lines):
+            if new_line is None:
+                self.lines_only_in_old += 1
+            elif old_line is None:
+                self.lines_only_in_new += 1
+            else:
+                self.lines += 1
+            old_rows = {row[old_sub_section]: row for row in old_line or ()}
+            for new_row in new_line or ():
+                old_row = old_rows.pop(new_row[new_sub_section], None)
+                section = new_row[new_section]
+                before = ABSENT if old_row is None else old_row[old_code]
+                after = new_row[new_code]
+                self._count(section, before, after)
+                if before != after:
+                    self._sample((section, before, after), line, old_row, new_row)
+            for old_row in old_rows.values():
+                section = old_row[old_section]
+                self._count(section, old_row[old_code], ABSENT)
+                self._sample((section, old_row[old_code], ABSENT), line, old_row, None)
+            line += 1
+        return line
+
+    def changed(self):
+        """Returns the number of tokens whose error code changed."""
+        return sum(
+            count
+            for section_transitions in self.transitions.values()
+            for (before, after), count in section_transitions.items()
+            if before != after
+        )
+
+    def to_dict(self):
+        """Returns the diff as a JSON-serializable dictionary."""
+        return {
+            "lines": self.lines,
+            "lines_only_in_old": self.lines_only_in_old,
+            "lines_only_in_new": self.lines_only_in_new,
+            "changed_tokens": self.changed(),
+            "chunks_skipped": self.chunks_skipped,
+            "transitions": {
+                section: {
+                    f"{before}->{after}": count
+                    for (before, after), count in sorted(section_transitions.items())
+                }
+                for section, section_transitions in sorted(self.transitions.items())
+            },
+            "examples": [
+                {"section": section, "old_code": before, "new_code": after, **example}
+                for (section, before, after), examples in sorted(self.examples.items())
+                for example in sorted(examples, key=lambda example: example["line"])
+            ],
+        }
+
+    def format_matrices(self):
+        """Formats the transitions of every section as a text matrix of
+        old error codes (rows) by new error codes (columns)."""
+        blocks = []
+        for section, section_transitions in sorted(self.transitions.items()):
+            old_codes = sorted({before for before, _ in section_transitions})
+            new_codes = sorted({after for _, after in section_transitions})
+            width = max(
+                [len(str(count)) for count in section_transitions.values()] + [3]
+            )
+            lines = [f"{section:<4} " + " ".join(f"{c:>{width}}" for c in new_codes)]
+            for before in old_codes:
+                cells = (
+                    section_transitions.get((before, after), 0) for after in new_codes
+                )
+                lines.append(f"{before:<4} " + " ".join(f"{c:>{width}}" for c in cells))
+            blocks.append("\n".join(lines))
+        return "\n\n".join(blocks) + "\n"
+
+    def write(self, output_path):
+        """Writes the diff (see to_dict) to output_path as JSON."""
+        with open(output_path, "w") as writer:
+            json.dump(self.to_dict(), writer, indent=2)
+
+
+def _iter_csv_lines(reader, columns):
+    """Returns a generator of the lines of a report read by a csv reader."""
+    section, sub_section, _ = columns
+    return iter_report_lines(reader, section, sub_section)
+
+
+def _read_chunk_lines(report_file, chunk, columns):
+    """Returns the lines of one manifest chunk of an open report file."""
+    report_file.seek(chunk["offset"])
+    text = report_file.read(chunk["end"] - chunk["offset"]).decode("utf-8")
+    return _iter_csv_lines(csv.reader(io.StringIO(text, newline="")), columns)
+
+
+def diff_reports(
+    old_report_path,
+    new_report_path,
+    sample_size=DEFAULT_SAMPLE_SIZE,
+    seed=0,
+    use_manifests=True,
+):
+    """Diffs the reports of two runs over the same input, in constant
+    memory.
+
+    Both reports are read once, in lockstep. When both have a fresh
+    manifest (see ReportManifest) with the same lines_per_chunk, chunks
+    with identical digests are counted from their manifests without being
+    read, and only the other chunks are compared row by row.
+
+    Args:
+        old_report_path: Path to the report of the earlier run (str).
+        new_report_path: Path to the report of the later run (str).
+        sample_size: The maximum number of example rows kept per change
+        of error code.
+        seed: The seed of the example sampling.
+        use_manifests: Boolean to use the reports' manifests when they
+        exist.
+
+    Returns:
+        ReportDiff: The transitions and examples.
+
+    Raises:
+        ValueError: A file is not a report.
+    """
+    diff = ReportDiff(sample_size, seed)
+    if use_manifests:
+        old_manifest = ReportManifest.load_if_fresh(old_report_path)
+        new_manifest = ReportManifest.load_if_fresh(new_report_path)
+        if _comparable(old_manifest, new_manifest):
+            _diff_chunks(diff, old_manifest, new_manifest)
+            return diff
+
+    with open(old_report_path, newline="") as old_file, open(
+        new_report_path, newline=""
+    ) as new_file:
+        old_reader = csv.reader(old_file)
+        new_reader = csv.reader(new_file)
+        old_columns = _key_columns(next(old_reader, KEY_COLUMNS), old_report_path)
+        new_columns = _key_columns(next(new_reader, KEY_COLUMNS), new_report_path)
+        diff.compare_lines(
+            _iter_csv_lines(old_reader, old_columns),
+            _iter_csv_lines(new_reader, new_columns),
+            0,
+            old_columns,
+            new_columns,
+        )
+    return diff
+
+
+def _comparable(old_manifest, new_manifest):
+    """Returns whether two reports can be diffed with their manifests."""
+    if old_manifest is None or new_manifest is None:
+        return False
+    same_chunks = old_manifest.lines_per_chunk == new_manifest.lines_per_chunk
+    return same_chunks and old_manifest.header == new_manifest.header
+
+
+def _diff_chunks(diff, old_manifest, new_manifest):
+    """Diffs two reports chunk by chunk, counting identical chunks from
+    their manifests and comparing the others row by row."""
+    columns = _key_columns(new_manifest.header, new_manifest.report_path)
+    line = 0
+    with open(old_manifest.report_path, "rb") as old_file, open(
+        new_manifest.report_path, "rb"
+    ) as new_file:
+        for old_chunk, new_chunk in itertools.zip_longest(
+            old_manifest.chunks, new_manifest.chunks
+        ):
+            if old_chunk is None:
+                old_lines = ()
+            elif new_chunk is not None and old_chunk["sha256"] == new_chunk["sha256"]:
+                diff.add_counts(new_chunk["counts"])
+                diff.lines += new_chunk["lines"]
+                diff.chunks_skipped += 1
+                line += new_chunk["lines"]
+                continue
+            else:
+                old_lines = _read_chunk_lines(old_file, old_chunk, columns)
+            new_lines = ()
+            if new_chunk is not None:
+                new_lines = _read_chunk_lines(new_file, new_chunk, columns)
+            line = diff.compare_lines(old_lines, new_lines, line, columns, columns)
@@ -0,0 +1,129 @@
+from classes.batch_line_processor import ERROR_CODES, CompiledDefinition
+from classes.columnar_report import COLUMNS
+
+# The csv module's default (excel) dialect.
+DELIMITER = ","
+QUOTECHAR = '"'
+LINE_TERMINATOR = "\r\n"
+_SPECIAL_CHARACTERS = frozenset(DELIMITER + QUOTECHAR + LINE_TERMINATOR)
+
+
+def format_field(value):
+    """Renders one field the way csv.writer does with the excel dialect
+    (QUOTE_MINIMAL): quoted, with quotes doubled, only if it holds the
+    delimiter, the quote character or a line break."""
+    text = "" if value is None else str(value)
+    if _SPECIAL_CHARACTERS.isdisjoint(text):
+        return text
+    return f"{QUOTECHAR}{text.replace(QUOTECHAR, QUOTECHAR * 2)}{QUOTECHAR}"
+
+
+def format_row(values):
+    """Renders a whole row (with its line terminator) like csv.writer."""
+    return DELIMITER.join(map(format_field, values)) + LINE_TERMINATOR
+
+
+class ReportSerializer:
+    """The ReportSerializer class renders report rows straight from the
+    result records of a standard definition, byte for byte as
+    csv.DictWriter would.
+
+    Every field of a row but the given data type and the given length
+    depends only on the row's sub-section and error code, so it is rendered
+    (and quoted, if need be) once, when the serializer is built: a row is
+    then the concatenation of a pre-rendered prefix, middle and suffix with
+    the two token-derived fields. Given data types come from a small set
+    and are rendered once each; given lengths are integers (or empty) and
+    never need quoting. Rows of sub-sections the definition does not know
+    are rendered field by field.
+
+    Attributes:
+        header:
+            The rendered header row.
+    """
+
+    def __init__(self, standard_definition):
+        """Inits ReportSerializer by pre-rendering the fixed fields of every
+        sub-section of standard_definition (a list of dicts or a
+        CompiledDefinition, whose sections are reused)."""
+        if not isinstance(standard_definition, CompiledDefinition):
+            standard_definition = CompiledDefinition(standard_definition)
+        self.header = format_row(COLUMNS)
+        # {lx: {lxy: (prefix, middle, {error code: suffix})}}
+        self._fixed = {}
+        for lx, sub_sections in standard_definition.sections.items():
+            if sub_sections is None:
+                continue
+            section = self._fixed.setdefault(lx, {})
+            for sub in sub_sections:
+                section[sub.key] = (
+                    f"{format_field(lx)}{DELIMITER}{format_field(sub.key)}{DELIMITER}",
+                    f"{DELIMITER}{format_field(sub.data_type)}{DELIMITER}",
+                    {
+                        code: (
+                            f"{DELIMITER}{format_field(sub.max_length)}"
+                            f"{DELIMITER}{code}{LINE_TERMINATOR}"
+                        )
+                        for code in ERROR_CODES
+                    },
+                )
+        self._data_types = {}
+
+    def _data_type(self, data_type):
+        rendered = self._data_types[data_type] = format_field(data_type)
+        return rendered
+
+    def serialize_lines(self, lines_data):
+        """Renders the report rows of several lines.
+
+        Args:
+            lines_data: A list of lists of dictionaries, each list
+            representing data from a single line.
+
+        Returns:
+            str: The rows, each ending with the csv line terminator.
+
+        Raises:
+
+        """
+        fixed = self._fixed
+        data_types = self._data_types
+        parts = []
+        append = parts.append
+        for line_data in lines_data:
+            for item in line_data:
+                row = item["report_data"]
+                sub_section = fixed.get(row["Section"], {}).get(row["Sub-Section"])
+                if sub_section is None:
+                    append(format_row(row.values()))
+                    continue
+                prefix, middle, suffixes = sub_section
+                data_type = row["Given DataType"]
+                given = data_types.get(data_type)
+                if given is None:
+                    given = self._data_type(data_type)
+                append(prefix)
+                append(given)
+                append(middle)
+                append(str(row["Given Length"]))
+                append(suffixes[row["Error Code"]])
+        return "".join(parts)
+
+    def write_lines(self, report_file, lines_data):
+        """Appends the report rows of several lines to an open report file
+        (opened with newline=""), starting with the header if the file is
+        empty.
+
+        Args:
+            report_file: The report file, opened for appending.
+            lines_data: A list of lists of dictionaries, each list
+            representing data from a single line.
+
+        Returns:
+
+        Raises:
+
+        """
+        if report_file.tell() == 0:
+            report_file.write(self.header)
+        report_file.write(self.serialize_lines(lines_data))
@@ -0,0 +1,154 @@
+import re
+
+from classes.custom_errors import RunLengthSummaryFormatError
+
+# A run-length summary starts with MAGIC_LINE. Every run of consecutive input
+# lines with identical summaries is then written as one block:
+#
+#   @@ lines <first>-<last> x<count>
+#   <message of the first token>
+#   ...
+#   <message of the last token>
+#   <empty line>
+#
+# where <first> and <last> are the (0-based, inclusive) numbers of the first
+# and last input lines of the run, and <count> = <last> - <first> + 1.
+MAGIC_LINE = "# run-length summary v1\n"
+RUN_HEADER = re.compile(r"@@ lines (\d+)-(\d+) x(\d+)\n")
+
+
+class RunLengthSummaryWriter:
+    """The RunLengthSummaryWriter class writes a compact, run-length
+    encoded version of the text summary.
+
+    Consecutive input lines whose summaries are identical (the same
+    messages, in the same order) are written once, as a block holding the
+    line range and the repeat count of the run. Messages are compared as
+    tuples of the strings pre-rendered for every sub-section, so detecting
+    a run costs little more than an identity check per token. The file is
+    kept open for the whole run and can be expanded back to the format of
+    Generator.generate_summary with expand_summary().
+
+    Attributes:
+        output_path:
+            The path of the run-length summary file.
+        next_line:
+            The number of the next input line to be written.
+    """
+
+    def __init__(self, output_path, first_line=0):
+        """Inits RunLengthSummaryWriter with output_path and the number of
+        the first input line (e.g. the start of a line range)."""
+        self.output_path = output_path
+        self.next_line = first_line
+        self._file = open(output_path, "w")
+        self._file.write(MAGIC_LINE)
+        self._messages = None
+        self._run_start = first_line
+
+    def _flush_run(self):
+        if self._messages is None:
+            return
+        last = self.next_line - 1
+        self._file.write(
+            f"@@ lines {self._run_start}-{last} x{last - self._run_start + 1}\n"
+        )
+        for message in self._messages:
+            self._file.write(f"{message}\n")
+        self._file.write("\n")
+
+    def write_lines(self, lines_data):
+        """Adds the summaries of consecutive input lines.
+
+        Args:
+            lines_data: A list of lists of dictionaries, each list
+            representing data from a single line.
+
+        Returns:
+
+        Raises:
+
+        """
+        for line_data in lines_data:
+            messages = tuple(
+                item["summary_data"]["Error Message"] for item in line_data
+            )
+            if messages != self._messages:
+                self._flush_run()
+                self._messages = messages
+                self._run_start = self.next_line
+            self.next_line += 1
+
+    def close(self):
+        """Writes the last run and closes the file."""
+        if self._file.closed:
+            return
+        self._flush_run()
+        self._messages = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def iter_runs(path):
+    """Yield the runs of a run-length summary file.
+
+    Args:
+        path: The path of the run-length summary file.
+
+    Returns:
+        A generator of (first line, last line, count, list of messages)
+        tuples, in file order.
+
+    Raises:
+        RunLengthSummaryFormatError: The file is not a valid run-length
+        summary.
+    """
+    with open(path) as reader:
+        if reader.readline() != MAGIC_LINE:
+            raise RunLengthSummaryFormatError(path, "missing header")
+        while True:
+            header = reader.readline()
+            if not header:
+                return
+            match = RUN_HEADER.fullmatch(header)
+            if match is None:
+                raise RunLengthSummaryFormatError(path, f"bad run header {header!r}")
+            first, last, count = (int(group) for group in match.groups())
+            if count != last - first + 1:
+                raise RunLengthSummaryFormatError(path, f"bad run header {header!r}")
+            messages = []
+            for message in reader:
+                if message == "\n":
+                    break
+                if not message.endswith("\n"):
+                    raise RunLengthSummaryFormatError(path, "truncated run")
+                messages.append(message[:-1])
+            else:
+                raise RunLengthSummaryFormatError(path, "truncated run")
+            yield first, last, count, messages
+
+
+def expand_summary(rle_path, output_path):
+    """Expands a run-length summary back to the text summary format of
+    Generator.generate_summary.
+
+    Args:
+        rle_path: The path of the run-length summary file.
+        output_path: The path of the text summary to write.
+
+    Returns:
+
+    Raises:
+        RunLengthSummaryFormatError: The file is not a valid run-length
+        summary.
+    """
+    with open(output_path, "w") as writer:
+        for _, _, count, messages in iter_runs(rle_path):
+            block = "".join(f"{message}\n" for message in messages) + "\n"
+            for _ in range(count):
+                writer.write(block)
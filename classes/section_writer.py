@@ -0,0 +1,208 @@
+import csv
+import os
+import threading
+from collections import OrderedDict
+
+from utils import make_dir_if_absent
+
+DEFAULT_MAX_OPEN_FILES = 64
+DEFAULT_BUFFER_SIZE = 1 << 16
+REPORT_FILE = "report.csv"
+SUMMARY_FILE = "summary.txt"
+
+
+class SectionPartitionedWriter:
+    """The SectionPartitionedWriter class writes one report and one summary
+    file per LX section (e.g. `<output_dir>/L1/report.csv`).
+
+    Every section file has its own buffered writer. Open handles are kept
+    in a least-recently-used cache capped at max_open_files, so definitions
+    with many sections do not exhaust file descriptors: evicted files are
+    flushed, closed and reopened in append mode the next time their section
+    is written. Different sections can be written from different threads at
+    the same time, which is how the parallel processing path of Generator
+    writes them concurrently.
+
+    Attributes:
+        output_dir:
+            The directory holding one sub-directory per section.
+        report:
+            Boolean to determine if per-section reports should be written.
+        summary:
+            Boolean to determine if per-section summaries should be written.
+        max_open_files:
+            The maximum number of files held open at the same time.
+        buffer_size:
+            The buffer size (in bytes) of every section file.
+    """
+
+    def __init__(
+        self,
+        output_dir,
+        report=True,
+        summary=True,
+        max_open_files=DEFAULT_MAX_OPEN_FILES,
+        buffer_size=DEFAULT_BUFFER_SIZE,
+    ):
+        """Inits SectionPartitionedWriter with output_dir, the analyses to
+        write and the limits on open files and buffering."""
+        self.output_dir = output_dir
+        self.report = report
+        self.summary = summary
+        self.max_open_files = max(max_open_files, 2)
+        self.buffer_size = buffer_size
+        self._handles = OrderedDict()
+        self._in_use = {}
+        self._section_locks = {}
+        self._lock = threading.Condition()
+
+    @property
+    def files_per_section(self):
+        """The number of files written for every section."""
+        return int(self.report) + int(self.summary)
+
+    @property
+    def max_concurrent_sections(self):
+        """The number of sections that can be written at the same time
+        without exceeding max_open_files."""
+        return max(self.max_open_files // max(self.files_per_section, 1), 1)
+
+    def section_paths(self, section):
+        """Returns the (report path, summary path) of a section."""
+        section_dir = os.path.join(self.output_dir, section)
+        return (
+            os.path.join(section_dir, REPORT_FILE),
+            os.path.join(section_dir, SUMMARY_FILE),
+        )
+
+    def _open(self, section):
+        """Opens the files of a section in append mode."""
+        report_path, summary_path = self.section_paths(section)
+        make_dir_if_absent(os.path.dirname(report_path))
+        report_file = summary_file = None
+        if self.report:
+            report_file = open(report_path, "a", newline="", buffering=self.buffer_size)
+        if self.summary:
+            summary_file = open(summary_path, "a", buffering=self.buffer_size)
+        return report_file, summary_file
+
+    def _acquire(self, section):
+        """Returns the open files of a section, evicting idle sections
+        while the cap on open files would be exceeded."""
+        with self._lock:
+            handles = self._handles.get(section)
+            if handles is not None:
+                self._handles.move_to_end(section)
+            else:
+                limit = self.max_open_files - self.files_per_section
+                while len(self._handles) * self.files_per_section > limit:
+                    idle = next(
+                        (key for key in self._handles if not self._in_use.get(key)),
+                        None,
+                    )
+                    if idle is None:
+                        self._lock.wait()
+                        continue
+                    self._close_files(self._handles.pop(idle))
+                handles = self._handles[section] = self._open(section)
+            self._in_use[section] = self._in_use.get(section, 0) + 1
+            return handles
+
+    def _release(self, section):
+        """Marks the files of a section as no longer being written."""
+        with self._lock:
+            self._in_use[section] -= 1
+            self._lock.notify_all()
+
+    def _section_lock(self, section):
+        """Returns the lock serialising writes to a single section."""
+        with self._lock:
+            return self._section_locks.setdefault(section, threading.Lock())
+
+    @staticmethod
+    def _close_files(handles):
+        for handle in handles:
+            if handle is not None:
+                handle.close()
+
+    def write_section(self, section, lines_data):
+        """Writes the data of several lines belonging to one section.
+
+        Args:
+            section: The LX section the lines belong to.
+            lines_data: A list of lists of dictionaries, each list
+            representing data from a single line.
+
+        Returns:
+
+        Raises:
+
+        """
+        with self._section_lock(section):
+            report_file, summary_file = self._acquire(section)
+            try:
+                if report_file is not None:
+                    dict_writer = None
+                    for line_data in lines_data:
+                        for item in line_data:
+                            if dict_writer is None:
+                                report_keys = item["report_data"].keys()
+                                dict_writer = csv.DictWriter(report_file, report_keys)
+                                if report_file.tell() == 0:
+                                    dict_writer.writeheader()
+                            dict_writer.writerow(item["report_data"])
+                if summary_file is not None:
+                    for line_data in lines_data:
+                        for item in line_data:
+                            summary_file.write(
+                                f"{item['summary_data']['Error Message']}\n"
+                            )
+                        summary_file.write("\n")
+            finally:
+                self._release(section)
+
+    def write_lines(self, lines_data, executor=None):
+        """Writes the data of several lines, grouped by section.
+
+        The relative order of the lines is preserved within every section.
+        When an executor is given, sections are written concurrently and
+        this method returns once all of them have been written.
+
+        Args:
+            lines_data: A list of lists of dictionaries, each list
+            representing data from a single line.
+            executor: An optional concurrent.futures.Executor.
+
+        Returns:
+
+        Raises:
+
+        """
+        sections = {}
+        for line_data in lines_data:
+            if line_data:
+                section = line_data[0]["report_data"]["Section"]
+                sections.setdefault(section, []).append(line_data)
+        if executor is None or len(sections) < 2:
+            for section, section_data in sections.items():
+                self.write_section(section, section_data)
+            return
+        futures = [
+            executor.submit(self.write_section, section, section_data)
+            for section, section_data in sections.items()
+        ]
+        for future in futures:
+            future.result()
+
+    def close(self):
+        """Flushes and closes every open section file."""
+        with self._lock:
+            while self._handles:
+                _, handles = self._handles.popitem(last=False)
+                self._close_files(handles)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
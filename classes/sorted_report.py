@@ -0,0 +1,213 @@
+import csv
+import heapq
+import os
+import shutil
+import tempfile
+
+DEFAULT_MEMORY_LIMIT = 64 * 2**20
+DEFAULT_MAX_FAN_IN = 64
+# A conservative estimate of the memory held by one buffered row besides its
+# strings' characters: the record and values tuples, the str objects and the
+# list slot.
+RECORD_OVERHEAD = 600
+SORT_COLUMNS = ("Error Code", "Section")
+
+
+class SortedReportWriter:
+    """The SortedReportWriter class writes the report and the summary
+    grouped by error code and section, whatever the size of the input.
+
+    Rows are sorted by (error code, section, input line, position in the
+    line): the original order is kept within every group, so all the E04
+    tokens of L1 sit together in input order. Rows are buffered until
+    their estimated size reaches memory_limit, then sorted and spilled to a
+    temporary run file; finish() k-way merges the runs (in several passes
+    if there are more than max_fan_in of them) into the final files.
+
+    In the summary, every group of messages (one error code in one
+    section) is followed by an empty line, instead of every input line.
+
+    Attributes:
+        report_path:
+            The path of the grouped report, or None to skip it.
+        summary_path:
+            The path of the grouped summary, or None to skip it.
+        memory_limit:
+            The estimated number of bytes of rows buffered before a run
+            is spilled.
+        max_fan_in:
+            The maximum number of run files merged at once.
+        next_line:
+            The number of the next input line to be written.
+        runs:
+            The number of run files spilled so far.
+    """
+
+    def __init__(
+        self,
+        report_path,
+        summary_path,
+        memory_limit=DEFAULT_MEMORY_LIMIT,
+        temp_dir=None,
+        first_line=0,
+        max_fan_in=DEFAULT_MAX_FAN_IN,
+    ):
+        """Inits SortedReportWriter with report_path, summary_path,
+        memory_limit, temp_dir (where run files are spilled, by default
+        next to the report or the summary rather than in a possibly
+        memory-backed /tmp), the number of the first input line and
+        max_fan_in."""
+        if max_fan_in < 2:
+            raise ValueError("max_fan_in must be at least 2.")
+        self.report_path = report_path
+        self.summary_path = summary_path
+        self.memory_limit = memory_limit
+        self.max_fan_in = max_fan_in
+        self.next_line = first_line
+        self.runs = 0
+        if temp_dir is None:
+            temp_dir = os.path.dirname(os.path.abspath(report_path or summary_path))
+        self._temp_dir = tempfile.mkdtemp(prefix=".sort-", dir=temp_dir)
+        self._run_paths = []
+        self._records = []
+        self._buffered_bytes = 0
+        self._header = None
+        self._key_columns = None
+
+    def write_lines(self, lines_data):
+        """Adds the rows of consecutive input lines, spilling a sorted run
+        whenever the buffered rows reach the memory limit.
+
+        Args:
+            lines_data: A list of lists of dictionaries, each list
+            representing data from a single line.
+
+        Returns:
+
+        Raises:
+
+        """
+        records = self._records
+        for line, line_data in enumerate(lines_data, self.next_line):
+            for position, item in enumerate(line_data):
+                report_data = item["report_data"]
+                if self._header is None:
+                    self._header = list(report_data)
+                values = tuple(str(value) for value in report_data.values())
+                message = item["summary_data"]["Error Message"]
+                records.append(
+                    (
+                        report_data["Error Code"],
+                        report_data["Section"],
+                        line,
+                        position,
+                        values,
+                        message,
+                    )
+                )
+                self._buffered_bytes += (
+                    sum(map(len, values)) + len(message) + RECORD_OVERHEAD
+                )
+            if self._buffered_bytes >= self.memory_limit:
+                self._spill()
+        self.next_line += len(lines_data)
+
+    def _new_run_path(self):
+        path = os.path.join(self._temp_dir, f"run-{self.runs:06d}.csv")
+        self.runs += 1
+        return path
+
+    def _spill(self):
+        self._records.sort()
+        path = self._new_run_path()
+        self._write_run(path, self._records)
+        self._run_paths.append(path)
+        self._records.clear()
+        self._buffered_bytes = 0
+
+    @staticmethod
+    def _write_run(path, records):
+        with open(path, "w", newline="") as run_file:
+            writer = csv.writer(run_file)
+            for _, _, line, position, values, message in records:
+                writer.writerow((line, position, message) + values)
+
+    def _iter_run(self, path):
+        code, section = self._key_columns
+        with open(path, newline="") as run_file:
+            for row in csv.reader(run_file):
+                line, position, message, *values = row
+                values = tuple(values)
+                key = (values[code], values[section], int(line), int(position))
+                yield key + (values, message)
+
+    def _merge_runs(self):
+        """Merges run files until at most max_fan_in of them are left, and
+        returns an iterator of every record in sorted order."""
+        self._key_columns = tuple(self._header.index(column) for column in SORT_COLUMNS)
+        self._records.sort()
+        # The in-memory records are one of the inputs of the final merge.
+        while len(self._run_paths) >= self.max_fan_in:
+            merged, self._run_paths = (
+                self._run_paths[: self.max_fan_in],
+                self._run_paths[self.max_fan_in :],
+            )
+            path = self._new_run_path()
+            self._write_run(path, heapq.merge(*map(self._iter_run, merged)))
+            for merged_path in merged:
+                os.remove(merged_path)
+            self._run_paths.append(path)
+        return heapq.merge(self._records, *map(self._iter_run, self._run_paths))
+
+    def finish(self):
+        """Merges the buffered rows and the run files into the grouped
+        report and summary (appended to, like Generator.generate_report
+        and Generator.generate_summary), then removes the run files.
+
+        Returns:
+
+        Raises:
+
+        """
+        report_file = summary_file = None
+        try:
+            if self.report_path is not None:
+                report_file = open(self.report_path, "a+", newline="")
+            if self.summary_path is not None:
+                summary_file = open(self.summary_path, "a+")
+            if self._header is None:
+                return
+            report_writer = None
+            if report_file is not None:
+                report_writer = csv.writer(report_file)
+                if report_file.tell() == 0:
+                    report_writer.writerow(self._header)
+            group = None
+            for code, section, _, _, values, message in self._merge_runs():
+                if report_writer is not None:
+                    report_writer.writerow(values)
+                if summary_file is not None:
+                    if group is not None and group != (code, section):
+                        summary_file.write("\n")
+                    summary_file.write(f"{message}\n")
+                group = (code, section)
+            if summary_file is not None and group is not None:
+                summary_file.write("\n")
+        finally:
+            if report_file is not None:
+                report_file.close()
+            if summary_file is not None:
+                summary_file.close()
+            self.close()
+
+    def close(self):
+        """Removes the run files (without writing the final files)."""
+        self._records = []
+        self._run_paths = []
+        shutil.rmtree(self._temp_dir, ignore_errors=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -2,6 +2,34 @@ from classes import Processor
 from utils import DataTypes, ErrorCodes
 
 
+def determine_datatype(token):
+    """Determines the data type of a (stripped) token.
+
+    The token's datatype - restricted to a few values defined
+    in the enum DataTypes - is determined using in-built Python
+    str functionality wherever possible. A distinction is made
+    between a missing token and a token that is neither a digit
+    or a word character in order to match the report.csv in
+    the sample directory.
+
+    Args:
+        token: The token (or an empty list for a missing token).
+
+    Returns:
+        A string representing the DataType
+
+    Raises:
+
+    """
+    if (token is None) or (len(token) == 0):
+        return DataTypes.MISSING.value
+    if token.isdecimal():
+        return DataTypes.DIGITS.value
+    if all(x.isalpha() or x.isspace() for x in token):
+        return DataTypes.WORD_CHARACTERS.value
+    return DataTypes.OTHER.value
+
+
 class TokenProcessor(Processor):
     """The TokenProcessor class defines functionality to process tokens
     from a line streamed from an input file in accordance with a
@@ -30,24 +58,26 @@ class TokenProcessor(Processor):
             A Boolean indicating that the token should be
             marked as missing (greater number of constraints
             compared to tokens).
+        classifier:
+            An optional DataTypeClassifier of the data types declared in
+            the standard definition file.
     """
 
-    def __init__(self, lx, token, token_constraints, missing):
-        """Inits TokenProcessor with lx, token, missing and token_constraints."""
+    def __init__(self, lx, token, token_constraints, missing, classifier=None):
+        """Inits TokenProcessor with lx, token, missing, token_constraints
+        and classifier."""
         self.lx = lx
         self.token = token
         self.token_constraints = token_constraints
         self.missing = missing
+        self.classifier = classifier
 
     def _determine_token_datatype(self):
         """Determines the data type of the TokenProcessor's token.
 
-        The token's datatype - restricted to a few values defined
-        in the enum DataTypes - is determined using in-built Python
-        str functionality wherever possible. A distinction is made
-        between a missing token and a token that is neither a digit
-        or a word character in order to match the report.csv in
-        the sample directory.
+        See determine_datatype() for how data types are determined, and
+        DataTypeClassifier.datatype() when data types are declared in the
+        standard definition file.
 
         Args:
 
@@ -57,13 +87,11 @@ class TokenProcessor(Processor):
         Raises:
 
         """
-        if (len(self.token) == 0) or (self.token is None):
-            return DataTypes.MISSING.value
-        if self.token.isdecimal():
-            return DataTypes.DIGITS.value
-        if all(x.isalpha() or x.isspace() for x in self.token):
-            return DataTypes.WORD_CHARACTERS.value
-        return DataTypes.OTHER.value
+        if self.classifier is not None:
+            return self.classifier.datatype(
+                self.token, self.token_constraints["data_type"]
+            )
+        return determine_datatype(self.token)
 
     def _validate_token_datatype(self):
         """Validates the data type of the TokenProcessor's token.
@@ -0,0 +1,279 @@
+import json
+import math
+
+from utils import ErrorCodes
+
+DEFAULT_RELATIVE_ACCURACY = 0.01
+DEFAULT_MAX_BINS = 512
+DEFAULT_CAPACITY = 32
+# Longer token values are truncated before being counted, so that the memory
+# held by a heavy-hitters sketch is bounded however long the tokens are.
+MAX_VALUE_LENGTH = 256
+QUANTILES = (0.5, 0.9, 0.99)
+
+E02 = ErrorCodes.E02.value["code"]
+E03 = ErrorCodes.E03.value["code"]
+
+
+class QuantileSketch:
+    """The QuantileSketch class estimates quantiles of a stream of
+    non-negative numbers in bounded memory.
+
+    Values are counted in logarithmic bins (as in DDSketch): a value x > 0
+    falls in bin ceil(log(x) / log(gamma)) with gamma = (1 + a) / (1 - a),
+    so every quantile is estimated within a relative error a of a value
+    of the stream. At most max_bins bins are kept; beyond that, the lowest
+    bins are collapsed together, which only affects the lowest quantiles.
+    Zeros are counted apart.
+
+    Attributes:
+        relative_accuracy:
+            The relative accuracy a of the estimates.
+        max_bins:
+            The maximum number of bins kept.
+        count:
+            The number of values added.
+        minimum:
+            The smallest value added (None if empty).
+        maximum:
+            The largest value added (None if empty).
+    """
+
+    def __init__(
+        self, relative_accuracy=DEFAULT_RELATIVE_ACCURACY, max_bins=DEFAULT_MAX_BINS
+    ):
+        """Inits QuantileSketch with relative_accuracy and max_bins."""
+        self.relative_accuracy = relative_accuracy
+        self.max_bins = max_bins
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self._bins = {}
+        self._zeros = 0
+        self.count = 0
+        self.minimum = self.maximum = None
+
+    def add(self, value):
+        """Adds a non-negative value to the sketch."""
+        self.count += 1
+        if self.minimum is None or value < self.minimum:
+            self.minimum = value
+        if self.maximum is None or value > self.maximum:
+            self.maximum = value
+        if value <= 0:
+            self._zeros += 1
+            return
+        index = math.ceil(math.log(value) / self._log_gamma)
+        self._bins[index] = self._bins.get(index, 0) + 1
+        if len(self._bins) > self.max_bins:
+            self._collapse()
+
+    def _collapse(self):
+        """Merges the lowest bins until at most max_bins are left."""
+        indices = sorted(self._bins)
+        excess = len(indices) - self.max_bins
+        target = indices[excess]
+        for index in indices[:excess]:
+            self._bins[target] += self._bins.pop(index)
+
+    def merge(self, other):
+        """Adds the values counted by another QuantileSketch (with the same
+        relative accuracy)."""
+        for index, count in other._bins.items():
+            self._bins[index] = self._bins.get(index, 0) + count
+        self._zeros += other._zeros
+        self.count += other.count
+        if other.minimum is not None:
+            if self.minimum is None or other.minimum < self.minimum:
+                self.minimum = other.minimum
+            if self.maximum is None or other.maximum > self.maximum:
+                self.maximum = other.maximum
+        if len(self._bins) > self.max_bins:
+            self._collapse()
+
+    def quantile(self, q):
+        """Returns an estimate of the q-quantile (0 <= q <= 1), or None if
+        the sketch is empty."""
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = self._zeros
+        if rank < seen:
+            return 0
+        for index in sorted(self._bins):
+            seen += self._bins[index]
+            if rank < seen:
+                estimate = 2 * self._gamma**index / (self._gamma + 1)
+                return min(max(estimate, self.minimum), self.maximum)
+        return self.maximum
+
+    def to_dict(self):
+        """Returns the count, extremes and usual quantiles of the sketch."""
+        summary = {"count": self.count, "min": self.minimum, "max": self.maximum}
+        for q in QUANTILES:
+            summary[f"p{round(q * 100)}"] = self.quantile(q)
+        return summary
+
+
+class SpaceSavingSketch:
+    """The SpaceSavingSketch class finds the most frequent values of a
+    stream in bounded memory, with the Space-Saving algorithm.
+
+    At most capacity values are monitored. When a new value arrives while
+    the sketch is full, it replaces the value with the lowest count and
+    inherits that count, which is recorded as its maximum overestimation.
+    Any value occurring more than count / capacity times is guaranteed to
+    be monitored.
+
+    Attributes:
+        capacity:
+            The maximum number of values monitored.
+        count:
+            The number of values added.
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        """Inits SpaceSavingSketch with capacity."""
+        self.capacity = capacity
+        self.count = 0
+        # Maps every monitored value to [count, overestimation].
+        self._counters = {}
+
+    def _increment(self, value, count, error):
+        counter = self._counters.get(value)
+        if counter is not None:
+            counter[0] += count
+            counter[1] += error
+        elif len(self._counters) < self.capacity:
+            self._counters[value] = [count, error]
+        else:
+            evicted = min(self._counters, key=lambda key: self._counters[key][0])
+            floor = self._counters.pop(evicted)[0]
+            self._counters[value] = [floor + count, floor + error]
+
+    def add(self, value):
+        """Adds a value (str) to the sketch."""
+        self.count += 1
+        self._increment(value[:MAX_VALUE_LENGTH], 1, 0)
+
+    def merge(self, other):
+        """Adds the values monitored by another SpaceSavingSketch."""
+        self.count += other.count
+        for value, (count, error) in other._counters.items():
+            self._increment(value, count, error)
+
+    def top(self, n=None):
+        """Returns the monitored values, most frequent first, as dicts with
+        the value, its (over)estimated count and the maximum error."""
+        ranked = sorted(self._counters.items(), key=lambda item: -item[1][0])
+        return [
+            {"value": value, "count": count, "error": error}
+            for value, (count, error) in ranked[:n]
+        ]
+
+
+class TokenSketches:
+    """The TokenSketches class keeps streaming sketches per LXY
+    sub-section for data-quality triage.
+
+    For every sub-section, the lengths of the tokens failing the max
+    length validation only (E03) are summarised by a QuantileSketch, and
+    the values of the tokens failing the data type validation only (E02)
+    by a SpaceSavingSketch. Sketches have a fixed size, so memory depends
+    on the number of sub-sections, never on the size of the input.
+
+    Attributes:
+        capacity:
+            The number of values monitored per sub-section.
+        relative_accuracy:
+            The relative accuracy of the length quantiles.
+        sections:
+            A dictionary mapping each LX section to a dictionary mapping
+            each LXY sub-section to its (QuantileSketch, SpaceSavingSketch).
+    """
+
+    def __init__(
+        self, capacity=DEFAULT_CAPACITY, relative_accuracy=DEFAULT_RELATIVE_ACCURACY
+    ):
+        """Inits TokenSketches with capacity and relative_accuracy."""
+        self.capacity = capacity
+        self.relative_accuracy = relative_accuracy
+        self.sections = {}
+
+    def _sketches(self, lx, lxy):
+        sub_sections = self.sections.setdefault(lx, {})
+        sketches = sub_sections.get(lxy)
+        if sketches is None:
+            sketches = sub_sections[lxy] = (
+                QuantileSketch(self.relative_accuracy),
+                SpaceSavingSketch(self.capacity),
+            )
+        return sketches
+
+    def update(self, lines, chunk):
+        """Adds the failing tokens of processed lines to the sketches.
+
+        Args:
+            lines: The lines of the input file that were processed.
+            chunk: Their data, one list of dictionaries per line
+            (in the same order as lines).
+
+        Returns:
+
+        Raises:
+
+        """
+        for line, line_data in zip(lines, chunk):
+            tokens = None
+            for position, item in enumerate(line_data, 1):
+                report_data = item["report_data"]
+                code = report_data["Error Code"]
+                if code == E03:
+                    lengths = self._sketches(
+                        report_data["Section"], report_data["Sub-Section"]
+                    )[0]
+                    lengths.add(report_data["Given Length"] or 0)
+                elif code == E02:
+                    if tokens is None:
+                        tokens = line.split("&")
+                    values = self._sketches(
+                        report_data["Section"], report_data["Sub-Section"]
+                    )[1]
+                    values.add(tokens[position].strip())
+
+    def merge(self, other):
+        """Adds the sketches of another TokenSketches (e.g. of another
+        shard or file)."""
+        for lx, sub_sections in other.sections.items():
+            for lxy, (lengths, values) in sub_sections.items():
+                own_lengths, own_values = self._sketches(lx, lxy)
+                own_lengths.merge(lengths)
+                own_values.merge(values)
+
+    def to_dict(self):
+        """Returns the sketches as a JSON-serialisable dictionary."""
+        return {
+            lx: {
+                lxy: {
+                    "e03_length_quantiles": lengths.to_dict(),
+                    "e02_count": values.count,
+                    "e02_top_values": values.top(),
+                }
+                for lxy, (lengths, values) in sub_sections.items()
+            }
+            for lx, sub_sections in self.sections.items()
+        }
+
+    def write(self, output_path):
+        """Writes the sketches to output_path as JSON.
+
+        Args:
+            output_path: The path of the JSON file.
+
+        Returns:
+
+        Raises:
+
+        """
+        with open(output_path, "w") as writer:
+            json.dump(self.to_dict(), writer, indent=2)
+            writer.write("\n")
@@ -1,6 +1,9 @@
 import pathlib
+import sys
 
+from classes.definition_cache import DefinitionCache
 from classes.generator import Generator
+from classes.custom_errors import QualityGateError
 from utils import (
     load_json_from_path,
     make_dir_if_absent,
@@ -13,6 +16,12 @@ from utils import (
 OUTPUT_DIR = "parsed"
 REPORT_FILE = "report.csv"
 SUMMARY_FILE = "summary.txt"
+COLUMNAR_REPORT_FILE = "report.gcol"
+SKETCHES_FILE = "sketches.json"
+RLE_SUMMARY_FILE = "summary.rle"
+ERROR_RATE_ESTIMATES_FILE = "error_rate_estimates.json"
+PROGRESS_METRICS_FILE = "progress.prom"
+REPORT_DIFF_FILE = "report_diff.json"
 
 # Global variables for defining where the input file and the standard
 # definition file are coming from.
@@ -20,24 +29,160 @@ BASE_DIR = pathlib.Path(__file__).parent.resolve()
 INPUT_FILE = "input_file.txt"
 STANDARD_DEFINITION_FILE = "standard_definition.json"
 
+# When INPUT_FILES is set to a directory or a glob pattern (e.g. "incoming/*.txt"),
+# every matching file is processed instead of INPUT_FILE, by a pool of WORKERS
+# processes sharing one compiled standard definition (largest files first). Each
+# file gets its own analyses in `OUTPUT_DIR/<file name>/`, and the counts of
+# every file and of the whole run are written to `OUTPUT_DIR/batch_summary.json`.
+INPUT_FILES = None
+
+# The standard definition is compiled once and cached in this directory, keyed
+# by the content hash of STANDARD_DEFINITION_FILE (None disables the cache).
+DEFINITION_CACHE_DIR = ".definition_cache"
+
+# Global variables for parallel processing. With more than one worker, chunks
+# of CHUNK_SIZE lines are processed by a pool of WORKERS processes, or of
+# WORKERS threads with BACKEND = "thread" (which only validate lines in
+# parallel on a free-threaded build of Python, but never pickle results).
+WORKERS = 1
+CHUNK_SIZE = 1000
+BACKEND = "process"
+
+# When AUTO_TUNE is set, CHUNK_SIZE and WORKERS are chosen instead by measuring
+# throughput over the first lines of the run, with chunks of AUTO_TUNE_CHUNK_SIZES
+# lines (the smallest and largest) and up to AUTO_TUNE_MAX_WORKERS workers (None
+# for the CPU count). The chosen setting is saved in AUTO_TUNE_DIR per definition
+# hash, engine and backend, and reused by later runs without a warm-up.
+AUTO_TUNE = False
+AUTO_TUNE_CHUNK_SIZES = (250, 16000)
+AUTO_TUNE_MAX_WORKERS = None
+AUTO_TUNE_DIR = ".auto_tune"
+
+# When MEMORY_BUDGET_MB is set, chunks (up to CHUNK_SIZE lines), the number of
+# chunks in flight and the per-section file cache are sized to keep the memory
+# of the run within MEMORY_BUDGET_MB megabytes, measured as the resident set
+# size of the process and its workers ("rss") or with "tracemalloc" (exact,
+# but slower, and blind to worker processes).
+MEMORY_BUDGET_MB = None
+MEMORY_BUDGET_METHOD = "rss"
+
+# The validation engine: "python", "numpy" to validate each chunk of lines
+# with vectorized NumPy operations (requires `pip install numpy`), or "codegen"
+# to validate lines with one Python function generated per LX section.
+ENGINE = "python"
+
+# Lines with more tokens than LXY sub-sections are summarised in a single
+# warning at the end of the run, with up to this many example lines per section.
+OVERFLOW_SAMPLE_SIZE = 3
+
+# Global variables for processing only a range of lines [START_LINE, END_LINE)
+# of the input file (0-based, None meaning the start/end of the file). When a
+# range is given, a line-offset index is kept next to the input file (built
+# on first use) so the input can be read from START_LINE directly.
+START_LINE = None
+END_LINE = None
+LINE_INDEX_INTERVAL = 1024
+
 # Boolean global variables for defining what analyses should be output.
 # By default, both the report and summary are generated during runtime.
 # If you want to add a new analysis, create another global variable here.
 GENERATE_REPORT = True
 GENERATE_SUMMARY = True
+# When True, one report and one summary are also written per LX section,
+# e.g. `OUTPUT_DIR/L1/report.csv` and `OUTPUT_DIR/L1/summary.txt`.
+GENERATE_SECTION_ANALYSES = False
+MAX_OPEN_SECTION_FILES = 64
+# The columnar report is a compact binary alternative to the csv report
+# (see `ColumnarReportReader.to_csv` to convert it back).
+GENERATE_COLUMNAR_REPORT = False
+# The run-length summary writes every run of consecutive lines with identical
+# summaries once, with its line range and repeat count (see
+# `classes.rle_summary.expand_summary` to expand it back to the summary).
+GENERATE_RLE_SUMMARY = False
+# The sketches summarise, per LXY sub-section, the lengths of tokens failing
+# E03 (approximate quantiles) and the values most often failing E02, in fixed
+# memory whatever the size of the input.
+GENERATE_SKETCHES = False
+# When True, the report and the summary are grouped by error code and section
+# (in input order within each group) instead of following the input. Rows are
+# sorted in runs of up to SORT_MEMORY_MB megabytes, spilled next to the report
+# and merged once the whole input has been processed.
+GROUP_BY_ERROR_CODE = False
+SORT_MEMORY_MB = 64
+
+# When SAMPLE_LINES is set, no analysis above is generated: the error-code rates
+# per section are only estimated (with confidence intervals) from a random
+# sample of SAMPLE_LINES lines, reproducible with SAMPLE_SEED.
+SAMPLE_LINES = None
+SAMPLE_SEED = 0
+
+# Quality gates (the arguments of `QualityGate`) stop the run as soon as the
+# input is decisively known to breach one of them, exiting with the gate and the
+# input line at which it tripped, e.g. [{"codes": "E05", "max_count": 100},
+# {"codes": "E04", "max_rate": 0.05, "section": "L1"}] for at most 100 missing
+# tokens and at most 5% of L1 tokens failing both checks.
+QUALITY_GATES = []
+
+# When True, progress (lines, tokens per second, error-code counts and ETA) is
+# printed to stderr every PROGRESS_INTERVAL seconds, and exported in the
+# Prometheus text format to `OUTPUT_DIR/PROGRESS_METRICS_FILE`.
+REPORT_PROGRESS = False
+PROGRESS_INTERVAL = 5.0
+
+# When True, a chunk manifest (`OUTPUT_DIR/REPORT_FILE.manifest`) is saved next to
+# the report, so later diffs skip the chunks two reports have in common.
+GENERATE_REPORT_MANIFEST = False
+# When DIFF_AGAINST_REPORT is set to the report of an earlier run, the new report
+# is diffed against it: the error-code transitions per section and sampled example
+# rows are written to `OUTPUT_DIR/REPORT_DIFF_FILE`.
+DIFF_AGAINST_REPORT = None
 
 if __name__ == "__main__":
 
     # Get the standard definition file
-    standard_definition = load_json_from_path(
-        path=f"{BASE_DIR}/{STANDARD_DEFINITION_FILE}",
-        error_message="Standard definition file not accessible",
-    )
+    if DEFINITION_CACHE_DIR is not None:
+        definition_cache = DefinitionCache(f"{BASE_DIR}/{DEFINITION_CACHE_DIR}")
+        standard_definition = definition_cache.load(
+            path=f"{BASE_DIR}/{STANDARD_DEFINITION_FILE}",
+            error_message="Standard definition file not accessible",
+        )
+    else:
+        standard_definition = load_json_from_path(
+            path=f"{BASE_DIR}/{STANDARD_DEFINITION_FILE}",
+            error_message="Standard definition file not accessible",
+        )
 
     # Determine whether the `OUTPUT_DIR` directory exists
     # and if it doesn't, create a new directory called `OUTPUT_DIR``
     make_dir_if_absent(output_dir=f"{OUTPUT_DIR}")
 
+    # Process every file of a batch, and stop there.
+    if INPUT_FILES is not None:
+        Generator(
+            workers=WORKERS,
+            chunk_size=CHUNK_SIZE,
+            overflow_sample_size=OVERFLOW_SAMPLE_SIZE,
+            engine=ENGINE,
+        ).generate_analyses_from_input_files(
+            inputs=INPUT_FILES,
+            output_dir=OUTPUT_DIR,
+            standard_definition=standard_definition,
+            report=GENERATE_REPORT,
+            summary=GENERATE_SUMMARY,
+        )
+        sys.exit(0)
+
+    # Estimate the error-code rates from a sample of lines, and stop there.
+    if SAMPLE_LINES is not None:
+        estimate = Generator(engine=ENGINE).estimate_error_rates(
+            input_path=f"{BASE_DIR}/{INPUT_FILE}",
+            standard_definition=standard_definition,
+            sample_size=SAMPLE_LINES,
+            seed=SAMPLE_SEED,
+        )
+        estimate.write(f"{OUTPUT_DIR}/{ERROR_RATE_ESTIMATES_FILE}")
+        sys.exit(0)
+
     # Remove analysis files if they already exists - we'll be generating them
     # with the final command below. If you have another analysis, add another
     # logical flow below with the new global variables you have defined above.
@@ -45,14 +190,108 @@ if __name__ == "__main__":
         remove_file_if_exists(f"{OUTPUT_DIR}/{REPORT_FILE}")
     if GENERATE_SUMMARY:
         remove_file_if_exists(f"{OUTPUT_DIR}/{SUMMARY_FILE}")
+    if GENERATE_RLE_SUMMARY:
+        remove_file_if_exists(f"{OUTPUT_DIR}/{RLE_SUMMARY_FILE}")
+    if GENERATE_SKETCHES:
+        remove_file_if_exists(f"{OUTPUT_DIR}/{SKETCHES_FILE}")
+    if GENERATE_SECTION_ANALYSES:
+        for section in standard_definition:
+            if "key" not in section:
+                continue
+            remove_file_if_exists(f"{OUTPUT_DIR}/{section['key']}/{REPORT_FILE}")
+            remove_file_if_exists(f"{OUTPUT_DIR}/{section['key']}/{SUMMARY_FILE}")
+
+    # Index the input file if only a range of it is being processed.
+    line_index = None
+    if START_LINE is not None:
+        from classes.line_index import LineIndex
+
+        line_index = LineIndex.load_or_build(
+            f"{BASE_DIR}/{INPUT_FILE}", interval=LINE_INDEX_INTERVAL
+        )
+
+    # Set up the optional components of the run. Each is imported only when
+    # it is enabled, so that short runs do not pay for loading the others.
+    memory_budget = None
+    if MEMORY_BUDGET_MB is not None:
+        from classes.memory_budget import MemoryBudget
+
+        memory_budget = MemoryBudget(
+            int(MEMORY_BUDGET_MB * 2**20), method=MEMORY_BUDGET_METHOD
+        )
+    auto_tuner = None
+    if AUTO_TUNE:
+        from classes.auto_tuner import AutoTuner
+
+        auto_tuner = AutoTuner(
+            *AUTO_TUNE_CHUNK_SIZES,
+            max_workers=AUTO_TUNE_MAX_WORKERS,
+            cache_dir=f"{BASE_DIR}/{AUTO_TUNE_DIR}",
+        )
+    progress_reporter = None
+    if REPORT_PROGRESS:
+        from classes.progress_reporter import ProgressReporter
+
+        progress_reporter = ProgressReporter(
+            interval=PROGRESS_INTERVAL,
+            metrics_path=f"{OUTPUT_DIR}/{PROGRESS_METRICS_FILE}",
+        )
+    quality_gates = []
+    if QUALITY_GATES:
+        from classes.quality_gates import QualityGate
+
+        quality_gates = [QualityGate(**gate) for gate in QUALITY_GATES]
 
     # Generate the report and the summary in the directory called `OUTPUT_DIR`
-    gen = Generator()
-    gen.generate_analyses_from_input_file(
-        input_path=f"{BASE_DIR}/{INPUT_FILE}",
-        summary_path=f"{OUTPUT_DIR}/{SUMMARY_FILE}",
-        report_path=f"{OUTPUT_DIR}/{REPORT_FILE}",
-        standard_definition=standard_definition,
-        report=GENERATE_REPORT,
-        summary=GENERATE_SUMMARY,
+    gen = Generator(
+        workers=WORKERS,
+        chunk_size=CHUNK_SIZE,
+        overflow_sample_size=OVERFLOW_SAMPLE_SIZE,
+        engine=ENGINE,
+        backend=BACKEND,
+        memory_budget=memory_budget,
+        auto_tuner=auto_tuner,
     )
+    try:
+        gen.generate_analyses_from_input_file(
+            input_path=f"{BASE_DIR}/{INPUT_FILE}",
+            summary_path=f"{OUTPUT_DIR}/{SUMMARY_FILE}",
+            report_path=f"{OUTPUT_DIR}/{REPORT_FILE}",
+            standard_definition=standard_definition,
+            report=GENERATE_REPORT,
+            summary=GENERATE_SUMMARY,
+            columnar_path=(
+                f"{OUTPUT_DIR}/{COLUMNAR_REPORT_FILE}"
+                if GENERATE_COLUMNAR_REPORT
+                else None
+            ),
+            start_line=START_LINE,
+            end_line=END_LINE,
+            line_index=line_index,
+            section_dir=OUTPUT_DIR if GENERATE_SECTION_ANALYSES else None,
+            max_open_section_files=MAX_OPEN_SECTION_FILES,
+            sketches_path=f"{OUTPUT_DIR}/{SKETCHES_FILE}"
+            if GENERATE_SKETCHES
+            else None,
+            rle_summary_path=(
+                f"{OUTPUT_DIR}/{RLE_SUMMARY_FILE}" if GENERATE_RLE_SUMMARY else None
+            ),
+            progress_reporter=progress_reporter,
+            quality_gates=quality_gates,
+            group_by_error_code=GROUP_BY_ERROR_CODE,
+            sort_memory_limit=int(SORT_MEMORY_MB * 2**20),
+        )
+    except QualityGateError as error:
+        sys.exit(error.message)
+
+    # Index the report in chunks, and diff it against an earlier report.
+    if GENERATE_REPORT and GENERATE_REPORT_MANIFEST:
+        from classes.report_diff import ReportManifest
+
+        ReportManifest.build(f"{OUTPUT_DIR}/{REPORT_FILE}").save()
+    if GENERATE_REPORT and DIFF_AGAINST_REPORT is not None:
+        from classes.report_diff import diff_reports
+
+        diff_reports(DIFF_AGAINST_REPORT, f"{OUTPUT_DIR}/{REPORT_FILE}").write(
+            f"{OUTPUT_DIR}/{REPORT_DIFF_FILE}"
+        )
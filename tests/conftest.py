@@ -2,6 +2,7 @@ import pathlib
 import pytest
 
 from classes import LineProcessor, Generator, TokenProcessor
+from classes.custom_errors import LineTokenizationError, StandardDefinitionParseError
 
 
 @pytest.fixture
@@ -55,6 +56,21 @@ def expected_report_path(base_dir):
     return f"{base_dir}/{file}"
 
 
+@pytest.fixture
+def columnar_path(tmp_path):
+    return f"{tmp_path}/report.gcol"
+
+
+@pytest.fixture
+def many_lines_input_path(tmp_path):
+    path = f"{tmp_path}/many_lines_input_file.txt"
+    lines = ["L1&99&&A", "L4&9", "L1&4&AbC&xY&garbage", "L4&x&123"]
+    with open(path, "w") as writer:
+        for i in range(1000):
+            writer.write(f"{lines[i % len(lines)]}{'&' * (i % 3)}\n")
+    return path
+
+
 @pytest.fixture
 def expected_summary_path(base_dir):
     file = "dummy_data/expected_summary.txt"
@@ -155,3 +171,47 @@ def token_processor(short_line, other_token, standard_definition):
 @pytest.fixture
 def generator():
     return Generator()
+
+
+@pytest.fixture
+def token_processor_reference():
+    """Processes a line one TokenProcessor per token, the way lines were
+    processed before the standard definition was compiled. Used as the
+    reference for differential tests."""
+
+    def process(line, standard_definition):
+        tokens = line.split("&")
+        if len(tokens) < 2:
+            raise LineTokenizationError(line)
+        lx, tokens = tokens[0], tokens[1:]
+        lx_dict = next(
+            (item for item in standard_definition if item.get("key") == lx), None
+        )
+        token_constraints = lx_dict.get("sub_sections") if lx_dict else None
+        if token_constraints is None:
+            raise StandardDefinitionParseError(lx)
+        tokens = tokens[0 : len(token_constraints)]
+        return [
+            TokenProcessor(
+                lx=lx,
+                token=tokens[i : i + 1],
+                token_constraints=token_constraints[i : i + 1],
+                missing=i >= len(tokens),
+            ).process()
+            for i in range(len(token_constraints))
+        ]
+
+    return process
+
+
+@pytest.fixture
+def differential_lines():
+    tokens = ["", " ", "9", "99", "123456", "A", "Ab", "AbC", "a b", " xY ", "4.a", "@"]
+    tokens += ["\u0661\u0662", "\u00e9t\u00e9", "x\ty", "\u00b2"]
+    lines = []
+    for section, width in (("L1", 3), ("L4", 2)):
+        for count in range(1, width + 2):
+            for offset in range(len(tokens)):
+                chosen = [tokens[(offset + i * 5) % len(tokens)] for i in range(count)]
+                lines.append("&".join([section, *chosen]) + "\n")
+    return lines
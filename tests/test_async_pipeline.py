@@ -0,0 +1,146 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from classes import (
+    AsyncPipeline,
+    AsyncReportSink,
+    BatchLineProcessor,
+    Generator,
+    LineTokenizationError,
+)
+
+
+def _read(path):
+    with open(path, "rb") as reader:
+        return reader.read()
+
+
+class SlowSink:
+    """Records batches, waiting for permission before every write."""
+
+    def __init__(self):
+        self.chunks = []
+        self.closed = False
+        self.release = asyncio.Event()
+
+    async def write(self, chunk):
+        await self.release.wait()
+        self.chunks.append(chunk)
+
+    async def close(self):
+        self.closed = True
+
+
+def test_generate_analyses_async_matches_sync(
+    many_lines_input_path, standard_definition, tmp_path
+):
+    Generator(chunk_size=64).generate_analyses_from_input_file(
+        many_lines_input_path,
+        f"{tmp_path}/summary.txt",
+        f"{tmp_path}/report.csv",
+        standard_definition,
+    )
+
+    async def run_uploads():
+        # Several pipelines sharing one event loop.
+        await asyncio.gather(
+            *(
+                Generator(workers=2, chunk_size=64).generate_analyses_async(
+                    many_lines_input_path,
+                    f"{tmp_path}/summary_{i}.txt",
+                    f"{tmp_path}/report_{i}.csv",
+                    standard_definition,
+                    queue_size=2,
+                )
+                for i in range(3)
+            )
+        )
+
+    asyncio.run(run_uploads())
+    for i in range(3):
+        assert _read(f"{tmp_path}/report_{i}.csv") == _read(f"{tmp_path}/report.csv")
+        assert _read(f"{tmp_path}/summary_{i}.txt") == _read(f"{tmp_path}/summary.txt")
+
+
+def test_backpressure_and_cancellation(standard_definition):
+    consumed = 0
+
+    async def lines():
+        nonlocal consumed
+        while True:
+            consumed += 1
+            yield "L1&99&&A"
+            await asyncio.sleep(0)
+
+    async def main():
+        sink = SlowSink()
+        pipeline = AsyncPipeline(
+            BatchLineProcessor(standard_definition), [sink], batch_size=10, queue_size=2
+        )
+        task = asyncio.ensure_future(pipeline.run(lines()))
+        for _ in range(200):
+            await asyncio.sleep(0)
+        # The sink is blocked: only the batches held by the bounded queues
+        # (and the stages between them) can have been read.
+        assert consumed <= 10 * 8
+        sink.release.set()
+        for _ in range(20):
+            await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return sink
+
+    sink = asyncio.run(main())
+    assert sink.chunks
+    assert sink.closed
+
+
+class PausingReportSink(AsyncReportSink):
+    """Pauses in the middle of its first write (in the executor thread)."""
+
+    def __init__(self, output_path):
+        super().__init__(output_path)
+        self.writing = threading.Event()
+
+    def _write(self, chunk):
+        first = not self.writing.is_set()
+        self.writing.set()
+        if first:
+            time.sleep(0.2)
+        super()._write(chunk)
+
+
+def test_cancellation_waits_for_writes_in_flight(standard_definition, tmp_path):
+    sink = PausingReportSink(f"{tmp_path}/report.csv")
+
+    async def main():
+        pipeline = AsyncPipeline(
+            BatchLineProcessor(standard_definition), [sink], batch_size=5
+        )
+        task = asyncio.ensure_future(pipeline.run(["L1&99&&A"] * 100))
+        while not sink.writing.is_set():
+            await asyncio.sleep(0.001)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(main())
+    # The write in flight was finished before the report was closed.
+    with open(f"{tmp_path}/report.csv") as reader:
+        rows = reader.read().splitlines()
+    assert sink._file is None
+    assert len(rows) == 1 + 5 * 3
+
+
+def test_errors_propagate_and_close_sinks(standard_definition, tmp_path):
+    sink = AsyncReportSink(f"{tmp_path}/report.csv")
+    pipeline = AsyncPipeline(
+        BatchLineProcessor(standard_definition), [sink], batch_size=2
+    )
+    with pytest.raises(LineTokenizationError):
+        asyncio.run(pipeline.run(["L1&99&&A"] * 5 + ["L1"]))
+    assert sink._file is None
@@ -0,0 +1,59 @@
+import json
+
+import pytest
+
+from classes import AutoTuner, Generator
+
+
+def test_warm_up_climbs_chunk_sizes_then_workers():
+    tuner = AutoTuner(min_chunk_size=100, max_chunk_size=1600, max_workers=4)
+    assert (tuner.chunk_size, tuner.workers) == (100, 4)
+    for rate, setting in [(100, (400, 4)), (200, (1600, 4)), (150, (400, 1))]:
+        tuner._next_trial(rate)
+        assert (tuner.chunk_size, tuner.workers) == setting
+        assert not tuner.tuned
+    tuner._next_trial(50)
+    assert tuner.tuned
+    assert tuner.settings == {"chunk_size": 400, "workers": 4, "lines_per_second": 200}
+    # Chunks read during an earlier trial are ignored.
+    tuner.observe(tuner.trial - 1, 1000)
+    assert len(tuner.trials) == 4
+
+
+def test_invalid_bounds():
+    with pytest.raises(ValueError):
+        AutoTuner(min_chunk_size=1000, max_chunk_size=100)
+    with pytest.raises(ValueError):
+        AutoTuner(min_chunk_size=0)
+
+
+def test_tuned_run_is_saved_and_reused(
+    many_lines_input_path, standard_definition, tmp_path
+):
+    def run(generator):
+        chunks = generator.iter_line_data_chunks(
+            many_lines_input_path, standard_definition
+        )
+        return [line_data for chunk in chunks for line_data in chunk]
+
+    expected = run(Generator())
+    cache_dir = tmp_path / "tuning"
+    tuner = AutoTuner(
+        min_chunk_size=10,
+        max_chunk_size=40,
+        max_workers=2,
+        trial_lines=40,
+        cache_dir=str(cache_dir),
+    )
+    generator = Generator(backend="thread", auto_tuner=tuner)
+    assert run(generator) == expected
+    assert tuner.tuned and not tuner.loaded
+    assert len(tuner.trials) == 3
+    settings = tuner.settings
+    (saved_path,) = cache_dir.iterdir()
+    assert json.loads(saved_path.read_text()) == {"python/thread": settings}
+
+    assert run(generator) == expected
+    assert tuner.loaded and tuner.trials == []
+    assert tuner.settings["chunk_size"] == settings["chunk_size"]
+    assert tuner.settings["workers"] == settings["workers"]
@@ -0,0 +1,89 @@
+import json
+import os
+import shutil
+
+import pytest
+
+from classes import Generator
+from classes.batch_job import expand_inputs, output_dirs, schedule
+
+
+def _read(path):
+    with open(path) as reader:
+        return reader.read()
+
+
+@pytest.fixture
+def batch_dir(tmp_path, input_path, many_lines_input_path):
+    batch_dir = f"{tmp_path}/incoming"
+    os.makedirs(f"{batch_dir}/late")
+    shutil.copy(input_path, f"{batch_dir}/small.txt")
+    shutil.copy(many_lines_input_path, f"{batch_dir}/large.txt")
+    with open(f"{batch_dir}/late/tiny.txt", "w") as writer:
+        writer.write("L4&x\n")
+    return batch_dir
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_batch_matches_single_file_runs(
+    batch_dir, standard_definition, tmp_path, workers
+):
+    output_dir = f"{tmp_path}/parsed"
+    batch_summary = Generator(workers=workers).generate_analyses_from_input_files(
+        [batch_dir, f"{batch_dir}/late/*.txt"], output_dir, standard_definition
+    )
+
+    inputs = ["large.txt", "late/tiny.txt", "small.txt"]
+    assert [stats["input"] for stats in batch_summary["files"]] == [
+        f"{batch_dir}/{name}" for name in inputs
+    ]
+    for name in inputs:
+        single_dir = f"{tmp_path}/single/{name}"
+        os.makedirs(single_dir)
+        Generator().generate_analyses_from_input_file(
+            f"{batch_dir}/{name}",
+            f"{single_dir}/summary.txt",
+            f"{single_dir}/report.csv",
+            standard_definition,
+        )
+        for output in ("summary.txt", "report.csv"):
+            assert _read(f"{output_dir}/{name}/{output}") == _read(
+                f"{single_dir}/{output}"
+            )
+
+    totals = batch_summary["totals"]
+    assert totals["files"] == 3 and totals["failed"] == 0
+    assert totals["lines"] == sum(stats["lines"] for stats in batch_summary["files"])
+    assert totals["tokens"] == sum(totals["error_codes"].values())
+    assert batch_summary["files"][0]["lines"] == 1000
+    for stats in batch_summary["files"]:
+        assert stats["bytes"] == os.path.getsize(stats["input"])
+    with open(f"{output_dir}/batch_summary.json") as reader:
+        assert json.load(reader) == batch_summary
+
+
+def test_failed_file_recorded(batch_dir, standard_definition, tmp_path):
+    with open(f"{batch_dir}/broken.txt", "wb") as writer:
+        writer.write(b"L1&\xff\xfe\n")
+    batch_summary = Generator().generate_analyses_from_input_files(
+        f"{batch_dir}/*.txt", f"{tmp_path}/parsed", standard_definition
+    )
+    errors = {
+        os.path.basename(stats["input"]): stats["error"]
+        for stats in batch_summary["files"]
+    }
+    assert errors["broken.txt"].startswith("UnicodeDecodeError")
+    assert errors["large.txt"] is None and errors["small.txt"] is None
+    assert batch_summary["totals"]["failed"] == 1
+
+
+def test_schedule_and_output_dirs(batch_dir):
+    paths = expand_inputs(f"{batch_dir}/**")
+    assert schedule(paths) == [
+        f"{batch_dir}/large.txt",
+        f"{batch_dir}/small.txt",
+        f"{batch_dir}/late/tiny.txt",
+    ]
+    assert output_dirs(paths, "parsed")[f"{batch_dir}/late/tiny.txt"] == (
+        "parsed/late/tiny.txt"
+    )
@@ -0,0 +1,45 @@
+import random
+
+import pytest
+
+from classes import BatchLineProcessor, LineTokenizationError
+from classes.custom_errors import StandardDefinitionParseError
+
+
+def test_process_batch_matches_token_processor(
+    standard_definition, differential_lines, token_processor_reference
+):
+    processor = BatchLineProcessor(standard_definition)
+    data = processor.process_batch(differential_lines)
+
+    assert len(data) == len(differential_lines)
+    for line, line_data in zip(differential_lines, data):
+        assert line_data == token_processor_reference(line, standard_definition)
+
+
+def test_process_batch_reuses_compiled_definition(line, long_line, standard_definition):
+    processor = BatchLineProcessor(standard_definition)
+    assert processor.process_batch((line, long_line, line))[2] == (
+        processor.process_line(line)
+    )
+    assert processor.process_batch([]) == []
+
+
+def test_process_batch_errors(short_line, invalid_standard_definition, line):
+    with pytest.raises(LineTokenizationError):
+        BatchLineProcessor([]).process_batch([short_line])
+    with pytest.raises(StandardDefinitionParseError):
+        BatchLineProcessor(invalid_standard_definition).process_batch([line])
+
+
+def test_scanned_tokens_match_split_tokens(standard_definition):
+    rng = random.Random(0)
+    alphabet = "09aZ \t\n\x0b\x0c\r\x1c\x1f.@_-&&&"
+    lines = []
+    for _ in range(2000):
+        tokens = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 30)))
+        lines.append(rng.choice(["L1&", "L4&"]) + tokens)
+    scanning = BatchLineProcessor(standard_definition)
+    splitting = BatchLineProcessor(standard_definition)
+    splitting.scan_tokens = False
+    assert scanning.process_batch(lines) == splitting.process_batch(lines)
@@ -0,0 +1,82 @@
+import inspect
+
+import pytest
+
+from classes import BatchLineProcessor, CodegenBatchLineProcessor, Generator
+from classes.custom_errors import LineTokenizationError, StandardDefinitionParseError
+from classes.overflow_warnings import TokenOverflowWarnings
+
+
+def test_codegen_matches_token_processor(
+    standard_definition, differential_lines, token_processor_reference
+):
+    processor = CodegenBatchLineProcessor(standard_definition)
+    data = processor.process_batch(differential_lines)
+
+    for line, line_data in zip(differential_lines, data):
+        assert line_data == token_processor_reference(line, standard_definition)
+    # Every line gets its own result dictionaries.
+    assert data[0] is not processor.process_batch(differential_lines)[0]
+
+
+def test_generated_validators_are_cached_and_inspectable(standard_definition):
+    processor = CodegenBatchLineProcessor(standard_definition)
+    other = CodegenBatchLineProcessor(list(standard_definition))
+    assert other.validators is processor.validators
+
+    source = processor.source("L1")
+    assert "def validate_section_0(tokens):" in source
+    assert "<= 1) * 2 + (data_type != 'digits')" in source
+    assert inspect.getsource(processor.validators["L4"]) in processor.source("L4")
+
+    changed = [dict(standard_definition[1], key="L9")]
+    assert CodegenBatchLineProcessor(changed).definition_hash != (
+        processor.definition_hash
+    )
+
+
+def test_codegen_warnings_and_errors(
+    standard_definition, invalid_standard_definition, long_line, short_line, line
+):
+    overflow_warnings = TokenOverflowWarnings()
+    processor = CodegenBatchLineProcessor(standard_definition)
+    assert processor.process_batch([long_line], overflow_warnings) == (
+        BatchLineProcessor(standard_definition).process_batch([long_line])
+    )
+    assert overflow_warnings.counts == {"L1": 1}
+    with pytest.raises(LineTokenizationError):
+        processor.process_line(short_line)
+    with pytest.raises(StandardDefinitionParseError):
+        CodegenBatchLineProcessor(invalid_standard_definition).process_line(line)
+
+
+def test_generator_codegen_engine(many_lines_input_path, standard_definition, tmp_path):
+    for engine in ("python", "codegen"):
+        Generator(workers=2, engine=engine).generate_analyses_from_input_file(
+            many_lines_input_path,
+            f"{tmp_path}/summary_{engine}.txt",
+            f"{tmp_path}/report_{engine}.csv",
+            standard_definition,
+        )
+    for name in ("summary_{}.txt", "report_{}.csv"):
+        with open(tmp_path / name.format("python")) as expected:
+            with open(tmp_path / name.format("codegen")) as actual:
+                assert actual.read() == expected.read()
+
+
+def test_keys_are_not_generated_as_code(capsys):
+    # Quotes closing the generated docstring would let a key run as code.
+    lx = 'x""";print("INJECTED");"""\'\'\'\\'
+    key = "y'''\"\"\"\\"
+    definition = [
+        {
+            "key": lx,
+            "sub_sections": [{"key": key, "data_type": "digits", "max_length": 2}],
+        }
+    ]
+    line = f"{lx}&12"
+    data = CodegenBatchLineProcessor(definition).process_line(line)
+    assert data == BatchLineProcessor(definition).process_line(line)
+    assert data[0]["report_data"]["Section"] == lx
+    assert data[0]["report_data"]["Sub-Section"] == key
+    assert "INJECTED" not in capsys.readouterr().out
@@ -0,0 +1,82 @@
+import csv
+import os
+
+import pytest
+
+from classes import ColumnarReportFormatError, ColumnarReportReader
+from classes.columnar_report import ColumnarReportWriter
+
+
+def _report_rows(path):
+    with open(path, newline="") as report_file:
+        return list(csv.DictReader(report_file))
+
+
+def test_generate_columnar_report_round_trips_to_csv(
+    generator, input_path, standard_definition, columnar_path, tmp_path
+):
+    report_path = f"{tmp_path}/report.csv"
+    converted_path = f"{tmp_path}/converted.csv"
+    generator.generate_analyses_from_input_file(
+        input_path,
+        f"{tmp_path}/summary.txt",
+        report_path,
+        standard_definition,
+        columnar_path=columnar_path,
+    )
+
+    reader = ColumnarReportReader(columnar_path)
+    reader.to_csv(converted_path)
+
+    assert reader.num_rows == 5
+    with open(report_path, "rb") as expected, open(converted_path, "rb") as actual:
+        assert expected.read() == actual.read()
+    assert os.path.getsize(columnar_path) > 0
+
+
+def test_read_single_column_across_row_groups(columnar_path):
+    rows = [
+        {
+            "Section": "L1",
+            "Sub-Section": f"L1{i % 3 + 1}",
+            "Given DataType": "digits" if i % 2 else "",
+            "Expected DataType": "digits",
+            "Given Length": i if i % 2 else "",
+            "Expected MaxLength": 3,
+            "Error Code": "E01" if i % 2 else "E05",
+        }
+        for i in range(10)
+    ]
+    with ColumnarReportWriter(columnar_path, row_group_size=4) as writer:
+        writer.write_rows(rows)
+
+    reader = ColumnarReportReader(columnar_path)
+    assert reader.read_column("Given Length") == [row["Given Length"] for row in rows]
+    assert reader.read_column("Sub-Section") == [row["Sub-Section"] for row in rows]
+
+
+def test_filter_by_error_code(columnar_path):
+    rows = [
+        {
+            "Section": f"L{i}",
+            "Sub-Section": f"L{i}1",
+            "Given DataType": "other",
+            "Expected DataType": "digits",
+            "Given Length": 1,
+            "Expected MaxLength": 1,
+            "Error Code": "E04" if i == 7 else "E02",
+        }
+        for i in range(10)
+    ]
+    with ColumnarReportWriter(columnar_path, row_group_size=3) as writer:
+        writer.write_rows(rows)
+
+    reader = ColumnarReportReader(columnar_path)
+    matches = list(reader.filter_by_error_code("E04", columns=["Section"]))
+    assert matches == [{"Section": "L7"}]
+    assert list(reader.filter_by_error_code("E03")) == []
+
+
+def test_read_invalid_columnar_report(input_path):
+    with pytest.raises(ColumnarReportFormatError):
+        ColumnarReportReader(input_path)
@@ -0,0 +1,28 @@
+import pickle
+
+import pytest
+
+from classes.custom_errors import (
+    ColumnarReportFormatError,
+    LineIndexError,
+    ReportManifestError,
+    RunLengthSummaryFormatError,
+)
+
+
+@pytest.mark.parametrize(
+    "error",
+    [
+        ColumnarReportFormatError("report.gcol", "bad trailer"),
+        LineIndexError("input.txt.idx", "truncated"),
+        RunLengthSummaryFormatError("summary.rle", "no header"),
+        ReportManifestError("report.csv.manifest", "stale"),
+    ],
+)
+def test_errors_survive_pickling(error):
+    # Errors raised in worker processes are pickled back to the caller.
+    copy = pickle.loads(pickle.dumps(error))
+    assert type(copy) is type(error)
+    assert copy.message == error.message
+    assert copy.args == error.args
+    assert vars(copy) == vars(error)
@@ -0,0 +1,146 @@
+import marshal
+
+import pytest
+
+from classes import (
+    BatchLineProcessor,
+    CodegenBatchLineProcessor,
+    CompiledDefinition,
+    DataTypeRuleError,
+    TokenProcessor,
+)
+from classes.datatype_classifier import DataTypeClassifier
+
+DATA_TYPES = [
+    {"name": "hex", "chars": "0-9A-Fa-f"},
+    {"name": "iso_date", "regex": r"\d{4}-\d{2}-\d{2}"},
+    {"name": "alphanumeric", "chars": "0-9A-Za-z"},
+]
+
+
+@pytest.fixture
+def declared_definition():
+    return [
+        {"data_types": DATA_TYPES},
+        {
+            "key": "L1",
+            "sub_sections": [
+                {"key": "L11", "data_type": "hex", "max_length": 4},
+                {"key": "L12", "data_type": "iso_date", "max_length": 10},
+                {"key": "L13", "data_type": "digits", "max_length": 2},
+            ],
+        },
+    ]
+
+
+def test_classifier():
+    classifier = DataTypeClassifier(DATA_TYPES)
+    assert classifier.names == ("hex", "iso_date", "alphanumeric")
+    assert classifier.matches("12") == ["hex", "alphanumeric"]
+    assert classifier.matches("2024-01-31") == ["iso_date"]
+    assert classifier.matches("2024-01-31 ") == []
+    # A token matching its expected type is given that type; otherwise the
+    # first declared type it matches, or its built-in type.
+    assert classifier.datatype("12", "hex") == "hex"
+    assert classifier.datatype("12", "digits") == "digits"
+    assert classifier.datatype("12", "word_characters") == "hex"
+    assert classifier.datatype("zz9", "hex") == "alphanumeric"
+    assert classifier.datatype("a b", "hex") == "word_characters"
+    assert classifier.datatype("", "hex") == ""
+    assert DataTypeClassifier.from_definition([{"key": "L1"}]) is None
+
+
+@pytest.mark.parametrize(
+    "declaration",
+    [
+        {"name": "digits", "chars": "0-9"},
+        {"name": "hex"},
+        {"name": "hex", "chars": "0-9", "regex": "[0-9]+"},
+        {"name": "hex", "regex": "[0-9"},
+        {"chars": "0-9"},
+        {"name": "rep", "regex": r"(a)\1"},
+        {"name": "rep", "regex": r"(?P<a>a)(?P=a)"},
+        {"name": "rep", "regex": r"(a)?(?(1)b|c)"},
+        {"name": "rep", "regex": r"(?P<a>a)b"},
+    ],
+)
+def test_invalid_declarations(declaration):
+    with pytest.raises(DataTypeRuleError):
+        DataTypeClassifier([declaration])
+    with pytest.raises(DataTypeRuleError):
+        DataTypeClassifier([DATA_TYPES[0], DATA_TYPES[0]])
+
+
+def test_escaped_backslashes_and_groups():
+    classifier = DataTypeClassifier(
+        [{"name": "path", "regex": r"a\\1"}, {"name": "pair", "regex": r"(ab)+"}]
+    )
+    assert classifier.first_match("a\\1") == "path"
+    assert classifier.datatype("abab") == "pair"
+    # Names reused across rules would clash in the fused pattern.
+    with pytest.raises(DataTypeRuleError):
+        DataTypeClassifier(
+            [
+                {"name": "one", "regex": "(?P<x>a)"},
+                {"name": "two", "regex": "(?P<x>b)"},
+            ]
+        )
+
+
+def test_engines_with_declared_data_types(declared_definition):
+    lines = [
+        "L1&fF09&2024-01-31&12",
+        "L1&12&1999-12-31x&ab",
+        "L1&zz&&",
+        "L1& 0a1b2 & 2024-01-31 &9",
+    ]
+    expected = [
+        (("hex", "E01"), ("iso_date", "E01"), ("digits", "E01")),
+        (("hex", "E01"), ("other", "E04"), ("hex", "E02")),
+        (("alphanumeric", "E02"), ("", "E04"), ("", "E04")),
+        (("hex", "E03"), ("iso_date", "E01"), ("digits", "E01")),
+    ]
+    compiled = CompiledDefinition(declared_definition)
+    cached = CompiledDefinition.from_primitives(
+        marshal.loads(marshal.dumps(compiled.to_primitives()))
+    )
+    assert list(compiled.sections) == ["L1"]
+    processors = [
+        BatchLineProcessor(declared_definition),
+        BatchLineProcessor(cached),
+        CodegenBatchLineProcessor(declared_definition),
+    ]
+    try:
+        from classes.numpy_line_processor import NumpyBatchLineProcessor
+
+        processors.append(NumpyBatchLineProcessor(declared_definition))
+    except ImportError:
+        pass
+    for processor in processors:
+        data = processor.process_batch(lines)
+        assert [
+            tuple(
+                (
+                    item["report_data"]["Given DataType"],
+                    item["report_data"]["Error Code"],
+                )
+                for item in line_data
+            )
+            for line_data in data
+        ] == expected
+
+    # Data types are part of the hash of the generated validators.
+    plain = [declared_definition[1]]
+    assert CodegenBatchLineProcessor(plain).definition_hash != (
+        processors[2].definition_hash
+    )
+    assert "DATATYPE(token, 'hex')" in processors[2].source("L1")
+
+    token_processor = TokenProcessor(
+        lx="L1",
+        token=["12"],
+        token_constraints=[declared_definition[1]["sub_sections"][0]],
+        missing=False,
+        classifier=compiled.classifier,
+    )
+    assert token_processor.process()["report_data"]["Error Code"] == "E01"
@@ -0,0 +1,87 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from classes import BatchLineProcessor, CompiledDefinition, DefinitionCache, Generator
+from classes import definition_cache
+
+
+@pytest.fixture
+def definition_path(tmp_path, standard_definition):
+    path = f"{tmp_path}/standard_definition.json"
+    with open(path, "w") as writer:
+        json.dump(standard_definition, writer)
+    return path
+
+
+def test_load_caches_compiled_definition(
+    definition_path, standard_definition, many_lines_input_path, tmp_path
+):
+    cache = DefinitionCache(f"{tmp_path}/cache")
+    compiled = cache.load(definition_path, "not found")
+    assert compiled == standard_definition
+    assert len(os.listdir(cache.cache_dir)) == 1
+
+    cached = cache.load(definition_path, "not found")
+    assert cached == standard_definition
+    lines = ["L1&99&&A", "L4&9", "L1&4&AbC&xY&garbage"]
+    expected = BatchLineProcessor(standard_definition).process_batch(lines)
+    assert BatchLineProcessor(cached).process_batch(lines) == expected
+
+    # Compiled definitions are picklable, so they reach worker processes.
+    for workers in (1, 2):
+        Generator(workers=workers, chunk_size=100).generate_analyses_from_input_file(
+            many_lines_input_path,
+            f"{tmp_path}/summary_{workers}.txt",
+            f"{tmp_path}/report_{workers}.csv",
+            cached,
+        )
+    with open(f"{tmp_path}/report_1.csv") as one, open(
+        f"{tmp_path}/report_2.csv"
+    ) as two:
+        assert one.read() == two.read()
+
+
+def test_cache_is_keyed_by_content(
+    definition_path, standard_definition, tmp_path, monkeypatch
+):
+    cache = DefinitionCache(f"{tmp_path}/cache")
+    cache.load(definition_path, "not found")
+    with open(definition_path, "w") as writer:
+        json.dump(standard_definition[:1], writer)
+    assert cache.load(definition_path, "not found") == standard_definition[:1]
+    assert len(os.listdir(cache.cache_dir)) == 2
+
+    # So are the error message templates its messages are rendered from.
+    monkeypatch.setattr(definition_cache, "MESSAGES_DIGEST", "edited templates")
+    cache.load(definition_path, "not found")
+    assert len(os.listdir(cache.cache_dir)) == 3
+
+    # Corrupt entries are rebuilt.
+    for name in os.listdir(cache.cache_dir):
+        with open(os.path.join(cache.cache_dir, name), "wb") as writer:
+            writer.write(b"garbage")
+    reloaded = cache.load(definition_path, "not found")
+    assert isinstance(reloaded, CompiledDefinition)
+    assert reloaded.sections["L1"][0].messages[0].startswith("L11 field")
+
+
+def test_load_missing_file(tmp_path):
+    with pytest.raises(FileNotFoundError) as e:
+        DefinitionCache(f"{tmp_path}/cache").load(f"{tmp_path}/missing", "nope")
+    assert e.value.strerror == "nope"
+
+
+def test_generator_imports_lazily():
+    code = (
+        "import sys, classes.generator; "
+        "print(sorted(m for m in ('asyncio', 'concurrent.futures', 'json', "
+        "'classes.columnar_report') if m in sys.modules))"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    ).stdout
+    assert output.strip() == "[]"
@@ -0,0 +1,84 @@
+import random
+
+import pytest
+
+from classes import BatchLineProcessor, Generator
+from classes import error_rate_sampler
+from classes.error_rate_sampler import reservoir_sample, seek_sample
+
+
+def _exact_rates(path, standard_definition):
+    counts, tokens = {}, 0
+    processor = BatchLineProcessor(standard_definition)
+    with open(path) as reader:
+        for line_data in processor.process_batch(reader.readlines()):
+            for item in line_data:
+                code = item["report_data"]["Error Code"]
+                counts[code] = counts.get(code, 0) + 1
+                tokens += 1
+    return {code: count / tokens for code, count in counts.items()}
+
+
+def test_reservoir_sample():
+    sample, seen = reservoir_sample(range(100_000), 50, random.Random(3))
+    assert seen == 100_000
+    assert len(set(sample)) == 50
+    # Late items are as likely as early ones.
+    assert 10 < sum(item >= 50_000 for item in sample) < 40
+    assert reservoir_sample(range(100_000), 50, random.Random(3))[0] == sample
+    assert reservoir_sample(range(10), 50, random.Random(3)) == (list(range(10)), 10)
+
+
+def test_seek_sample_returns_whole_lines(tmp_path, monkeypatch):
+    monkeypatch.setattr(error_rate_sampler, "BACKTRACK_SIZE", 7)
+    lines = [f"L{i}&{'x' * (i % 40)}\n" for i in range(500)]
+    path = tmp_path / "input.txt"
+    path.write_text("".join(lines))
+
+    sample = seek_sample(str(path), 200, random.Random(0))
+    assert len(sample) == 200
+    for line, length in sample:
+        assert line in lines
+        assert length == len(line)
+
+
+@pytest.mark.parametrize("method", ["seek", "reservoir"])
+def test_estimates_cover_exact_rates(
+    many_lines_input_path, standard_definition, method
+):
+    estimate = Generator().estimate_error_rates(
+        many_lines_input_path, standard_definition, sample_size=400, method=method
+    )
+    estimates = estimate.to_dict()
+
+    assert estimates["method"] == method
+    assert estimates["sampled_lines"] == 400
+    assert estimates["estimated_lines"] == pytest.approx(1000, rel=0.1)
+    for code, rate in _exact_rates(many_lines_input_path, standard_definition).items():
+        interval = estimates["error_codes"][code]
+        assert interval["low"] <= rate <= interval["high"]
+    assert estimates["sections"]["L1"]["line_share"]["rate"] == pytest.approx(
+        0.5, abs=0.1
+    )
+    # The sample is reproducible.
+    again = Generator().estimate_error_rates(
+        many_lines_input_path, standard_definition, sample_size=400, method=method
+    )
+    assert again.to_dict() == estimates
+
+
+def test_estimate_from_stream_counts_invalid_lines(standard_definition):
+    lines = ["L1&99&&A\n", "L4&9\n", "L9&1\n", "L1\n"] * 50
+    estimate = Generator().estimate_error_rates(
+        iter(lines), standard_definition, sample_size=100
+    )
+    estimates = estimate.to_dict()
+    assert estimates["method"] == "reservoir"
+    assert estimates["estimated_lines"] == 200
+    assert sum(estimates["invalid_lines"].values()) == pytest.approx(50, abs=20)
+    assert set(estimates["invalid_lines"]) <= {
+        "LineTokenizationError",
+        "StandardDefinitionParseError",
+    }
+    with pytest.raises(ValueError):
+        Generator().estimate_error_rates(lines, standard_definition, method="magic")
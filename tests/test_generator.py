@@ -1,6 +1,10 @@
 import filecmp
 import os
 
+import pytest
+
+from classes import CodegenBatchLineProcessor, Generator
+from classes.overflow_warnings import TokenOverflowWarnings
 from utils import remove_file_if_exists
 
 
@@ -50,3 +54,54 @@ def test_generate_analyses_from_input_file(
     assert not os.path.exists(report_path)
     # Assert the input file still exists.
     assert os.path.exists(input_path)
+
+
+@pytest.mark.parametrize("engine", ["python", "codegen", "numpy"])
+def test_thread_backend_matches_serial_run(
+    many_lines_input_path, standard_definition, tmp_path, engine
+):
+    if engine == "numpy":
+        pytest.importorskip("numpy")
+    outputs = []
+    for name, generator in (
+        ("serial", Generator(chunk_size=37, engine=engine)),
+        ("threads", Generator(3, chunk_size=37, engine=engine, backend="thread")),
+    ):
+        overflow_warnings = TokenOverflowWarnings()
+        chunks = list(
+            generator.iter_line_data_chunks(
+                many_lines_input_path,
+                standard_definition,
+                overflow_warnings=overflow_warnings,
+            )
+        )
+        generator.generate_analyses_from_input_file(
+            many_lines_input_path,
+            f"{tmp_path}/{name}_summary.txt",
+            f"{tmp_path}/{name}_report.csv",
+            standard_definition,
+        )
+        outputs.append((chunks, overflow_warnings.counts))
+    assert outputs[0] == outputs[1]
+    for kind in ("summary.txt", "report.csv"):
+        assert filecmp.cmp(
+            f"{tmp_path}/serial_{kind}", f"{tmp_path}/threads_{kind}", shallow=False
+        )
+
+
+def test_codegen_validators_generated_once_across_threads(standard_definition):
+    from concurrent.futures import ThreadPoolExecutor
+
+    definition = [
+        dict(section, key=f"T{section['key']}") for section in standard_definition
+    ]
+    with ThreadPoolExecutor(8) as executor:
+        processors = list(
+            executor.map(lambda _: CodegenBatchLineProcessor(definition), range(16))
+        )
+    assert len({id(processor.validators) for processor in processors}) == 1
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        Generator(backend="fibers")
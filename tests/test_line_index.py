@@ -0,0 +1,86 @@
+import pytest
+
+from classes import LineIndex, LineIndexError
+
+
+def test_build_save_and_load(many_lines_input_path):
+    line_index = LineIndex.build(many_lines_input_path, interval=64)
+    line_index.save()
+    loaded = LineIndex.load(many_lines_input_path)
+
+    assert loaded.num_lines == 1000
+    assert list(loaded.offsets) == list(line_index.offsets)
+    with open(many_lines_input_path, "rb") as reader:
+        lines = reader.readlines()
+    indexed_line, offset = loaded.seek_point(200)
+    assert indexed_line == 192
+    assert offset == sum(len(line) for line in lines[:192])
+
+
+def test_load_stale_index(many_lines_input_path):
+    LineIndex.build(many_lines_input_path).save()
+    with open(many_lines_input_path, "a") as writer:
+        writer.write("L4&1\n")
+    with pytest.raises(LineIndexError):
+        LineIndex.load(many_lines_input_path)
+    assert LineIndex.load_or_build(many_lines_input_path).num_lines == 1001
+
+
+def test_shards_cover_input(many_lines_input_path):
+    line_index = LineIndex.build(many_lines_input_path, interval=10)
+    shards = line_index.shards(4)
+
+    assert len(shards) == 4
+    assert shards[0][0] == 0 and shards[-1][1] == 1000
+    assert all(end == start for (_, end), (start, _) in zip(shards, shards[1:]))
+
+
+def test_iter_line_data_with_range(
+    generator, many_lines_input_path, standard_definition
+):
+    line_index = LineIndex.build(many_lines_input_path, interval=64)
+    everything = list(
+        generator.iter_line_data(many_lines_input_path, standard_definition)
+    )
+    seeked = list(
+        generator.iter_line_data(
+            many_lines_input_path, standard_definition, 130, 260, line_index
+        )
+    )
+    assert seeked == everything[130:260]
+
+
+def test_merge_sharded_analyses(
+    generator, many_lines_input_path, standard_definition, tmp_path
+):
+    generator.generate_analyses_from_input_file(
+        many_lines_input_path,
+        f"{tmp_path}/summary.txt",
+        f"{tmp_path}/report.csv",
+        standard_definition,
+    )
+    line_index = LineIndex.build(many_lines_input_path, interval=16)
+    shard_paths = []
+    for number, (start, end) in enumerate(line_index.shards(3)):
+        paths = (f"{tmp_path}/summary_{number}.txt", f"{tmp_path}/report_{number}.csv")
+        generator.generate_analyses_from_input_file(
+            many_lines_input_path,
+            *paths,
+            standard_definition,
+            start_line=start,
+            end_line=end,
+            line_index=line_index,
+        )
+        shard_paths.append(paths)
+
+    generator.merge_analyses(
+        [summary for summary, _ in shard_paths],
+        [report for _, report in shard_paths],
+        f"{tmp_path}/merged_summary.txt",
+        f"{tmp_path}/merged_report.csv",
+    )
+
+    for name in ("summary.txt", "report.csv"):
+        with open(f"{tmp_path}/{name}", "rb") as expected:
+            with open(f"{tmp_path}/merged_{name}", "rb") as actual:
+                assert expected.read() == actual.read()
@@ -1,7 +1,9 @@
 import logging
 import pytest
 
+from classes import LineProcessor
 from classes.custom_errors import LineTokenizationError, StandardDefinitionParseError
+from classes.line_processor import processor_for
 
 LOGGER = logging.getLogger(__name__)
 
@@ -143,3 +145,15 @@ def test_process_with_long_line(caplog, line_processor_with_long_line):
             "Scaling the number of tokens back to match the number of LXYs."
             in caplog.text
         )
+
+
+def test_line_processors_share_compiled_sections(line, long_line, standard_definition):
+    first = LineProcessor(line, standard_definition)
+    second = LineProcessor(long_line, standard_definition)
+    first.process()
+    second.process()
+    shared = processor_for(standard_definition)
+    assert processor_for(first.standard_definition) is shared
+    assert processor_for(second.standard_definition).sections is shared.sections
+    # An equal but distinct definition is compiled on its own.
+    assert processor_for(list(standard_definition)) is not shared
@@ -0,0 +1,138 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from classes import Generator, MemoryBudget
+from classes.memory_budget import children_private_bytes, current_rss
+from classes.overflow_warnings import TokenOverflowWarnings
+
+
+def _read(path):
+    with open(path) as reader:
+        return reader.read()
+
+
+def _run(generator, input_path, standard_definition, output_dir):
+    os.makedirs(output_dir, exist_ok=True)
+    generator.generate_analyses_from_input_file(
+        input_path,
+        f"{output_dir}/summary.txt",
+        f"{output_dir}/report.csv",
+        standard_definition,
+        section_dir=f"{output_dir}/sections",
+    )
+
+
+_held = []
+
+
+def _hold(num_bytes):
+    _held.append(b"x" * num_bytes)
+    return os.getpid()
+
+
+def _idle_workers_bytes(workers):
+    """Returns the memory held on their own by idle pool workers."""
+    with ProcessPoolExecutor(workers) as executor:
+        list(executor.map(_hold, [0] * workers))
+        return children_private_bytes()
+
+
+@pytest.mark.parametrize(
+    "workers, method, limit",
+    [(1, "tracemalloc", 1 << 20), (2, "rss", None)],
+)
+def test_budgeted_run_matches_unbudgeted_run(
+    many_lines_input_path, standard_definition, tmp_path, workers, method, limit
+):
+    if limit is None:
+        limit = current_rss() + _idle_workers_bytes(workers) + (8 << 20)
+    budget = MemoryBudget(limit, method=method)
+    _run(
+        Generator(workers=workers, chunk_size=1000, memory_budget=budget),
+        many_lines_input_path,
+        standard_definition,
+        f"{tmp_path}/budgeted",
+    )
+    _run(Generator(), many_lines_input_path, standard_definition, tmp_path)
+
+    for name in ("summary.txt", "report.csv", "sections/L1/report.csv"):
+        assert _read(f"{tmp_path}/budgeted/{name}") == _read(f"{tmp_path}/{name}")
+    assert budget.bytes_per_line > 0
+    assert budget.peak_bytes <= limit
+
+
+@pytest.mark.skipif(not os.path.exists("/proc/self/task"), reason="needs /proc")
+def test_worker_memory_is_measured():
+    budget = MemoryBudget(1 << 30)
+    with ProcessPoolExecutor(1) as executor:
+        executor.submit(_hold, 0).result()
+        before = budget.usage()
+        executor.submit(_hold, 32 << 20).result()
+        assert children_private_bytes() >= 32 << 20
+        assert budget.usage() - before >= 32 << 20
+
+
+@pytest.mark.skipif(not os.path.exists("/proc/self/task"), reason="needs /proc")
+def test_process_pool_held_under_budget(
+    many_lines_input_path, standard_definition, tmp_path
+):
+    worker_bytes = _idle_workers_bytes(2)
+    limit = current_rss() + worker_bytes + (8 << 20)
+    budget = MemoryBudget(limit)
+    chunks = Generator(workers=2, chunk_size=1000, memory_budget=budget)
+    sizes = [
+        len(chunk)
+        for chunk in chunks.iter_line_data_chunks(
+            many_lines_input_path, standard_definition
+        )
+    ]
+    assert sum(sizes) == 1000
+    assert max(sizes) < 1000
+    # The workers' memory was measured, and the pool kept within the limit.
+    assert budget.peak_bytes > budget.baseline_bytes + worker_bytes
+    assert budget.peak_bytes <= limit
+
+
+def test_chunks_sized_by_budget(many_lines_input_path, standard_definition):
+    budget = MemoryBudget(200 << 10, method="tracemalloc")
+    generator = Generator(chunk_size=1000, memory_budget=budget)
+    sizes = [
+        len(chunk)
+        for chunk in generator.iter_line_data_chunks(
+            many_lines_input_path,
+            standard_definition,
+            overflow_warnings=TokenOverflowWarnings(),
+        )
+    ]
+    assert sum(sizes) == 1000
+    assert 16 <= max(sizes[1:-1]) < 100
+    assert budget.degradations == 0
+
+
+def test_degrades_to_smaller_chunks(many_lines_input_path, standard_definition):
+    budget = MemoryBudget(1 << 20, method="tracemalloc", min_chunk_size=8)
+    generator = Generator(chunk_size=1000, memory_budget=budget)
+    # Holding on to every chunk makes the run outgrow its budget.
+    chunks = list(
+        generator.iter_line_data_chunks(many_lines_input_path, standard_definition)
+    )
+    assert sum(len(chunk) for chunk in chunks) == 1000
+    assert budget.degradations > 0
+    assert len(chunks[-2]) < len(chunks[1])
+    assert len(chunks[-2]) == 8
+
+
+def test_fit_and_chunk_size():
+    budget = MemoryBudget(1000 << 10)
+    budget.baseline_bytes = 0
+    assert budget.fit(1 << 10, 1000) == 200
+    assert budget.fit(1 << 30, 64) == 1
+    assert budget.chunk_size(1000) == 64
+    budget.bytes_per_line = 1 << 10
+    assert budget.chunk_size(1000) == 300
+    assert budget.chunk_size(100) == 100
+    assert budget.chunks_in_flight(300, 8) == 2
+    with pytest.raises(ValueError):
+        MemoryBudget(1 << 20, method="vms")
@@ -0,0 +1,68 @@
+import logging
+
+import pytest
+
+from classes import BatchLineProcessor, Generator, LineTokenizationError
+from classes.overflow_warnings import TokenOverflowWarnings
+
+np = pytest.importorskip("numpy")
+
+from classes.numpy_line_processor import NumpyBatchLineProcessor  # noqa: E402
+
+
+def test_numpy_engine_matches_token_processor(
+    standard_definition, differential_lines, token_processor_reference
+):
+    processor = NumpyBatchLineProcessor(standard_definition)
+    data = processor.process_batch(differential_lines)
+
+    for line, line_data in zip(differential_lines, data):
+        assert line_data == token_processor_reference(line, standard_definition)
+
+
+def test_numpy_engine_matches_batch_line_processor_on_random_lines(
+    standard_definition,
+):
+    rng = np.random.default_rng(0)
+    alphabet = list("09aZ &\t.\x1fé")
+    lines = []
+    for _ in range(2000):
+        tokens = [
+            "".join(rng.choice(alphabet, size=rng.integers(0, 6)))
+            for _ in range(rng.integers(1, 5))
+        ]
+        lines.append("&".join([str(rng.choice(["L1", "L4"])), *tokens]) + "\n")
+
+    expected_warnings, actual_warnings = (
+        TokenOverflowWarnings(),
+        TokenOverflowWarnings(),
+    )
+    expected = BatchLineProcessor(standard_definition).process_batch(
+        lines, expected_warnings
+    )
+    actual = NumpyBatchLineProcessor(standard_definition).process_batch(
+        lines, actual_warnings
+    )
+    assert actual == expected
+    assert actual_warnings.counts == expected_warnings.counts
+
+
+def test_numpy_engine_raises_in_line_order(caplog, standard_definition, short_line):
+    processor = NumpyBatchLineProcessor(standard_definition)
+    with caplog.at_level(logging.WARNING), pytest.raises(LineTokenizationError):
+        processor.process_batch(["L1&1&a&b&c", short_line, "L9&1"])
+    assert "L1&1&a&b&c" in caplog.text
+
+
+def test_generator_numpy_engine(many_lines_input_path, standard_definition, tmp_path):
+    for engine in ("python", "numpy"):
+        Generator(engine=engine, chunk_size=128).generate_analyses_from_input_file(
+            many_lines_input_path,
+            f"{tmp_path}/summary_{engine}.txt",
+            f"{tmp_path}/report_{engine}.csv",
+            standard_definition,
+        )
+    for name in ("summary_{}.txt", "report_{}.csv"):
+        with open(f"{tmp_path}/{name.format('python')}", "rb") as expected:
+            with open(f"{tmp_path}/{name.format('numpy')}", "rb") as actual:
+                assert expected.read() == actual.read()
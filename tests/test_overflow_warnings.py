@@ -0,0 +1,59 @@
+import logging
+
+import pytest
+
+from classes import Generator, LineProcessor
+from classes.overflow_warnings import TokenOverflowWarnings
+
+
+def test_record_and_merge():
+    warnings = TokenOverflowWarnings(sample_size=2)
+    for i in range(3):
+        warnings.record("L1", f"L1&{i}&a&b&c\n")
+    other = TokenOverflowWarnings(sample_size=2)
+    other.record("L1", "L1&9&a&b&c")
+    other.record("L4", "L4&a&1&x")
+    warnings.merge(other)
+
+    assert warnings.counts == {"L1": 4, "L4": 1}
+    assert warnings.samples == {"L1": ["L1&0&a&b&c", "L1&1&a&b&c"], "L4": ["L4&a&1&x"]}
+    assert warnings.total == 5
+
+
+def test_line_processor_records_instead_of_logging(
+    caplog, long_line, standard_definition
+):
+    warnings = TokenOverflowWarnings()
+    with caplog.at_level(logging.WARNING):
+        LineProcessor(long_line, standard_definition, warnings).process()
+    assert caplog.records == []
+    assert warnings.counts == {"L1": 1}
+
+
+def test_nothing_recorded_when_warnings_disabled(
+    caplog, long_line, standard_definition
+):
+    warnings = TokenOverflowWarnings()
+    with caplog.at_level(logging.ERROR):
+        LineProcessor(long_line, standard_definition, warnings).process()
+        LineProcessor(long_line, standard_definition).process()
+    assert caplog.records == []
+    assert warnings.counts == {}
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_generator_logs_single_summary(
+    caplog, many_lines_input_path, standard_definition, tmp_path, workers
+):
+    generator = Generator(workers=workers, chunk_size=100, overflow_sample_size=1)
+    with caplog.at_level(logging.WARNING):
+        generator.generate_analyses_from_input_file(
+            many_lines_input_path,
+            f"{tmp_path}/summary.txt",
+            f"{tmp_path}/report.csv",
+            standard_definition,
+        )
+    assert len(caplog.records) == 1
+    message = caplog.records[0].getMessage()
+    assert "in 665 line(s)" in message
+    assert "L1: 416 line(s), e.g. ['L1&4&AbC&xY&garbage&&']" in message
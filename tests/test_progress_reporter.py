@@ -0,0 +1,128 @@
+import csv
+import io
+import os
+import threading
+
+from classes import Generator, ProgressReporter
+from classes.progress_reporter import MAX_QUEUED_CHUNKS
+
+
+def test_progress_reporter_during_run(
+    many_lines_input_path, standard_definition, tmp_path
+):
+    stream = io.StringIO()
+    metrics_path = f"{tmp_path}/metrics.prom"
+    reporter = ProgressReporter(
+        interval=0.001, stream=stream, metrics_path=metrics_path
+    )
+    Generator(chunk_size=64).generate_analyses_from_input_file(
+        many_lines_input_path,
+        f"{tmp_path}/summary.txt",
+        f"{tmp_path}/report.csv",
+        standard_definition,
+        progress_reporter=reporter,
+    )
+
+    with open(f"{tmp_path}/report.csv", newline="") as report_file:
+        codes = [row["Error Code"] for row in csv.DictReader(report_file)]
+    assert reporter.lines == 1000
+    assert (
+        reporter.bytes == reporter.total_bytes == os.path.getsize(many_lines_input_path)
+    )
+    assert reporter.tokens == len(codes)
+    assert reporter.error_codes == {code: codes.count(code) for code in set(codes)}
+
+    final = stream.getvalue().splitlines()[-1]
+    assert final.startswith("progress: 100.0% | 1,000 lines |")
+    assert final.endswith("ETA 0:00:00")
+    with open(metrics_path) as reader:
+        metrics = reader.read().splitlines()
+    assert "line_validation_lines_processed_total 1000" in metrics
+    assert "line_validation_progress_ratio 1.0" in metrics
+    assert f'line_validation_error_codes_total{{code="E05"}} {codes.count("E05")}' in (
+        metrics
+    )
+    assert not os.path.exists(f"{metrics_path}.tmp")
+
+
+def test_progress_line_and_metrics_formats():
+    snapshot = {
+        "lines": 1234,
+        "bytes": 250,
+        "tokens": 5000,
+        "tokens_per_second": 2500.4,
+        "error_codes": {"E01": 4000, "E05": 1000},
+        "elapsed_seconds": 2.0,
+        "progress": 0.25,
+        "eta_seconds": 3725.0,
+    }
+    assert ProgressReporter.format_line(snapshot) == (
+        "progress:  25.0% | 1,234 lines | 2,500 tokens/s | E01 4,000 E05 1,000 "
+        "| ETA 1:02:05"
+    )
+    metrics = ProgressReporter.format_metrics(dict(snapshot, eta_seconds=None))
+    assert "# TYPE line_validation_tokens_processed_total counter" in metrics
+    assert "eta_seconds" not in metrics
+
+
+def test_progress_counts_bytes_on_disk(
+    many_lines_input_path, standard_definition, tmp_path
+):
+    crlf_path = f"{tmp_path}/crlf_input_file.txt"
+    with open(many_lines_input_path) as reader, open(crlf_path, "wb") as writer:
+        lines = reader.read().splitlines()
+        # A last line with no line ending.
+        writer.write("\r\n".join(lines).encode())
+
+    stream = io.StringIO()
+    reporter = ProgressReporter(interval=60, stream=stream)
+    Generator(chunk_size=64).generate_analyses_from_input_file(
+        crlf_path,
+        f"{tmp_path}/summary.txt",
+        f"{tmp_path}/report.csv",
+        standard_definition,
+        progress_reporter=reporter,
+    )
+    assert reporter.lines == 1000
+    assert reporter.bytes == reporter.total_bytes == os.path.getsize(crlf_path)
+    assert stream.getvalue().startswith("progress: 100.0% | 1,000 lines |")
+
+    reporter = ProgressReporter(interval=60, stream=None)
+    Generator(chunk_size=64).generate_analyses_from_input_file(
+        crlf_path,
+        f"{tmp_path}/summary.txt",
+        f"{tmp_path}/report.csv",
+        standard_definition,
+        start_line=10,
+        end_line=20,
+        progress_reporter=reporter,
+    )
+    assert reporter.lines == 10
+    assert reporter.bytes == sum(len(line) + 2 for line in lines[10:20])
+
+
+def test_submitted_chunks_are_bounded(monkeypatch):
+    reporter = ProgressReporter(interval=60, stream=None)
+    release = threading.Event()
+    tally = reporter._tally
+
+    def slow_tally(lines, chunk):
+        release.wait()
+        tally(lines, chunk)
+
+    monkeypatch.setattr(reporter, "_tally", slow_tally)
+    chunk = [[{"report_data": {"Error Code": "E01"}}]]
+    reporter.start()
+    submitter = threading.Thread(
+        target=lambda: [reporter.submit(["L1&1\n"], chunk) for _ in range(10)]
+    )
+    submitter.start()
+    submitter.join(0.2)
+    # The reporting thread is stuck on a chunk: submit() waits for it.
+    assert submitter.is_alive()
+    assert reporter._chunks.qsize() == MAX_QUEUED_CHUNKS
+    release.set()
+    submitter.join()
+    reporter.close()
+    assert reporter.lines == 10
+    assert reporter.error_codes == {"E01": 10}
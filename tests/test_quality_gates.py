@@ -0,0 +1,79 @@
+import csv
+import os
+
+import pytest
+
+from classes import Generator, QualityGate, QualityGateError
+
+
+def _run(input_path, standard_definition, output_dir, gates, workers=1):
+    os.makedirs(output_dir, exist_ok=True)
+    Generator(workers=workers, chunk_size=64).generate_analyses_from_input_file(
+        input_path,
+        f"{output_dir}/summary.txt",
+        f"{output_dir}/report.csv",
+        standard_definition,
+        quality_gates=gates,
+    )
+
+
+def _report_lines(output_dir):
+    with open(f"{output_dir}/report.csv", newline="") as report_file:
+        return len(list(csv.DictReader(report_file)))
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_count_gate_aborts_early(
+    many_lines_input_path, standard_definition, tmp_path, workers
+):
+    # L4 lines without a trailing "&" (one in 12 lines, from line 9) hold
+    # an E05.
+    gate = QualityGate("E05", max_count=10, section="L4")
+    with pytest.raises(QualityGateError) as error:
+        _run(many_lines_input_path, standard_definition, tmp_path, [gate], workers)
+
+    assert error.value.gate == "E05 count in L4 <= 10"
+    assert error.value.line == 129
+    assert error.value.matched == 11
+    assert "tripped at input line 129" in str(error.value)
+    # Only the first two chunks of 64 lines (10 tokens per 4 lines) were
+    # written.
+    assert _report_lines(tmp_path) == 320
+
+
+def test_rate_gates(many_lines_input_path, standard_definition, tmp_path):
+    # 250 of the 1500 L1 tokens are E04 (17%) and 83 of the 1000 L4 tokens
+    # are E05 (8%), spread evenly over the input.
+    _run(
+        many_lines_input_path,
+        standard_definition,
+        tmp_path,
+        [QualityGate("E04", max_rate=0.25, section="L1"), QualityGate("E05", 0.1)],
+    )
+    assert _report_lines(tmp_path) == 2500
+
+    with pytest.raises(QualityGateError) as error:
+        _run(
+            many_lines_input_path,
+            standard_definition,
+            f"{tmp_path}/decisive",
+            [QualityGate(("E04", "E05"), max_rate=0.05)],
+        )
+    assert error.value.gate == "E04+E05 rate <= 0.05"
+    assert error.value.line < 100
+
+    with pytest.raises(QualityGateError) as error:
+        _run(
+            many_lines_input_path,
+            standard_definition,
+            f"{tmp_path}/final",
+            [QualityGate("E04", max_rate=0.16, section="L1")],
+        )
+    assert error.value.line == 999
+
+
+def test_invalid_gate():
+    with pytest.raises(ValueError):
+        QualityGate("E04")
+    with pytest.raises(ValueError):
+        QualityGate("E04", max_rate=0.1, max_count=10)
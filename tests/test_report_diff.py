@@ -0,0 +1,101 @@
+import copy
+import csv
+import shutil
+
+from classes import Generator, ReportManifest
+from classes.report_diff import ABSENT, diff_reports
+
+
+def _generate(input_path, standard_definition, output_dir):
+    Generator().generate_analyses_from_input_file(
+        input_path,
+        f"{output_dir}/summary.txt",
+        f"{output_dir}/report.csv",
+        standard_definition,
+        summary=False,
+    )
+    return f"{output_dir}/report.csv"
+
+
+def _rows(report_path):
+    with open(report_path, newline="") as report_file:
+        return list(csv.DictReader(report_file))
+
+
+def test_diff_after_definition_change(
+    many_lines_input_path, standard_definition, tmp_path
+):
+    changed_definition = copy.deepcopy(standard_definition)
+    changed_definition[0]["sub_sections"][0]["max_length"] = 2
+    (tmp_path / "old").mkdir()
+    (tmp_path / "new").mkdir()
+    old_path = _generate(many_lines_input_path, standard_definition, tmp_path / "old")
+    new_path = _generate(many_lines_input_path, changed_definition, tmp_path / "new")
+
+    diff = diff_reports(old_path, new_path, sample_size=3)
+
+    expected = {}
+    for old_row, new_row in zip(_rows(old_path), _rows(new_path)):
+        key = (old_row["Error Code"], new_row["Error Code"])
+        section = expected.setdefault(old_row["Section"], {})
+        section[key] = section.get(key, 0) + 1
+    assert diff.transitions == expected
+    assert diff.transitions["L1"][("E03", "E01")] == 250
+    assert diff.changed() == 250
+    assert diff.lines == 1000 and diff.lines_only_in_old == 0
+    examples = diff.examples[("L1", "E03", "E01")]
+    assert len(examples) == 3
+    for example in examples:
+        assert example["old"][1] == example["new"][1] == "L11"
+        assert example["line"] % 4 == 0
+    assert "E03->E01" in diff.to_dict()["transitions"]["L1"]
+    assert diff.format_matrices().startswith("L1")
+
+
+def test_diff_with_manifests(many_lines_input_path, standard_definition, tmp_path):
+    changed_input_path = f"{tmp_path}/changed_input_file.txt"
+    with open(many_lines_input_path) as reader:
+        lines = reader.readlines()
+    # "L1&99&&A&&": L11 goes from E03 to E01 and L12 from E05 to E01.
+    lines[500] = "L1&1&abc&de\n"
+    with open(changed_input_path, "w") as writer:
+        writer.writelines(lines)
+    (tmp_path / "old").mkdir()
+    (tmp_path / "new").mkdir()
+    old_path = _generate(many_lines_input_path, standard_definition, tmp_path / "old")
+    new_path = _generate(changed_input_path, standard_definition, tmp_path / "new")
+    lockstep = diff_reports(old_path, new_path).to_dict()
+
+    for path in (old_path, new_path):
+        ReportManifest.build(path, lines_per_chunk=100).save()
+    diff = diff_reports(old_path, new_path)
+
+    assert diff.chunks_skipped == 9
+    assert diff.to_dict() == dict(lockstep, chunks_skipped=9)
+    assert [example["line"] for example in diff.to_dict()["examples"]] == [500] * 2
+
+    # A manifest is ignored once its report has changed.
+    shutil.copy(old_path, new_path)
+    assert ReportManifest.load_if_fresh(new_path) is None
+    assert diff_reports(old_path, new_path).changed() == 0
+
+
+def test_diff_with_added_sub_section(tmp_path):
+    header = "Section,Sub-Section,Error Code\n"
+    with open(f"{tmp_path}/old.csv", "w") as writer:
+        writer.write(header + "L1,L11,E01\nL1,L12,E02\nL1,L11,E05\nL1,L12,E05\n")
+    with open(f"{tmp_path}/new.csv", "w") as writer:
+        writer.write(
+            header + "L1,L11,E01\nL1,L12,E02\nL1,L13,E05\nL1,L11,E05\nL1,L12,E01\n"
+        )
+    diff = diff_reports(f"{tmp_path}/old.csv", f"{tmp_path}/new.csv")
+    assert diff.transitions == {
+        "L1": {
+            ("E01", "E01"): 1,
+            ("E02", "E02"): 1,
+            (ABSENT, "E05"): 1,
+            ("E05", "E05"): 1,
+            ("E05", "E01"): 1,
+        }
+    }
+    assert diff.examples[("L1", ABSENT, "E05")][0]["old"] is None
@@ -0,0 +1,88 @@
+import csv
+import io
+import random
+
+from classes import BatchLineProcessor, Generator, ReportSerializer
+from classes.report_serializer import format_field
+
+AWKWARD = ["L1", "a,b", 'say "hi"', "two\nlines", "cr\r", "", " padded "]
+
+
+def dict_writer_report(lines_data):
+    output = io.StringIO(newline="")
+    dict_writer = None
+    for line_data in lines_data:
+        rows = [item["report_data"] for item in line_data]
+        if dict_writer is None:
+            dict_writer = csv.DictWriter(output, rows[0].keys())
+            dict_writer.writeheader()
+        dict_writer.writerows(rows)
+    return output.getvalue()
+
+
+def test_format_field():
+    for value in AWKWARD + [None, 0, 12]:
+        output = io.StringIO(newline="")
+        csv.writer(output).writerow([value, "x"])
+        assert f"{format_field(value)},x\r\n" == output.getvalue()
+
+
+def test_matches_dict_writer():
+    rng = random.Random(0)
+    definition = [
+        {
+            "key": lx,
+            "sub_sections": [
+                {
+                    "key": f"{lx}{lxy}",
+                    "data_type": rng.choice(AWKWARD + ["digits"]),
+                    "max_length": rng.randint(1, 20),
+                }
+                for lxy in AWKWARD[:4]
+            ],
+        }
+        for lx in AWKWARD[:3]
+    ]
+    serializer = ReportSerializer(definition)
+    lines_data = []
+    for _ in range(200):
+        section = rng.choice(definition + [{"key": "LX", "sub_sections": []}])
+        sub_sections = section["sub_sections"] or [
+            {"key": "LX1", "data_type": "a,b", "max_length": 3}
+        ]
+        line_data = []
+        for sub in sub_sections:
+            length = rng.choice(["", rng.randint(0, 30)])
+            row = {
+                "Section": section["key"],
+                "Sub-Section": sub["key"],
+                "Given DataType": rng.choice(AWKWARD + ["digits", "other"]),
+                "Expected DataType": sub["data_type"],
+                "Given Length": length,
+                "Expected MaxLength": sub["max_length"],
+                "Error Code": rng.choice(["E01", "E02", "E03", "E04", "E05"]),
+            }
+            line_data.append({"report_data": row, "summary_data": {}})
+        lines_data.append(line_data)
+
+    expected = dict_writer_report(lines_data)
+    assert serializer.header + serializer.serialize_lines(lines_data) == expected
+
+
+def test_generator_report_is_byte_identical(
+    many_lines_input_path, standard_definition, tmp_path
+):
+    lines = open(many_lines_input_path).read().splitlines()
+    expected = dict_writer_report(
+        BatchLineProcessor(standard_definition).process_batch(lines)
+    )
+    for engine in ("python", "codegen"):
+        report_path = tmp_path / f"{engine}.csv"
+        Generator(chunk_size=64, engine=engine).generate_analyses_from_input_file(
+            many_lines_input_path,
+            str(tmp_path / "summary.txt"),
+            str(report_path),
+            standard_definition,
+            summary=False,
+        )
+        assert report_path.read_bytes() == expected.encode()
@@ -0,0 +1,72 @@
+import os
+
+import pytest
+
+from classes import Generator, RunLengthSummaryFormatError
+from classes.rle_summary import expand_summary, iter_runs
+
+
+def _read(path):
+    with open(path) as reader:
+        return reader.read()
+
+
+@pytest.fixture
+def repetitive_input_path(tmp_path):
+    path = f"{tmp_path}/repetitive_input_file.txt"
+    with open(path, "w") as writer:
+        for line, count in (("L1&9&AbC&xY", 500), ("L4&9", 3), ("L1&9&AbC&xY", 497)):
+            writer.write(f"{line}\n" * count)
+    return path
+
+
+def test_rle_summary_expands_to_summary(
+    repetitive_input_path, standard_definition, tmp_path
+):
+    rle_path = f"{tmp_path}/summary.rle"
+    Generator(chunk_size=64).generate_analyses_from_input_file(
+        repetitive_input_path,
+        f"{tmp_path}/summary.txt",
+        f"{tmp_path}/report.csv",
+        standard_definition,
+        rle_summary_path=rle_path,
+    )
+
+    runs = [(first, last, count) for first, last, count, _ in iter_runs(rle_path)]
+    assert runs == [(0, 499, 500), (500, 502, 3), (503, 999, 497)]
+    assert os.path.getsize(rle_path) * 100 < os.path.getsize(f"{tmp_path}/summary.txt")
+    expand_summary(rle_path, f"{tmp_path}/expanded.txt")
+    assert _read(f"{tmp_path}/expanded.txt") == _read(f"{tmp_path}/summary.txt")
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_rle_summary_of_line_range(
+    many_lines_input_path, standard_definition, tmp_path, workers
+):
+    rle_path = f"{tmp_path}/summary.rle"
+    Generator(workers=workers, chunk_size=64).generate_analyses_from_input_file(
+        many_lines_input_path,
+        f"{tmp_path}/summary.txt",
+        f"{tmp_path}/report.csv",
+        standard_definition,
+        start_line=100,
+        end_line=300,
+        rle_summary_path=rle_path,
+    )
+    runs = list(iter_runs(rle_path))
+    assert runs[0][0] == 100 and runs[-1][1] == 299
+    expand_summary(rle_path, f"{tmp_path}/expanded.txt")
+    assert _read(f"{tmp_path}/expanded.txt") == _read(f"{tmp_path}/summary.txt")
+
+
+def test_invalid_rle_summary(tmp_path):
+    path = f"{tmp_path}/summary.rle"
+    for content in (
+        "L11 field\n",
+        "# run-length summary v1\n@@ lines 0-4 x4\nL11 field\n\n",
+        "# run-length summary v1\n@@ lines 0-3 x4\nL11 field\n",
+    ):
+        with open(path, "w") as writer:
+            writer.write(content)
+        with pytest.raises(RunLengthSummaryFormatError):
+            list(iter_runs(path))
@@ -0,0 +1,81 @@
+import csv
+import os
+
+import pytest
+
+from classes import Generator, LineTokenizationError
+from classes.section_writer import SectionPartitionedWriter
+
+
+def _read(path):
+    with open(path, "rb") as reader:
+        return reader.read()
+
+
+def _expected_section_report(report_path, section):
+    with open(report_path, newline="") as report_file:
+        rows = list(csv.reader(report_file))
+    return [rows[0]] + [row for row in rows[1:] if row[0] == section]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_generate_section_analyses(
+    many_lines_input_path, standard_definition, tmp_path, workers
+):
+    generator = Generator(workers=workers, chunk_size=64)
+    report_path = f"{tmp_path}/report.csv"
+    generator.generate_analyses_from_input_file(
+        many_lines_input_path,
+        f"{tmp_path}/summary.txt",
+        report_path,
+        standard_definition,
+        section_dir=f"{tmp_path}/sections",
+        max_open_section_files=2,
+    )
+
+    assert sorted(os.listdir(f"{tmp_path}/sections")) == ["L1", "L4"]
+    for section in ("L1", "L4"):
+        with open(f"{tmp_path}/sections/{section}/report.csv", newline="") as f:
+            assert list(csv.reader(f)) == _expected_section_report(report_path, section)
+    summary = _read(f"{tmp_path}/sections/L4/summary.txt").decode()
+    assert summary.startswith("L41 field under section L4")
+    assert "L1" not in summary.replace("L41", "").replace("L42", "")
+
+
+def test_parallel_outputs_match_serial(
+    many_lines_input_path, standard_definition, tmp_path
+):
+    for workers in (1, 3):
+        Generator(workers=workers, chunk_size=50).generate_analyses_from_input_file(
+            many_lines_input_path,
+            f"{tmp_path}/summary_{workers}.txt",
+            f"{tmp_path}/report_{workers}.csv",
+            standard_definition,
+        )
+    assert _read(f"{tmp_path}/report_1.csv") == _read(f"{tmp_path}/report_3.csv")
+    assert _read(f"{tmp_path}/summary_1.txt") == _read(f"{tmp_path}/summary_3.txt")
+
+
+def test_parallel_path_raises_worker_errors(short_line, standard_definition, tmp_path):
+    input_path = f"{tmp_path}/input_file.txt"
+    with open(input_path, "w") as writer:
+        writer.write(f"L1&1&AB\n{short_line}\n")
+    with pytest.raises(LineTokenizationError) as error:
+        list(Generator(workers=2).iter_line_data(input_path, standard_definition))
+    assert error.value.line == f"{short_line}\n"
+
+
+def test_section_writer_caps_open_files(line_processor, tmp_path):
+    line_data = line_processor.process()
+    other_sections = [
+        [{**item, "report_data": {**item["report_data"], "Section": section}}]
+        for item, section in zip(line_data, ("L2", "L3"))
+    ]
+    with SectionPartitionedWriter(tmp_path, summary=False, max_open_files=2) as w:
+        w.write_lines([line_data, *other_sections, line_data])
+        assert len(w._handles) == 2
+
+    with open(f"{tmp_path}/L1/report.csv", newline="") as f:
+        rows = list(csv.reader(f))
+    assert len(rows) == 1 + 2 * len(line_data)
+    assert os.path.exists(f"{tmp_path}/L3/report.csv")
@@ -0,0 +1,94 @@
+import csv
+import os
+from collections import Counter
+
+import pytest
+
+from classes import Generator, SortedReportWriter
+
+
+def _run(input_path, standard_definition, output_dir, **kwargs):
+    os.makedirs(output_dir, exist_ok=True)
+    Generator(chunk_size=64).generate_analyses_from_input_file(
+        input_path,
+        f"{output_dir}/summary.txt",
+        f"{output_dir}/report.csv",
+        standard_definition,
+        **kwargs,
+    )
+
+
+def _read(path):
+    with open(path, newline="") as reader:
+        return reader.read()
+
+
+@pytest.mark.parametrize("memory_limit", [None, 20_000])
+def test_grouped_report_and_summary(
+    many_lines_input_path, standard_definition, tmp_path, memory_limit
+):
+    _run(many_lines_input_path, standard_definition, f"{tmp_path}/plain")
+    _run(
+        many_lines_input_path,
+        standard_definition,
+        f"{tmp_path}/grouped",
+        group_by_error_code=True,
+        sort_memory_limit=memory_limit,
+    )
+
+    with open(f"{tmp_path}/plain/report.csv", newline="") as report_file:
+        reader = csv.reader(report_file)
+        header = next(reader)
+        rows = list(reader)
+    code, section = header.index("Error Code"), header.index("Section")
+    # A stable sort of the rows in input order.
+    expected = sorted(rows, key=lambda row: (row[code], row[section]))
+    with open(f"{tmp_path}/grouped/report.csv", newline="") as report_file:
+        assert list(csv.reader(report_file)) == [header] + expected
+
+    summary = _read(f"{tmp_path}/grouped/summary.txt")
+    groups = summary.split("\n\n")
+    assert groups[-1] == ""
+    assert len(groups) - 1 == len({(row[code], row[section]) for row in rows})
+    plain_summary = _read(f"{tmp_path}/plain/summary.txt")
+    assert Counter(summary.split()) == Counter(plain_summary.split())
+    # The run files are removed.
+    assert sorted(os.listdir(f"{tmp_path}/grouped")) == ["report.csv", "summary.txt"]
+
+
+def test_multi_pass_merge(tmp_path):
+    header = ["Section", "Sub-Section", "Error Code"]
+    lines = [
+        [
+            {
+                "report_data": dict(zip(header, (f"L{i % 3}", f"L{i % 3}1", code))),
+                "summary_data": {"Error Message": f"{i} {code}"},
+            }
+            for code in (f"E0{i % 5 + 1}", "E01")
+        ]
+        for i in range(200)
+    ]
+    writer = SortedReportWriter(
+        f"{tmp_path}/report.csv",
+        f"{tmp_path}/summary.txt",
+        memory_limit=1,
+        first_line=1000,
+        max_fan_in=3,
+    )
+    for start in range(0, 200, 7):
+        writer.write_lines(lines[start : start + 7])
+    assert writer.runs == 200
+    writer.finish()
+
+    # 99 merges of 3 runs into 1 leave 2 runs for the final merge.
+    assert writer.runs == 299
+    assert sorted(os.listdir(tmp_path)) == ["report.csv", "summary.txt"]
+    messages = _read(f"{tmp_path}/summary.txt").split("\n")
+    numbered = [message for message in messages if message]
+    assert len(numbered) == 400
+    expected = sorted(
+        (f"E0{i % 5 + 1}" if position == 0 else "E01", f"L{i % 3}", i, position)
+        for i in range(200)
+        for position in range(2)
+    )
+    assert numbered == [f"{i} {code}" for code, _, i, _ in expected]
@@ -0,0 +1,69 @@
+import json
+import random
+
+import pytest
+
+from classes import Generator
+from classes.token_sketches import QuantileSketch, SpaceSavingSketch
+
+
+def test_quantile_sketch_relative_accuracy():
+    rng = random.Random(0)
+    values = [rng.randint(1, 10_000) for _ in range(20_000)]
+    sketch = QuantileSketch(relative_accuracy=0.01)
+    for value in values:
+        sketch.add(value)
+
+    values.sort()
+    for q in (0.1, 0.5, 0.9, 0.99):
+        exact = values[int(q * (len(values) - 1))]
+        assert sketch.quantile(q) == pytest.approx(exact, rel=0.011)
+    assert (sketch.minimum, sketch.maximum) == (values[0], values[-1])
+
+    # Memory stays bounded: the lowest bins are collapsed.
+    small = QuantileSketch(max_bins=16)
+    for value in values:
+        small.add(value)
+    assert len(small._bins) == 16
+    assert small.quantile(0.99) == pytest.approx(values[int(0.99 * 19_999)], rel=0.011)
+
+
+def test_space_saving_finds_heavy_hitters():
+    rng = random.Random(1)
+    stream = ["heavy"] * 3000 + ["warm"] * 1000
+    stream += [f"noise{rng.randint(0, 5000)}" for _ in range(6000)]
+    rng.shuffle(stream)
+    sketch = SpaceSavingSketch(capacity=20)
+    for value in stream:
+        sketch.add(value)
+
+    top = sketch.top(2)
+    assert [item["value"] for item in top] == ["heavy", "warm"]
+    for item, true_count in zip(top, (3000, 1000)):
+        assert item["count"] - item["error"] <= true_count <= item["count"]
+    assert len(sketch.top()) == 20
+    assert sketch.count == len(stream)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_generate_sketches(
+    many_lines_input_path, standard_definition, tmp_path, workers
+):
+    sketches_path = f"{tmp_path}/sketches.json"
+    Generator(workers=workers, chunk_size=64).generate_analyses_from_input_file(
+        many_lines_input_path,
+        f"{tmp_path}/summary.txt",
+        f"{tmp_path}/report.csv",
+        standard_definition,
+        sketches_path=sketches_path,
+    )
+    with open(sketches_path) as reader:
+        sketches = json.load(reader)
+
+    lengths = sketches["L1"]["L11"]["e03_length_quantiles"]
+    assert lengths["count"] == 250
+    assert lengths["p50"] == pytest.approx(2, rel=0.01)
+    assert sketches["L4"]["L41"]["e02_count"] == 250
+    assert sketches["L4"]["L41"]["e02_top_values"] == [
+        {"value": "9", "count": 250, "error": 0}
+    ]
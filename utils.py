@@ -1,6 +1,7 @@
+from array import array
 from enum import Enum
-import json
 import os
+import sys
 
 
 class DataTypes(Enum):
@@ -76,6 +77,10 @@ def load_json_from_path(path, error_message):
     Raises:
         FileNotFoundError with custom error message.
     """
+    # Imported here so that runs loading a cached definition (see
+    # DefinitionCache) never import json.
+    import json
+
     try:
         f = None
         with open(path, "r") as f:
@@ -99,9 +104,8 @@ def make_dir_if_absent(output_dir):
 
     Raises:
     """
-    dir_exists = os.path.exists(output_dir)
-    if not dir_exists:
-        os.makedirs(output_dir)
+    # exist_ok: another thread or process may create it at the same time.
+    os.makedirs(output_dir, exist_ok=True)
 
 
 def remove_file_if_exists(path):
@@ -116,3 +120,42 @@ def remove_file_if_exists(path):
     """
     if os.path.exists(path):
         os.remove(path)
+
+
+def to_little_endian_bytes(values):
+    """Returns the raw bytes of an array in little-endian byte order.
+
+    Binary sidecar and output files are always written little-endian so
+    they can be shared between machines regardless of native byte order.
+
+    Args:
+        values: An array.array of numeric values.
+
+    Returns:
+        bytes: The little-endian representation of values.
+
+    Raises:
+    """
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def from_little_endian_bytes(typecode, raw):
+    """Builds an array from raw little-endian bytes.
+
+    Args:
+        typecode: The array.array typecode of the stored values.
+        raw: The little-endian bytes to decode.
+
+    Returns:
+        array: The decoded values.
+
+    Raises:
+    """
+    values = array(typecode)
+    values.frombytes(raw)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values